@@ -1,14 +1,33 @@
 # api.py
 from __future__ import annotations
 
+import asyncio
+import json
 import os
-from typing import List
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Literal, Optional
+from urllib.parse import urlencode
 
-from fastapi import FastAPI, HTTPException, status
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware   # 👈 EKLENDİ
 from pydantic import BaseModel, Field
 
-from models import Library, Book
+import metrics
+from authors import normalize_key
+from changefeed import StaleCursor, event_json
+from isbn import canonical_isbn
+from jobs import EnrichmentWorker, JobStore
+from metadata_cache import MetadataCache
+from models import Library, Book, book_to_record
+from openlibrary_client import AsyncOpenLibraryClient, OpenLibraryClient
+from profiling import PROFILER
+from resilience import UpstreamError
+from response_cache import CachedResponse, ResponseCache, etag_matches
+from snapshot import SnapshotBackend
+from writer import CommitQueue
 
 
 # ------------ Pydantic Şemaları ------------
@@ -16,6 +35,11 @@ class ISBNIn(BaseModel):
     isbn: str = Field(..., min_length=5, description="Ör: 9780441172719 veya 978-0441172719")
 
 
+class ISBNBatchIn(BaseModel):
+    isbns: List[str] = Field(..., min_length=1, description="İçe aktarılacak ISBN listesi")
+    chunk_size: int = Field(500, ge=1, le=10_000, description="Commit başına kitap sayısı")
+
+
 class BookOut(BaseModel):
     title: str
     author: str
@@ -27,13 +51,123 @@ class BookOut(BaseModel):
         return BookOut(title=b.title, author=b.author, isbn=b.isbn, kind=b.__class__.__name__)
 
 
+class SearchHit(BookOut):
+    score: float
+
+
+class AuthorBooksOut(BaseModel):
+    key: str                 # /authors/OL1A
+    name: Optional[str]      # tabloda yoksa null
+    books: List[BookOut]
+
+
+class ProfilingIn(BaseModel):
+    sample_rate: Optional[float] = Field(None, ge=0, le=1, description="0 = kapalı, 1 = her istek")
+    memory: Optional[bool] = Field(None, description="tracemalloc ile ayırma izleme")
+
+
+def book_json(b: Book) -> str:
+    """BookOut ile aynı biçimde tek satır JSON (Pydantic nesnesi kurmadan)."""
+    return json.dumps({"title": b.title, "author": b.author, "isbn": b.isbn,
+                       "kind": b.__class__.__name__}, ensure_ascii=False)
+
+
+NDJSON = "application/x-ndjson"
+SSE = "text/event-stream"
+STREAM_CHUNK = 1000
+FEED_POLL = 0.5        # başka süreçlerin yazımları için refresh aralığı (sn)
+FEED_KEEPALIVE = 15.0  # SSE bağlantısı boştayken yorum satırı aralığı (sn)
+
+
+def _feed_cursor(last_event_id: Optional[str]):
+    """SSE `id:` alanı "epoch:seq" biçimindedir; (epoch, seq) ya da None."""
+    epoch, sep, seq = (last_event_id or "").partition(":")
+    if not sep or not seq.isdigit():
+        return None
+    return epoch, int(seq)
+
+
+class RequestMetrics:
+    """
+    ASGI ara katmanı: istek süresini yöntem, rota şablonu (/books/{isbn}) ve
+    durum koduna göre histograma yazar. Rota şablonu kullanıldığı için etiket
+    sayısı sınırlıdır; eşleşmeyen yollar "unmatched" olur.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            metrics.HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start, method=scope["method"],
+                route=getattr(route, "path", "unmatched"), status=str(status_code))
+
+
+class RequestProfiler:
+    """
+    ASGI ara katmanı: PROFILER açıkken isteklerin bir kısmını cProfile (ve
+    istenirse tracemalloc) altında çalıştırır; sonuçlar "YÖNTEM /rota" etiketiyle
+    birleştirilir (bkz. profiling.py). Kapalıyken tek bir bayrak kontrolüdür.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not PROFILER.should_sample() or scope["path"].startswith("/admin/"):
+            return await self.app(scope, receive, send)
+        sample = PROFILER.start()
+        if sample is None:
+            return await self.app(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route = scope.get("route")
+            sample.finish(f'{scope["method"]} {getattr(route, "path", "unmatched")}')
+
+
 # ------------ Uygulama Fabrikası ------------
-def create_app(db_path: str | None = None) -> FastAPI:
+def create_app(db_path: str | None = None, ol_client: OpenLibraryClient | None = None) -> FastAPI:
     """
     Testlerde farklı bir DB yolu verebilmek için app'i fabrika ile kuruyoruz.
     Varsayılan: 'library.json'
+
+    Open Library istemcisi verilmezse DB dosyasının yanındaki önbellekle
+    (`<db>.cache.sqlite` ya da LIB_CACHE_PATH) kurulur.
+
+    LIB_LAZY_LOAD=1: hızlı açılış; kayıtlar mmap'ten erişimde çözülür (bkz. lazystore.py).
+    LIB_SNAPSHOT_PATH=<dosya>: katalog ikili snapshot'tan okunur (bkz. snapshot.py);
+    worker'lar sayfaları paylaşır ve birbirlerinin yayımladığı sürümleri görür.
+    LIB_ASYNC_ADD=1: POST /books varsayılan olarak arka plan işi açar (bkz. jobs.py);
+    iş kuyruğu `<db>.jobs.sqlite` (ya da LIB_JOBS_PATH) dosyasındadır.
     """
-    app = FastAPI(title="Library API", version="1.0.0")
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        if await asyncio.to_thread(app.state.jobs.store.next_due) is not None:
+            app.state.jobs.start()  # önceki süreçten kalan işler
+        yield
+        await app.state.jobs.stop()
+        await app.state.writer.stop()
+        await upstream().aclose()
+        await asyncio.to_thread(app.state.lib.close)
+        app.state.jobs.store.close()
+
+    app = FastAPI(title="Library API", version="1.0.0", lifespan=lifespan)
 
     # 🌍 CORS Middleware — herkese açık
     app.add_middleware(
@@ -42,57 +176,424 @@ def create_app(db_path: str | None = None) -> FastAPI:
         allow_methods=["*"],       # GET, POST, DELETE, vs.
         allow_headers=["*"],       # tüm header'lara izin ver
     )
+    if metrics.ENABLED:  # LIB_METRICS=0 iken istek yolunda hiçbir ek iş yok
+        app.add_middleware(RequestMetrics)
+    app.add_middleware(RequestProfiler)  # LIB_PROFILE ya da /admin/profiling ile açılır
 
     # Tek bir Library örneği: uygulama yaşamı boyunca paylaşılsın
     db_file = db_path or os.getenv("LIB_DB_PATH", "library.json")
-    app.state.lib = Library(db_file)
+    snapshot_path = os.getenv("LIB_SNAPSHOT_PATH")
+    if snapshot_path:
+        app.state.lib = Library(snapshot_path, backend=SnapshotBackend(snapshot_path), lazy=True)
+    else:
+        app.state.lib = Library(db_file, lazy=os.getenv("LIB_LAZY_LOAD", "") in ("1", "true", "yes"))
+    if ol_client is None:
+        cache_path = os.getenv("LIB_CACHE_PATH") or str(Path(db_file).with_suffix(".cache.sqlite"))
+        ol_client = OpenLibraryClient(cache=MetadataCache(cache_path))
+    app.state.ol_client = ol_client
+    # İstemci yazar isimlerini kütüphanenin tablosundan okur/yazar (bilinen anahtar tekrar çekilmez)
+    aio = getattr(ol_client, "aio", ol_client)
+    if getattr(aio, "authors", False) is None:
+        aio.authors = app.state.lib.authors
+
+    # Tüm değişiklikler tek yazıcıdan geçer (bkz. writer.py)
+    app.state.writer = CommitQueue(app.state.lib)
+    app.state.response_cache = ResponseCache()
+    metrics.REGISTRY.hook("library", lambda: app.state.lib.export_metrics())
+
+    def upstream() -> AsyncOpenLibraryClient:
+        client = app.state.ol_client
+        return getattr(client, "aio", client)  # senkron sarmalayıcı ya da doğrudan async istemci
+
+    # Arka plan çekme/zenginleştirme işleri (bkz. jobs.py)
+    jobs_path = os.getenv("LIB_JOBS_PATH") or str(Path(db_file).with_suffix(".jobs.sqlite"))
+    app.state.jobs = EnrichmentWorker(app.state.lib, app.state.writer, upstream, JobStore(jobs_path))
+    metrics.REGISTRY.hook("jobs", lambda: app.state.jobs.export_metrics())
+    async_default = os.getenv("LIB_ASYNC_ADD", "") in ("1", "true", "yes")
 
     # ------------- Endpoint'ler -------------
 
     @app.get("/books", response_model=List[BookOut])
-    def list_books():
-        """Kütüphanedeki tüm kitapları döndürür."""
-        items = app.state.lib.list_books()
-        return [BookOut.from_book(b) for b in items]
+    async def list_books(
+        request: Request,
+        limit: Optional[int] = Query(None, ge=1, le=1000, description="Sayfa boyutu"),
+        after: Optional[str] = Query(None, description="İmleç: önceki sayfanın son kanonik ISBN'i"),
+        author: Optional[str] = Query(None, description="Yazar (büyük/küçük harf duyarsız, tam eşleşme)"),
+        title: Optional[str] = Query(None, description="Başlık (büyük/küçük harf duyarsız, tam eşleşme)"),
+        kind: Optional[Literal["Book", "ComicBook", "Magazine"]] = None,
+        format: Optional[Literal["json", "ndjson"]] = Query(None, description="ndjson: akış halinde dışa aktarım"),
+    ):
+        """
+        Kitapları döndürür.
+        - Parametresiz: tüm kitaplar, ekleme sırasıyla (geriye uyumlu).
+        - limit/after/author/title/kind: kanonik ISBN sırasıyla filtreli sayfa;
+          devamı varsa `X-Next-Cursor` ve `Link: <...>; rel="next"` başlıkları döner.
+        - format=ndjson (ya da Accept: application/x-ndjson): tüm eşleşenler satır
+          satır akıtılır; liste ve Pydantic nesneleri kurulmaz.
+        - Her yanıtta ETag döner; `If-None-Match` tutarsa 304. Serileştirilmiş
+          gövdeler (sürüm, sorgu) başına önbellekte tutulur, her değişiklikte silinir.
+        """
+        lib = app.state.lib
+        cache: ResponseCache = app.state.response_cache
+        filters = {"author": author, "title": title, "kind": kind}
+        ndjson = format == "ndjson" or (format is None and NDJSON in request.headers.get("accept", ""))
+
+        # Koşullu GET: ETag sürüm+sorgudan gelir, gövde kurulmadan 304 verilebilir
+        lib.refresh()  # başka bir worker yeni snapshot yayımladıysa sürüm değişir
+        version = lib.version
+        key = cache.query_key(request.url.path, [*request.query_params.multi_items(), ("ndjson", ndjson)])
+        etag = cache.etag(version, key)
+        validators = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validators)
+
+        if ndjson:
+            async def stream():
+                # Parça parça keyset tarama: her parça kendi başına tutarlı,
+                # aradaki yazımlar akışı bozmaz.
+                cursor = after
+                while True:
+                    books = lib.page(after=cursor, limit=STREAM_CHUNK, **filters)
+                    if not books:
+                        return
+                    yield "".join(book_json(b) + "\n" for b in books)
+                    if len(books) < STREAM_CHUNK:
+                        return
+                    cursor = books[-1].key
+                    await asyncio.sleep(0)  # diğer isteklere sıra ver
+
+            return StreamingResponse(stream(), media_type=NDJSON, headers=validators)
+
+        cached = cache.get(version, key)
+        if cached is None:
+            headers = {}
+            if limit is None and after is None and not any(filters.values()):
+                books = lib.snapshot()
+            else:
+                books = lib.page(after=after, limit=None if limit is None else limit + 1, **filters)
+                if limit is not None and len(books) > limit:
+                    books = books[:limit]
+                    cursor = books[-1].key
+                    params = {k: v for k, v in filters.items() if v is not None}
+                    params.update(limit=limit, after=cursor)
+                    headers["X-Next-Cursor"] = cursor
+                    headers["Link"] = f'<{request.url.path}?{urlencode(params)}>; rel="next"'
+            body = ("[" + ",".join(book_json(b) for b in books) + "]").encode("utf-8")
+            cached = CachedResponse(body=body, headers=headers)
+            cache.put(version, key, cached)
+        return Response(content=cached.body, media_type=cached.media_type,
+                        headers={**cached.headers, **validators})
+
+    @app.get("/search", response_model=List[SearchHit])
+    async def search_books(
+        q: str = Query(..., min_length=1, description="Başlık/yazar sorgusu; önek ve yazım hatası toleranslı"),
+        limit: int = Query(20, ge=1, le=100),
+    ):
+        """Başlık ve yazarlarda tam metin arama (BM25 sıralı)."""
+        hits = app.state.lib.search(q, limit=limit)
+        return [SearchHit(**BookOut.from_book(b).model_dump(), score=round(score, 4)) for b, score in hits]
+
+    @app.get("/authors/{key}/books", response_model=AuthorBooksOut)
+    async def author_books(key: str):
+        """
+        Open Library yazar anahtarına ("OL23919A") bağlı kitaplar, ortak yazarlı
+        olanlar dahil. Kitap yoksa 404.
+        """
+        lib = app.state.lib
+        author_key = normalize_key(key)
+        books = lib.list_by_author_key(author_key)
+        if not books:
+            raise HTTPException(status_code=404, detail="Bu yazara ait kitap yok.")
+        return AuthorBooksOut(key=author_key, name=lib.authors.name(author_key),
+                              books=[BookOut.from_book(b) for b in books])
 
-    @app.post("/books", response_model=BookOut, status_code=status.HTTP_201_CREATED)
-    def add_book(payload: ISBNIn):
+    @app.post("/books", response_model=BookOut, status_code=status.HTTP_201_CREATED,
+              responses={202: {"description": "Arka plan işi açıldı (asenkron mod)"}})
+    async def add_book(
+        payload: ISBNIn,
+        async_: Optional[bool] = Query(None, alias="async", description="true: 202 + iş kimliği"),
+        prefer: Optional[str] = Header(None),
+    ):
         """
         Body: {"isbn": "<numara>"}
         - ISBN string verilirse Aşama 2'deki mantık tetiklenir (Open Library'den çeker).
         - Başarı: 201 + eklenen kitabı döner
         - Hata: 409 (zaten var) | 404 (bulunamadı) | 400 (geçersiz)
+          | 503 (Open Library yanıt vermiyor; Retry-After ile)
+        - Asenkron mod (`?async=true`, `Prefer: respond-async` ya da LIB_ASYNC_ADD=1):
+          doğrulamadan sonra 202 + iş döner, `Location: /jobs/{id}` ile izlenir.
         """
-        isbn = (payload.isbn or "").strip()
-        if not isbn:
+        raw = (payload.isbn or "").strip()
+        if not raw:
             raise HTTPException(status_code=400, detail="ISBN boş olamaz.")
+        isbn = canonical_isbn(raw)
+        if isbn is None:
+            raise HTTPException(status_code=400, detail="Geçersiz ISBN (checksum tutmuyor).")
 
-        # Zaten var mı? (basit kontrol — normalization yapmıyoruz)
+        # Zaten var mı? (kanonik ISBN-13 üzerinden: 10/13 haneli ve tireli yazımlar eşleşir)
         if app.state.lib.find_book(isbn) is not None:
             raise HTTPException(status_code=409, detail="Bu ISBN zaten kayıtlı.")
 
-        ok = app.state.lib.add_book(isbn)
-        if not ok:
-            raise HTTPException(status_code=404, detail="ISBN bulunamadı veya dış servis hatası.")
+        run_async = async_default or "respond-async" in (prefer or "")
+        if run_async if async_ is None else async_:
+            job = await app.state.jobs.submit_add(isbn)
+            return JSONResponse(job, status_code=status.HTTP_202_ACCEPTED,
+                                headers={"Location": f"/jobs/{job['id']}", "Preference-Applied": "respond-async"})
+
+        try:
+            data = await upstream().fetch_by_isbn(isbn)
+        except UpstreamError as exc:
+            retry_after = max(1, round(exc.retry_after or 0)) if exc.retry_after else 5
+            raise HTTPException(status_code=503, detail="Open Library şu an yanıt vermiyor, daha sonra tekrar deneyin.",
+                                headers={"Retry-After": str(retry_after)})
+        if not data:
+            raise HTTPException(status_code=404, detail="ISBN bulunamadı.")
 
-        # yeni eklenen kitabı geri oku ve döndür
-        b = app.state.lib.find_book(isbn)
+        b = Book(title=data["title"], author=data["author"], isbn=data["isbn"],
+                 author_keys=data.get("author_keys", ()))
+        # Fetch sürerken aynı ISBN başka bir istekle eklenmiş olabilir: yazıcı karar verir
+        if not await app.state.writer.submit(lambda lib: lib.add_book(b)):
+            raise HTTPException(status_code=409, detail="Bu ISBN zaten kayıtlı.")
         return BookOut.from_book(b)
 
+    @app.post("/books:batch")
+    async def add_books_batch(payload: ISBNBatchIn):
+        """
+        Toplu içe aktarım. Yanıt NDJSON akışıdır: her ISBN için bir satır
+        ({"isbn", "status", "book"}) ve sonda {"summary": {...}} satırı.
+        status: added | duplicate | invalid | not_found | error (dış servis hatası)
+        """
+        lib = app.state.lib
+        size = payload.chunk_size
+
+        async def results():
+            counts = {}
+            seen = set()
+            for start in range(0, len(payload.isbns), size):
+                chunk = payload.isbns[start:start + size]
+                items, todo = lib.plan_import(chunk, seen)
+                fetched = await upstream().fetch_many([key for _, key in todo])
+                await app.state.writer.submit(lambda lib: lib.apply_import(todo, fetched))
+                for res in items:
+                    counts[res["status"]] = counts.get(res["status"], 0) + 1
+                    b = res["book"]
+                    item = {"isbn": res["isbn"], "status": res["status"],
+                            "book": BookOut.from_book(b).model_dump() if b else None}
+                    yield json.dumps(item, ensure_ascii=False) + "\n"
+            yield json.dumps({"summary": counts}) + "\n"
+
+        return StreamingResponse(results(), media_type="application/x-ndjson")
+
     @app.delete("/books/{isbn}", status_code=status.HTTP_204_NO_CONTENT)
-    def delete_book(isbn: str):
+    async def delete_book(isbn: str):
         """
         Belirtilen ISBN'e sahip kitabı siler.
         - Başarı: 204
         - Yoksa: 404
         """
-        ok = app.state.lib.remove_book(isbn)
+        ok = await app.state.writer.submit(lambda lib: lib.remove_book(isbn))
         if not ok:
             raise HTTPException(status_code=404, detail="Silinecek ISBN bulunamadı.")
         return  # 204
 
+    # ------------- Arka plan işleri -------------
+    @app.get("/jobs")
+    async def job_counts():
+        """Duruma göre iş sayıları."""
+        return await asyncio.to_thread(app.state.jobs.store.counts)
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str):
+        """
+        İş durumu: {"id", "kind", "isbn", "status", "attempts", "error", "book", ...}.
+        status: queued | running | done | duplicate | not_found | unchanged | failed
+        """
+        job = await asyncio.to_thread(app.state.jobs.store.get, job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="İş bulunamadı.")
+        return job
+
+    @app.post("/jobs/enrich", status_code=status.HTTP_202_ACCEPTED)
+    async def enrich_unknown():
+        """Yazarı "Unknown" kalmış kitapları arka planda yeniden çeker."""
+        jobs = await app.state.jobs.enrich_unknown()
+        return {"queued": len(jobs), "jobs": [job["id"] for job in jobs]}
+
+    # ------------- Değişiklik akışı -------------
+    def read_feed(since: int, epoch: Optional[str], limit: int):
+        try:
+            return app.state.lib.feed.since(since, epoch, limit)
+        except StaleCursor:
+            raise HTTPException(status_code=410, detail="İmleç geçersiz; /changes/snapshot ile yeniden başlayın.")
+
+    @app.get("/changes")
+    async def list_changes(
+        request: Request,
+        since: int = Query(0, ge=0, description="Son uygulanan olayın seq'i"),
+        epoch: Optional[str] = Query(None, description="Önceki yanıttaki epoch; değiştiyse 410"),
+        wait: float = Query(0, ge=0, le=60, description="Yeni olay yoksa en fazla bu kadar bekle (long-poll, sn)"),
+        limit: int = Query(1000, ge=1, le=10_000),
+        format: Optional[Literal["json", "sse"]] = Query(None, description="sse: Server-Sent Events akışı"),
+    ):
+        """
+        `since`ten sonraki ekleme/silme olayları: {"epoch", "seq", "events", "more"}.
+        - wait>0: olay yoksa ilk olay gelene kadar bekler (long-poll).
+        - format=sse (ya da Accept: text/event-stream): bağlantı açık kalır, her
+          olay `id: <epoch>:<seq>` ile gönderilir; yeniden bağlanırken
+          `Last-Event-ID` kaldığı yerden sürdürür. wait>0 ise akış o kadar sonra biter.
+        - 410: epoch değişti ya da olaylar halkadan düştü; istemci
+          /changes/snapshot ile yeniden başlamalı.
+        """
+        lib = app.state.lib
+        feed = lib.feed
+        loop = asyncio.get_running_loop()
+        lib.refresh()  # başka bir süreç yazdıysa olaylar akışa eklenir
+        epoch = epoch or feed.epoch  # bekleme sırasında reset olursa imleç eskir
+
+        if format == "sse" or (format is None and SSE in request.headers.get("accept", "")):
+            resume = _feed_cursor(request.headers.get("last-event-id"))
+            if resume is not None:
+                epoch, since = resume
+            read_feed(since, epoch, 1)  # bozuk imleç akış başlamadan 410 alsın
+            deadline = loop.time() + wait if wait else None
+
+            async def stream():
+                cursor, idle = since, 0.0
+                yield f"retry: {int(FEED_POLL * 1000)}\n\n"
+                while True:
+                    lib.refresh()
+                    try:
+                        events = feed.since(cursor, epoch, limit)
+                    except StaleCursor:
+                        yield 'event: reset\ndata: {"detail": "snapshot gerekli"}\n\n'
+                        return
+                    if events:
+                        idle = 0.0
+                        yield "".join(f"id: {epoch}:{e[0]}\nevent: {e[1]}\n"
+                                      f"data: {json.dumps(event_json(e), ensure_ascii=False)}\n\n" for e in events)
+                        cursor = events[-1][0]
+                        continue
+                    slice_ = FEED_POLL if deadline is None else min(FEED_POLL, deadline - loop.time())
+                    if slice_ <= 0:
+                        return
+                    if not await feed.wait(cursor, slice_):
+                        idle += slice_
+                        if idle >= FEED_KEEPALIVE:
+                            idle = 0.0
+                            yield ": keep-alive\n\n"
+
+            return StreamingResponse(stream(), media_type=SSE,
+                                     headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+        events = read_feed(since, epoch, limit)
+        deadline = loop.time() + wait
+        while not events and loop.time() < deadline:
+            # Yazıcıdan gelen olay anında uyandırır; diğer süreçler için aralıklı refresh
+            await feed.wait(since, min(FEED_POLL, deadline - loop.time()))
+            lib.refresh()
+            events = read_feed(since, epoch, limit)
+        seq = events[-1][0] if events else since
+        return {"epoch": epoch, "seq": seq, "events": [event_json(e) for e in events], "more": seq < feed.seq}
+
+    @app.get("/changes/snapshot")
+    async def changes_snapshot():
+        """
+        Akışa başlangıç: ilk satır {"epoch", "seq", "count"}, ardından her kitap
+        için bir kayıt satırı (NDJSON). Kayıtlar tam olarak o seq anındaki
+        görünümdür; istemci sonra /changes?since=<seq>&epoch=<epoch> ile sürdürür.
+        """
+        lib = app.state.lib
+        lib.refresh()
+        # seq ile görünüm arada await olmadan alınır: ikisi aynı ana aittir
+        head = {"epoch": lib.feed.epoch, "seq": lib.feed.seq}
+        books = lib.snapshot()
+        head["count"] = len(books)
+
+        async def stream():
+            yield json.dumps(head) + "\n"
+            for start in range(0, len(books), STREAM_CHUNK):
+                yield "".join(json.dumps(book_to_record(b), ensure_ascii=False) + "\n"
+                              for b in books[start:start + STREAM_CHUNK])
+                await asyncio.sleep(0)
+
+        return StreamingResponse(stream(), media_type=NDJSON, headers={"Cache-Control": "no-cache"})
+
+    # ------------- Yönetim: profil çıkarma -------------
+    def admin(x_admin_token: Optional[str] = Header(None)) -> None:
+        """LIB_ADMIN_TOKEN tanımlıysa X-Admin-Token başlığı zorunludur."""
+        token = os.getenv("LIB_ADMIN_TOKEN")
+        if token and x_admin_token != token:
+            raise HTTPException(status_code=403, detail="Yetkisiz.")
+
+    @app.get("/admin/profiling", dependencies=[Depends(admin)])
+    async def profiling_status():
+        """Örnekleme ayarı ve etiket başına örnek sayıları."""
+        return PROFILER.status()
+
+    @app.post("/admin/profiling", dependencies=[Depends(admin)])
+    async def profiling_configure(payload: ProfilingIn):
+        """Örneklemeyi yeniden başlatmadan açar/kapatır (sample_rate=0: kapalı)."""
+        PROFILER.configure(sample_rate=payload.sample_rate, memory=payload.memory)
+        return PROFILER.status()
+
+    @app.delete("/admin/profiling", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(admin)])
+    async def profiling_reset():
+        """Toplanan istatistikleri siler."""
+        PROFILER.reset()
+
+    @app.get("/admin/profiling/pstats", dependencies=[Depends(admin)])
+    async def profiling_pstats(label: Optional[str] = Query(None, description='Ör. "GET /books"; yoksa hepsi')):
+        """pstats dökümü: `python -m pstats dosya` ya da `pstats.Stats(dosya)` ile açılır."""
+        data = PROFILER.dump(label)
+        if data is None:
+            raise HTTPException(status_code=404, detail="Örnek yok.")
+        name = (label or "all").replace(" ", "_").replace("/", "_").strip("_")
+        return Response(data, media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="{name}.pstats"'})
+
+    @app.get("/admin/profiling/top", response_class=PlainTextResponse, dependencies=[Depends(admin)])
+    async def profiling_top(label: Optional[str] = None, limit: int = Query(30, ge=1, le=500),
+                            sort: Literal["cumulative", "tottime", "calls"] = "cumulative"):
+        """En pahalı fonksiyonlar (pstats metin raporu)."""
+        return PROFILER.top(label, limit=limit, sort=sort)
+
+    @app.get("/admin/profiling/allocations", dependencies=[Depends(admin)])
+    async def profiling_allocations(limit: int = Query(20, ge=1, le=500)):
+        """Örneklenen isteklerde net en çok bellek ayıran satırlar (memory=true gerekir)."""
+        return PROFILER.top_allocations(limit)
+
+    @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+    async def get_metrics():
+        """Prometheus metin biçiminde süreç metrikleri (bkz. metrics.py)."""
+        body = await asyncio.to_thread(metrics.render)  # kancalar iş kuyruğunu (sqlite) sorgular
+        return PlainTextResponse(body, media_type=metrics.CONTENT_TYPE)
+
     return app
 
 
+class _DeferredApp:
+    """
+    `uvicorn api:app` için varsayılan uygulama. `create_app()` modül içe
+    aktarılırken değil ilk ASGI çağrısında (sunucunun lifespan başlangıcı)
+    çalışır: `import api` çalışma dizininde library.json, kilit, önbellek ve
+    iş kuyruğu dosyaları oluşturmaz.
+    """
+
+    def __init__(self, factory) -> None:
+        self._factory = factory
+        self._app: Optional[FastAPI] = None
+
+    def _get(self) -> FastAPI:
+        if self._app is None:
+            self._app = self._factory()
+        return self._app
+
+    async def __call__(self, scope, receive, send):
+        await self._get()(scope, receive, send)
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+
 # Varsayılan uygulama (yerel çalıştırma)
-app = create_app()
+app = _DeferredApp(create_app)
@@ -0,0 +1,75 @@
+# authors.py
+"""
+Open Library yazar varlıkları.
+
+Kitaplar yazarlarını `author_keys` ile ("/authors/OL1A", ...) anahtar olarak
+tutar; `author` alanı görüntü içindir (isimlerin ", " ile birleşimi). İsimler
+AuthorTable'da anahtar başına bir kez (intern edilmiş) durur:
+
+- Open Library istemcisi çözdüğü her yazarı tabloya yazar ve tabloda olan
+  anahtarı bir daha çekmez.
+- Kayıtlar yüklenirken isimler, anahtar sayısı `author` içindeki isim sayısıyla
+  eşleşiyorsa tablodan bağımsız olarak da çıkarılır (bkz. split_names).
+
+Yazar -> kitap bağları Library'nin `_by_author_key` indeksindedir.
+"""
+from __future__ import annotations
+
+import sys
+from typing import Dict, Iterator, List, Optional, Sequence
+
+SEPARATOR = ", "  # openlibrary_client isimleri bununla birleştirir
+
+
+def normalize_key(key: str) -> str:
+    """"OL1A", "authors/OL1A" ve "/authors/OL1A" -> "/authors/OL1A"."""
+    key = key.strip().strip("/")
+    if not key.startswith("authors/"):
+        key = "authors/" + key
+    return "/" + key
+
+
+def split_names(author: str, keys: Sequence[str]) -> Optional[List[str]]:
+    """
+    Birleşik yazar metnini anahtarlarla eşleşen isimlere böler; sayı tutmuyorsa
+    (ör. isimde virgül var) None. Tek anahtarlı kitapta metnin tamamı isimdir.
+    """
+    if not keys:
+        return None
+    if len(keys) == 1:
+        return [author]
+    names = author.split(SEPARATOR)
+    return names if len(names) == len(keys) else None
+
+
+class AuthorTable:
+    """Yazar anahtarı -> isim; tekilleştirilmiş (isimler ve anahtarlar intern edilir)."""
+
+    def __init__(self) -> None:
+        self._names: Dict[str, str] = {}
+
+    def name(self, key: str) -> Optional[str]:
+        return self._names.get(key)
+
+    def add(self, key: str, name: Optional[str]) -> None:
+        # dict ataması atomiktir: istemci thread'i ile yazıcı aynı anda yazabilir
+        if name:
+            self._names[sys.intern(key)] = sys.intern(name)
+
+    def learn(self, author: str, keys: Sequence[str]) -> None:
+        """Kayıttan isimleri çıkarır; tabloda zaten olanları değiştirmez."""
+        names = split_names(author, keys)
+        if names is None:
+            return
+        for key, name in zip(keys, names):
+            if key not in self._names:
+                self.add(key, name)
+
+    def __contains__(self, key) -> bool:
+        return key in self._names
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._names)
@@ -0,0 +1,591 @@
+# backends.py
+"""
+Library için takılabilir kalıcılık katmanı.
+
+Backend'ler model sınıflarını bilmez; düz dict kayıtlarla çalışır
+({"title", "author", "isbn", ..., "type"}). Değişiklikler `commit` ile
+sıralı işlem listesi olarak gelir:
+
+    ("add", <kayıt dict>)   |   ("remove", <isbn>)
+
+- JsonFileBackend: eski davranış — her commit'te tüm dosyayı yeniden yazar.
+- JournalBackend: library.json'u anlık görüntü (snapshot) olarak tutar,
+  değişiklikleri yalnızca sona eklenen bir günlüğe (library.json.wal) yazar
+  ve arka planda günlüğü snapshot'a sıkıştırır.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from contextlib import contextmanager
+from typing import IO, Callable, Iterable, Iterator, List, Optional, Tuple
+
+try:  # süreçler arası dosya kilidi: POSIX'te flock, Windows'ta msvcrt
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+from isbn import isbn_key
+from lazystore import LazyStore
+from metrics import STORAGE_WRITE_BYTES
+
+Op = Tuple[str, object]
+SnapshotFn = Callable[[], Iterable[dict]]
+
+
+def write_json_atomic(path: Path, records: Iterable[dict]) -> None:
+    """Kayıtları geçici dosyaya yazıp rename ile yerine koyar (yarım dosya kalmaz)."""
+    tmp = path.with_name(path.name + ".tmp")
+    data = json.dumps(list(records), ensure_ascii=False, indent=2).encode("utf-8")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    STORAGE_WRITE_BYTES.observe(len(data), file="json")
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True):
+    """
+    Süreçler arası özel danışma kilidi (kilit dosyası üzerinde). blocking=False
+    iken kilit meşgulse bloğa girilmeden False verilir, alındıysa True.
+    """
+    with open(path, "a+b") as f:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            else:  # pragma: no cover - Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK, 1)
+        except OSError:
+            if blocking:
+                raise
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:  # pragma: no cover - Windows
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def file_identity(path: Path) -> Optional[Tuple[int, int, int]]:
+    """(inode, mtime_ns, boyut); dosya yoksa None. Atomik rename her yazımda değiştirir."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def read_json_records(path: Path) -> List[dict]:
+    raw = path.read_text(encoding="utf-8").strip()
+    return json.loads(raw) if raw else []
+
+
+_SEPARATORS = re.compile(r"[\s,]*")
+
+
+def iter_json_records(source: Path | IO[str], chunk_size: int = 1 << 20) -> Iterator[dict]:
+    """
+    JSON dizisini parça parça okuyup kayıtları tek tek üretir. Dosyanın tamamı
+    tek bir string'e ve listeye alınmaz; tüketici (Library) indeksleri kayıt
+    geldikçe kurar. Boş dosya boş dizi sayılır.
+
+    source: dosya yolu ya da açık metin dosyası (tüketilince kapatılır).
+    """
+    decode = json.JSONDecoder().raw_decode
+    skip = _SEPARATORS.match
+    f = source if hasattr(source, "read") else open(source, encoding="utf-8")
+    with f:
+        buf = f.read(chunk_size)
+        while buf.isspace():
+            more = f.read(chunk_size)
+            if not more:
+                break
+            buf += more
+        pos = skip(buf).end()
+        if not buf.strip():
+            return
+        if buf[pos:pos + 1] != "[":
+            raise json.JSONDecodeError("JSON dizisi bekleniyordu", buf, pos)
+        pos += 1
+        eof = False
+        while True:
+            pos = skip(buf, pos).end()
+            if pos < len(buf) and buf[pos] == "]":
+                return
+            try:
+                obj, pos = decode(buf, pos)
+            except json.JSONDecodeError:
+                chunk = "" if eof else f.read(chunk_size)
+                if not chunk:
+                    raise  # dizi kapanmadan dosya bitti
+                eof = len(chunk) < chunk_size
+                buf = buf[pos:] + chunk  # kayıt parça sınırına denk geldi
+                pos = 0
+                continue
+            yield obj
+
+
+def _record_applier(records: dict) -> Callable[[str, object], None]:
+    """
+    `kanonik isbn -> kayıt` sözlüğüne günlük işlemi uygulayan fonksiyon. Anahtar
+    Library'deki gibi `isbn_key`tir: aynı kitabın farklı yazımları tek kayıttır.
+    """
+    def apply(op: str, payload) -> None:
+        if op == "add":
+            key = isbn_key(payload["isbn"])
+            records.pop(key, None)  # yeniden eklenen sona gider
+            records[key] = payload
+        else:
+            records.pop(isbn_key(payload), None)
+    return apply
+
+
+class StorageBackend:
+    """Tüm backend'lerin uyduğu arayüz."""
+
+    def load(self) -> Iterator[dict]:
+        """Kalıcı durumdaki tüm kayıtları döndürür."""
+        raise NotImplementedError
+
+    def changes(self) -> Optional[List[Op]]:
+        """
+        Başka süreçlerin, bu örnek son baktığından beri commit ettiği işlemler.
+        [] = değişiklik yok; None = artımlı izlenemiyor, tam yeniden yükleme gerekir.
+        """
+        return []
+
+    def open_lazy(self, decode: Callable[[dict], object],
+                  key: Callable[[str], str]) -> Optional[MutableMapping]:
+        """
+        Tembel yükleme: `kanonik anahtar -> Book` eşlemesi gibi davranan, kayıtları
+        erişimde çözen bir depo döndürür (decode: kayıt -> Book, key: isbn -> anahtar).
+        Backend bunu desteklemiyorsa None; Library normal yüklemeye düşer.
+        """
+        return None
+
+    def commit(self, ops: List[Op], snapshot: SnapshotFn) -> None:
+        """
+        Değişiklikleri kalıcı hale getirir. `snapshot()` tüm güncel kayıtları
+        verir; sadece tam yazım gereken backend'ler onu çağırır.
+        """
+        raise NotImplementedError
+
+    def export(self, records: Iterable[dict]) -> None:
+        """Tüm koleksiyonu JSON dosyası olarak yazar (içe/dışa aktarım formatı)."""
+        raise NotImplementedError
+
+    def flush(self) -> None:
+        """Tamponda bekleyen yazımları diske indirir."""
+
+    def close(self) -> None:
+        self.flush()
+
+
+class JsonFileBackend(StorageBackend):
+    """
+    Tek JSON dosyası; her commit O(n) tam yeniden yazımdır.
+
+    Aynı dosyayı paylaşan süreçler (API worker'ları, yanında çalışan CLI)
+    birbirinin güncellemesini kaybetmez:
+    - commit'ler `library.json.lock` üzerindeki danışma kilidiyle sıralanır;
+    - dosya bu örneğin son gördüğünden beri başka bir süreçte değiştiyse diskteki
+      kayıtlar okunur, commit'in işlemleri onların üzerine uygulanır ve öyle
+      yazılır (birleştirme; aynı ISBN'de son yazan kazanır);
+    - yazım geçici dosya + rename ile atomiktir;
+    - her commit işlemlerini `library.json.changes` günlüğüne de ekler. Diğer
+      süreçler `changes()` ile yalnızca yeni satırları okuyup belleklerini
+      artımlı günceller (bkz. Library.refresh). Günlük `max_log_bytes`ı aşınca
+      yeni bir nesille baştan başlar; eski nesli izleyenler tam yeniden yükler.
+    """
+
+    def __init__(self, path: str | Path, max_log_bytes: int = 1 << 20) -> None:
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.log_path = self.path.with_name(self.path.name + ".changes")
+        self.max_log_bytes = max_log_bytes
+        self._token = os.urandom(6).hex()  # bu örneğin günlükteki imzası
+        self._mutex = threading.Lock()     # aynı süreçteki thread'ler için
+        self._gen: Optional[str] = None    # izlenen günlük nesli
+        self._offset = 0                   # günlükte okunan son konum
+        self._known = None                 # veri dosyasının son bilinen kimliği
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            if not self.path.exists():
+                write_json_atomic(self.path, [])
+            if not self.log_path.exists():
+                self._rotate_log()
+
+    def load(self) -> Iterator[dict]:
+        with self._mutex, file_lock(self.lock_path):
+            # Açık dosya tanıtıcısı bu sürümü sabitler; okuma kilit dışında sürebilir
+            f = open(self.path, encoding="utf-8")
+            self._mark_seen()
+        return iter_json_records(f)
+
+    def open_lazy(self, decode, key) -> Optional[MutableMapping]:
+        with self._mutex, file_lock(self.lock_path):
+            store = LazyStore(self.path, decode, key)
+            self._mark_seen()
+        return store
+
+    def changes(self) -> Optional[List[Op]]:
+        # Hızlı yol: iki stat; bir şey değişmediyse kilit alınmaz
+        log = file_identity(self.log_path)
+        if log is not None and log[2] == self._offset and file_identity(self.path) == self._known:
+            return []
+        # Commit sürüyorsa (bu süreçte ya da başka birinde) okuyucuyu bekletme
+        if not self._mutex.acquire(blocking=False):
+            return []
+        try:
+            with file_lock(self.lock_path, blocking=False) as locked:
+                if not locked:
+                    return []
+                gen, entries, end = self._read_log()
+                current = file_identity(self.path)
+                if entries is None or (not entries and current != self._known):
+                    return None  # nesil değişti ya da dosya günlük dışında yazıldı
+                self._offset, self._known = end, current
+                return [op for src, ops in entries if src != self._token for op in ops]
+        finally:
+            self._mutex.release()
+
+    def commit(self, ops: List[Op], snapshot: SnapshotFn) -> None:
+        if not ops:
+            return
+        with self._mutex, file_lock(self.lock_path):
+            gen, entries, end = self._read_log()
+            stale = (entries is None or any(src != self._token for src, _ in entries)
+                     or file_identity(self.path) != self._known)
+            if stale:
+                # Başka bir süreç yazmış: diskteki güncel kayıtların üzerine uygula
+                # Kanonik ISBN ile: aynı kitabın farklı yazımları tek kayıt kalır
+                records = {isbn_key(r["isbn"]): r for r in iter_json_records(self.path)}
+                apply = _record_applier(records)
+                for kind, payload in ops:
+                    apply(kind, payload)
+                write_json_atomic(self.path, records.values())
+            else:
+                write_json_atomic(self.path, snapshot())
+            self._known = file_identity(self.path)
+            rotated = self._append_log(ops)
+            # Bellek diskle aynıysa kendi satırımızı okunmuş say. Bayatsak diğer
+            # süreçlerin satırları sonraki changes()'te artımlı uygulanır.
+            if not stale and rotated:
+                self._mark_seen()
+            elif not stale:
+                self._offset = self.log_path.stat().st_size
+
+    def export(self, records: Iterable[dict]) -> None:
+        # Yerinde yazmak yerine rename: dosyayı mmap ile okuyan tembel yükleyici
+        # eski içeriği görmeye devam eder, kesilmiş dosyayla karşılaşmaz.
+        with self._mutex, file_lock(self.lock_path):
+            write_json_atomic(self.path, records)
+            self._rotate_log()  # tam yazım: diğer süreçler baştan yüklesin
+            self._mark_seen()
+
+    # ---------- değişiklik günlüğü (kilit altında çağrılır) ----------
+    def _mark_seen(self) -> None:
+        self._gen, self._offset = self._log_header()
+        self._known = file_identity(self.path)
+
+    def _log_header(self) -> Tuple[Optional[str], int]:
+        try:
+            with open(self.log_path, "rb") as f:
+                header = f.readline()
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return None, 0
+        try:
+            return json.loads(header)["gen"], size
+        except (ValueError, KeyError):
+            return None, size
+
+    def _rotate_log(self) -> None:
+        tmp = self.log_path.with_name(self.log_path.name + ".tmp")
+        tmp.write_text(json.dumps({"gen": os.urandom(6).hex()}) + "\n", encoding="utf-8")
+        os.replace(tmp, self.log_path)
+
+    def _append_log(self, ops: List[Op]) -> bool:
+        """İşlemleri tek satır olarak ekler; günlük çok büyüdüyse yeni nesil açar (True)."""
+        if self.log_path.exists() and self.log_path.stat().st_size > self.max_log_bytes:
+            self._rotate_log()
+            return True
+        line = (json.dumps({"src": self._token, "ops": ops}, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.log_path, "ab") as f:
+            f.write(line)  # kilit altında tek write: satırlar karışmaz
+        STORAGE_WRITE_BYTES.observe(len(line), file="log")
+        return False
+
+    def _read_log(self):
+        """(nesil, [(kaynak, işlemler)], yeni konum); nesil değiştiyse işlemler None."""
+        gen, size = self._log_header()
+        if gen is None or gen != self._gen:
+            return gen, None, size
+        entries = []
+        with open(self.log_path, "rb") as f:
+            f.seek(self._offset)
+            end = self._offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # yarım satır (yazan süreç çöktü): sonrası okunmaz
+                end += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # çökmüş bir yazarın yarım satırının devamı
+                entries.append((entry["src"], [tuple(op) for op in entry["ops"]]))
+        return gen, entries, end
+
+
+class JournalBackend(StorageBackend):
+    """
+    Append-only günlük + periyodik snapshot.
+
+    - Her commit günlüğe birer satır JSON ekler: maliyet koleksiyon boyutundan bağımsız.
+    - fsync toplu yapılır: `sync_every` işlemde bir ya da en geç `sync_interval`
+      saniye içinde (arka plan flusher'ı).
+    - Günlük `compact_threshold` işlemi aşınca `.wal.old` adıyla döndürülür ve
+      arka plan thread'i snapshot'ı (library.json) atomik olarak yeniden yazar.
+    - Tek süreç içindir: `changes()` yoktur ve dosya kilidi alınmaz; aynı
+      dosyayı açan ikinci bir süreç diğerinin yazımlarını görmez. Çok süreçli
+      dağıtımda JsonFileBackend, SqliteBackend ya da SnapshotBackend kullanın.
+    - Kurtarma: açılışta yarıda kalmış bir sıkıştırmadan `.wal.old` kaldıysa önce
+      snapshot'a katlanır, sonra `.wal` yeniden oynatılır. Yarım kalmış son satır
+      (çökme) atılır ve günlük o noktadan kesilir.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        sync_every: int = 64,
+        sync_interval: float = 0.05,
+        compact_threshold: int = 10_000,
+        background: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.wal_path = self.path.with_name(self.path.name + ".wal")
+        self.old_wal_path = self.path.with_name(self.path.name + ".wal.old")
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.compact_threshold = compact_threshold
+        self.background = background
+
+        self._lock = threading.RLock()
+        self._wal = None
+        self._unsynced = 0
+        self._ops_since_compact = 0
+        self._dirty = threading.Event()
+        self._closed = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+        self._compactor: Optional[threading.Thread] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not self.path.exists():
+            write_json_atomic(self.path, [])
+
+    # ---------- okuma / kurtarma ----------
+    def load(self) -> Iterator[dict]:
+        with self._lock:
+            self._wait_compaction()
+            self._fold_old_wal()
+            records = {isbn_key(r["isbn"]): r for r in iter_json_records(self.path)}
+            apply = _record_applier(records)
+            replayed = 0
+            for wal in (self.old_wal_path, self.wal_path):
+                replayed += self._replay(wal, apply)
+            self._ops_since_compact = replayed
+            return iter(list(records.values()))
+
+    def open_lazy(self, decode, key) -> Optional[MutableMapping]:
+        with self._lock:
+            self._wait_compaction()
+            self._fold_old_wal()
+            store = LazyStore(self.path, decode, key)
+
+            def apply(op: str, payload) -> None:  # günlükteki, snapshot'tan yeni işlemler
+                if op == "add":
+                    store[key(payload["isbn"])] = decode(payload)
+                else:
+                    store.pop(key(payload), None)
+
+            replayed = 0
+            for wal in (self.old_wal_path, self.wal_path):
+                replayed += self._replay(wal, apply)
+            self._ops_since_compact = replayed
+            return store
+
+    def _replay(self, wal: Path, apply: Callable[[str, object], None]) -> int:
+        if not wal.exists():
+            return 0
+        count = 0
+        good_end = 0
+        with open(wal, "rb") as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("yarım satır")
+                    entry = json.loads(line)
+                    op = entry["op"]
+                except (ValueError, KeyError):
+                    break  # çökmeden kalan bozuk kuyruk: buradan sonrası geçersiz
+                if op == "add":
+                    apply("add", entry["book"])
+                elif op == "remove":
+                    apply("remove", entry["isbn"])
+                good_end += len(line)
+                count += 1
+        if good_end != wal.stat().st_size:
+            with open(wal, "r+b") as f:
+                f.truncate(good_end)
+        return count
+
+    # ---------- yazma ----------
+    def commit(self, ops: List[Op], snapshot: SnapshotFn) -> None:
+        if not ops:
+            return
+        lines = []
+        for kind, payload in ops:
+            if kind == "add":
+                lines.append(json.dumps({"op": "add", "book": payload}, ensure_ascii=False))
+            else:
+                lines.append(json.dumps({"op": "remove", "isbn": payload}, ensure_ascii=False))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+
+        with self._lock:
+            wal = self._open_wal()
+            wal.write(data)
+            wal.flush()  # süreç çökse bile OS tamponunda
+            STORAGE_WRITE_BYTES.observe(len(data), file="wal")
+            self._unsynced += len(ops)
+            self._ops_since_compact += len(ops)
+            if self._unsynced >= self.sync_every or not self.background:
+                self._fsync()
+            else:
+                self._dirty.set()
+                self._start_flusher()
+            if self._ops_since_compact >= self.compact_threshold:
+                self._start_compaction(snapshot)
+
+    def export(self, records: Iterable[dict]) -> None:
+        """Tam snapshot yazar ve günlükleri sıfırlar."""
+        with self._lock:
+            self._wait_compaction()
+            write_json_atomic(self.path, records)
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+            for wal in (self.wal_path, self.old_wal_path):
+                if wal.exists():
+                    wal.unlink()
+            self._unsynced = 0
+            self._ops_since_compact = 0
+
+    def flush(self) -> None:
+        with self._lock:
+            self._fsync()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._dirty.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            self._wait_compaction()
+            self._fsync()
+            if self._wal is not None:
+                self._wal.close()
+                self._wal = None
+
+    def compact(self, snapshot: SnapshotFn) -> None:
+        """Günlüğü hemen snapshot'a katlar (senkron)."""
+        with self._lock:
+            self._start_compaction(snapshot)
+            self._wait_compaction()
+
+    # ---------- yardımcılar ----------
+    def _open_wal(self):
+        if self._wal is None:
+            self._wal = open(self.wal_path, "ab")
+        return self._wal
+
+    def _fsync(self) -> None:
+        if self._wal is not None and self._unsynced:
+            os.fsync(self._wal.fileno())
+        self._unsynced = 0
+
+    def _start_flusher(self) -> None:
+        if self._flusher is not None:
+            return
+        self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+        self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._closed.is_set():
+            self._dirty.wait()
+            if self._closed.is_set():
+                break
+            time.sleep(self.sync_interval)  # bu pencerede gelen yazımlar tek fsync'e biner
+            with self._lock:
+                self._dirty.clear()
+                self._fsync()
+
+    def _start_compaction(self, snapshot: SnapshotFn) -> None:
+        # Önceki sıkıştırma hâlâ sürüyorsa bekle; `.wal.old` tek slot, ezilmemeli.
+        self._wait_compaction()
+        self._fold_old_wal()
+        if self._wal is not None:
+            self._fsync()
+            self._wal.close()
+            self._wal = None
+        if self.wal_path.exists():
+            os.replace(self.wal_path, self.old_wal_path)
+        self._ops_since_compact = 0
+        records = snapshot()  # referanslar şimdi alınır, serileştirme arka planda
+        if self.background:
+            self._compactor = threading.Thread(
+                target=self._compact_to_snapshot, args=(records,), name="wal-compactor", daemon=True
+            )
+            self._compactor.start()
+        else:
+            self._compact_to_snapshot(records)
+
+    def _compact_to_snapshot(self, records: Iterable[dict]) -> None:
+        write_json_atomic(self.path, records)
+        # Snapshot yerine geçtikten sonra eski günlük gereksiz; bu noktadan önce
+        # çökülürse yeniden oynatma idempotent olduğu için sonuç aynıdır.
+        try:
+            self.old_wal_path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _fold_old_wal(self) -> None:
+        """
+        Yarıda kalmış sıkıştırmayı (snapshot yazılmadan çökülmüş) tamamlar:
+        `.wal.old` diskteki snapshot'a uygulanıp yazılır ve silinir. Yoksa bir
+        sonraki döndürme onu ezer, ikinci bir çökmede o kayıtlar kaybolurdu.
+        """
+        if not self.old_wal_path.exists():
+            return
+        records = {isbn_key(r["isbn"]): r for r in iter_json_records(self.path)}
+        self._replay(self.old_wal_path, _record_applier(records))
+        self._compact_to_snapshot(records.values())
+
+    def _wait_compaction(self) -> None:
+        t = self._compactor
+        if t is not None:
+            t.join()
+            self._compactor = None
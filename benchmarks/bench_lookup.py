@@ -0,0 +1,86 @@
+# benchmarks/bench_lookup.py
+# find_book / find_by_title / list_by_author verimini ölçer: indeksli Library
+# ile eski doğrusal tarama karşılaştırması (10k, 100k, 1M kitap). Varsayılan
+# JSON backend'i kullanılır; okumalardaki değişiklik kontrolü de ölçüme dahildir.
+#
+#   python benchmarks/bench_lookup.py --sizes 10000 100000 1000000
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from models import Book, Library
+
+
+def build(n: int, d: str) -> Library:
+    lib = Library(Path(d) / f"library-{n}.json")
+    lib.books = [Book(f"Kitap {i}", f"Yazar {i % 5000}", f"isbn-{i}") for i in range(n)]
+    return lib
+
+
+def linear_find(books, isbn):
+    for b in books:
+        if b.isbn == isbn:
+            return b
+    return None
+
+
+def linear_title(books, title):
+    needle = title.strip().lower()
+    for b in books:
+        if b.title.strip().lower() == needle:
+            return b
+    return None
+
+
+def linear_author(books, author):
+    needle = author.strip().lower()
+    return [b for b in books if b.author.strip().lower() == needle]
+
+
+def rate(fn, args, budget: float = 0.5) -> float:
+    """`budget` saniye boyunca çağırıp saniyedeki işlem sayısını döndürür."""
+    calls = 0
+    t0 = time.perf_counter()
+    while True:
+        for a in args:
+            fn(a)
+        calls += len(args)
+        elapsed = time.perf_counter() - t0
+        if elapsed >= budget:
+            return calls / elapsed
+
+
+def run(n: int, d: str, rnd: random.Random) -> None:
+    lib = build(n, d)
+    books = lib.list_books()
+    picks = [rnd.randrange(n) for _ in range(50)]
+    isbns = [f"isbn-{i}" for i in picks]
+    titles = [f"kitap {i}" for i in picks]
+    authors = [f"YAZAR {i % 5000}" for i in picks[:5]]
+    cases = [
+        ("find_book", lambda a: linear_find(books, a), lib.find_book, isbns),
+        ("find_by_title", lambda a: linear_title(books, a), lib.find_by_title, titles),
+        ("list_by_author", lambda a: linear_author(books, a), lib.list_by_author, authors),
+    ]
+    for name, slow, fast, inputs in cases:
+        print(f"{n:>9} {name:<15}{rate(slow, inputs[:3]):>15,.0f}{rate(fast, inputs):>15,.0f}")
+
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = ap.parse_args()
+
+    rnd = random.Random(42)
+    print(f"{'n':>9} {'op':<15}{'linear ops/s':>15}{'index ops/s':>15}")
+    with tempfile.TemporaryDirectory() as d:
+        for n in args.sizes:
+            run(n, d, rnd)
+
+if __name__ == "__main__":
+    main()
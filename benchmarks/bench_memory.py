@@ -0,0 +1,77 @@
+# benchmarks/bench_memory.py
+# Kitap başına bellek (tracemalloc): __dict__'li dataclass, slots'lu Book ve
+# sütunlu depo (Library(columnar=True)) karşılaştırması. Yazarlar Zipf benzeri
+# dağılımla tekrar eder; gerçek kataloglarda olduğu gibi.
+#
+#   python benchmarks/bench_memory.py --sizes 100000 1000000
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+
+from columnar import ColumnarStore
+from isbn import _isbn_key
+from models import _KINDS, Book
+
+
+@dataclass
+class DictBook:
+    """Eski düzen: örnek başına __dict__, yazar interning yok."""
+    title: str
+    author: str
+    isbn: str
+
+
+_key = _isbn_key.__wrapped__  # lru_cache'in kendi maliyeti ölçüme karışmasın
+
+
+def rows(n: int):
+    # Her satır için yeni string nesneleri (JSON'dan okunmuş gibi)
+    for i in range(n):
+        isbn = f"978{i:010d}"
+        yield f"Kitap {i}", "Yazar " + str(int(5000 / (1 + i % 997))), isbn, _key(isbn)
+
+
+def measure(build, n: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build(n)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del keep
+    return used / n
+
+
+def build_dict(n):
+    return {key: DictBook(t, a, isbn) for t, a, isbn, key in rows(n)}
+
+
+def build_slots(n):
+    return {key: Book(t, a, isbn) for t, a, isbn, key in rows(n)}
+
+
+def build_columnar(n):
+    store = ColumnarStore(_KINDS)
+    for t, a, isbn, key in rows(n):
+        store[key] = Book(t, a, isbn)
+    return store
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    args = ap.parse_args()
+
+    cases = [("dict dataclass", build_dict), ("slots + intern", build_slots), ("columnar", build_columnar)]
+    print(f"{'n':>9} {'representation':<16}{'bytes/book':>12}")
+    for n in args.sizes:
+        for name, build in cases:
+            print(f"{n:>9} {name:<16}{measure(build, n):>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_search.py
+# Sentetik katalogda tam metin arama: indeks kurulum süresi ve sorgu gecikmeleri.
+#
+#   python benchmarks/bench_search.py --sizes 100000 1000000
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import itertools
+import random
+import statistics
+import time
+
+from search import SearchIndex
+
+SYLLABLES = ("ka ta ma la ra sa ya de ne ri ku mo zu şe çi ğa ön ül ış ba "
+             "ko ti pe lu ve gi dü fo ha ce").split()
+FIRST = "Ahmet Ayşe Mehmet Elif Orhan Yaşar Sabahattin Oğuz Frank Ursula Isaac Neil".split()
+LAST = "Pamuk Kemal Ali Atay Herbert Guin Asimov Gaiman Tanpınar Karasu Kaya Öztürk".split()
+
+
+def vocabulary(size: int, rnd: random.Random):
+    words = {"dune", "istanbul", "tarih", "yapay", "zeka", "ejderha", "savaş", "barış"}
+    while len(words) < size:
+        words.add("".join(rnd.choice(SYLLABLES) for _ in range(rnd.randint(2, 4))))
+    return sorted(words)
+
+
+def synthetic(n: int, rnd: random.Random):
+    """Başlık kelimeleri Zipf benzeri dağılımla seçilir (az sayıda çok yaygın kelime)."""
+    vocab = vocabulary(30_000, rnd)
+    rnd.shuffle(vocab)
+    cum = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocab))))
+    for i in range(n):
+        words = rnd.choices(vocab, cum_weights=cum, k=rnd.randint(1, 5))
+        title = " ".join(words)
+        author = f"{rnd.choice(FIRST)} {rnd.choice(LAST)}{i % 997}"
+        yield f"doc-{i}", title, author
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = ap.parse_args()
+
+    queries = ["dune", "savas baris", "ISTANBUL tarih", "yapay zek", "ejdreha", "herbert7",
+               "orhan pamuk"]
+    for n in args.sizes:
+        rnd = random.Random(7)
+        idx = SearchIndex()
+        t0 = time.perf_counter()
+        for doc in synthetic(n, rnd):
+            idx.add(*doc)
+        idx.search("warmup")
+        print(f"n={n:,}: indeks {time.perf_counter() - t0:.1f} sn")
+        for q in queries:
+            t0 = time.perf_counter()
+            hits = idx.search(q, limit=20)
+            cold = time.perf_counter() - t0
+            samples = []
+            for _ in range(5):
+                t0 = time.perf_counter()
+                idx.search(q, limit=20)
+                samples.append(time.perf_counter() - t0)
+            print(f"  {q!r:<20} soğuk {cold * 1000:8.2f} ms  önbellekli {statistics.median(samples) * 1000:7.3f} ms"
+                  f"  ({len(hits)} sonuç)")
+
+
+if __name__ == "__main__":
+    main()
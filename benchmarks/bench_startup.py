@@ -0,0 +1,80 @@
+# benchmarks/bench_startup.py
+# Library açılış süresi ve tepe bellek: eski yükleyici (tüm dosya -> json.loads
+# -> liste), akış halinde yükleyici (varsayılan), tembel mmap modu ve ikili
+# snapshot (snapshot.py). Her ölçüm ayrı bir süreçte yapılır; tepe RSS
+# (ru_maxrss) karışmasın.
+#
+#   python benchmarks/bench_startup.py --sizes 100000 1000000
+import sys, os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+import argparse
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+# Alt süreçte çalışır: argv = mod, db yolu
+_CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[3])
+from models import Library, book_from_record
+mode, db = sys.argv[1], sys.argv[2]
+
+t0 = time.perf_counter()
+if mode == "eager-old":
+    class OldLoad(Library):
+        def load_books(self):
+            with open(self.db_path, encoding="utf-8") as f:
+                self.books = [book_from_record(item) for item in json.loads(f.read())]
+    lib = OldLoad(db)
+elif mode == "streaming":
+    lib = Library(db)
+elif mode == "snapshot":
+    from snapshot import SnapshotBackend
+    snap = db.replace(".json", ".snap")
+    lib = Library(snap, backend=SnapshotBackend(snap), lazy=True)
+else:
+    lib = Library(db, lazy=True)
+startup = time.perf_counter() - t0
+t0 = time.perf_counter()
+lib.find_book("isbn-7")
+first = time.perf_counter() - t0
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux: KiB
+print(json.dumps({"startup": startup, "first_lookup": first, "peak_rss_mb": rss / 1024}))
+"""
+
+
+def write_db(path: Path, n: int) -> None:
+    # Akış halinde yazılır: Linux'ta ru_maxrss exec sonrası da korunur, ebeveyn
+    # süreç büyürse çocukların ölçümü de onun tepe değerinden başlar.
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(n):
+            rec = {"title": f"Kitap {i}", "author": f"Yazar {i % 5000}", "isbn": f"isbn-{i}", "type": "Book"}
+            f.write(("\n" if i == 0 else ",\n") + json.dumps(rec, ensure_ascii=False, indent=2))
+        f.write("\n]")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    args = ap.parse_args()
+
+    print(f"{'n':>9} {'loader':<11}{'startup s':>11}{'1st find ms':>13}{'peak RSS MB':>13}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            db = Path(d) / "library.json"
+            write_db(db, n)
+            subprocess.run([sys.executable, os.path.join(ROOT, "snapshot.py"), str(db),
+                            str(db.with_suffix(".snap"))], check=True)
+            for mode in ("eager-old", "streaming", "lazy", "snapshot"):
+                out = subprocess.run([sys.executable, "-c", _CHILD, mode, str(db), ROOT],
+                                     capture_output=True, text=True, check=True).stdout
+                r = json.loads(out)
+                print(f"{n:>9} {mode:<11}{r['startup']:>11.2f}{r['first_lookup'] * 1000:>13.2f}"
+                      f"{r['peak_rss_mb']:>13.0f}")
+
+
+if __name__ == "__main__":
+    main()
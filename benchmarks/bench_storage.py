@@ -0,0 +1,71 @@
+# benchmarks/bench_storage.py
+# Açılış (yükleme) süresini ve tek kitap ekleme gecikmesini koleksiyon boyutuna
+# göre ölçer: JsonFileBackend (tam yeniden yazım), JournalBackend (append-only
+# günlük) ve SqliteBackend (WAL, satır bazlı yazım).
+#
+#   python benchmarks/bench_storage.py --sizes 1000 10000 100000
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from backends import JournalBackend, JsonFileBackend
+from models import Book, Library
+from sqlite_backend import SqliteBackend, migrate_json
+
+
+def sqlite_backend(db: Path) -> SqliteBackend:
+    target = db.with_suffix(".db")
+    migrate_json(db, target)
+    return SqliteBackend(target)
+
+
+BACKENDS = {"JsonFileBackend": JsonFileBackend, "JournalBackend": JournalBackend,
+            "SqliteBackend": sqlite_backend}
+
+
+def seed(db: Path, n: int) -> None:
+    data = [{"title": f"Kitap {i}", "author": f"Yazar {i % 997}", "isbn": f"seed-{i}", "type": "Book"}
+            for i in range(n)]
+    db.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def measure(make_backend, n: int, writes: int) -> tuple[float, list[float]]:
+    with tempfile.TemporaryDirectory() as d:
+        db = Path(d) / "library.json"
+        seed(db, n)
+        backend = make_backend(db)
+        t0 = time.perf_counter()
+        lib = Library(db, backend=backend)
+        load = time.perf_counter() - t0
+        samples = []
+        for i in range(writes):
+            t0 = time.perf_counter()
+            lib.add_book(Book(f"Yeni {i}", "Bench", f"bench-{i}"))
+            samples.append(time.perf_counter() - t0)
+        lib.close()
+        return load, samples
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--writes", type=int, default=50)
+    args = ap.parse_args()
+
+    print(f"{'backend':<16}{'n':>10}{'load ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, make_backend in BACKENDS.items():
+        for n in args.sizes:
+            load, s = measure(make_backend, n, args.writes)
+            s.sort()
+            p50 = statistics.median(s) * 1000
+            p95 = s[int(len(s) * 0.95) - 1] * 1000
+            print(f"{name:<16}{n:>10}{load * 1000:>10.1f}{p50:>10.3f}{p95:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+# benchmarks/load_test.py
+# Karışık okuma/yazma trafiği altında API verimini ölçer. Uygulama ASGI
+# üzerinden süreç içinde çağrılır; Open Library sahte ve gecikmelidir.
+#
+#   python benchmarks/load_test.py --seconds 5 --concurrency 64 --write-ratio 0.2
+#
+# Aynı --seed ile her worker'ın istek dizisi (yöntem ve ISBN seçimi) aynıdır.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from api import create_app
+from isbn import canonical_isbn
+from openlibrary_client import AsyncOpenLibraryClient
+
+
+def fake_openlibrary(latency: float):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        path = request.url.path
+        if path.startswith("/isbn/"):
+            isbn = path[len("/isbn/"):-len(".json")]
+            return httpx.Response(200, json={"title": f"Kitap {isbn}", "authors": [{"key": "/authors/OL1A"}]})
+        return httpx.Response(200, json={"name": "Yük Testi"})
+    return httpx.MockTransport(handler)
+
+
+def isbn_pool(n: int):
+    """n adet geçerli ISBN-13 (12 haneli gövde + doğru kontrol hanesi)."""
+    out = []
+    for i in range(n):
+        body = f"978{i:09d}"
+        out.append(next(c for c in (canonical_isbn(body + d) for d in "0123456789") if c))
+    return out
+
+
+async def run(args) -> None:
+    with tempfile.TemporaryDirectory() as d:
+        db = Path(d) / "library.json"
+        seed = [{"title": f"Tohum {i}", "author": "Yazar", "isbn": f"seed-{i}", "type": "Book"}
+                for i in range(args.books)]
+        db.write_text(json.dumps(seed), encoding="utf-8")
+
+        upstream = AsyncOpenLibraryClient(transport=fake_openlibrary(args.upstream_latency), rate_limit=None)
+        app = create_app(str(db), ol_client=upstream)
+        isbns = isbn_pool(args.isbns)
+        latencies = {"GET": [], "POST": [], "DELETE": []}
+        deadline = time.perf_counter() + args.seconds
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as http:
+            async def worker(n: int):
+                rnd = random.Random(args.seed * args.concurrency + n)
+                while time.perf_counter() < deadline:
+                    if rnd.random() < args.write_ratio:
+                        isbn = rnd.choice(isbns)
+                        method = "POST" if rnd.random() < 0.5 else "DELETE"
+                        t0 = time.perf_counter()
+                        if method == "POST":
+                            await http.post("/books", json={"isbn": isbn})
+                        else:
+                            await http.delete(f"/books/{isbn}")
+                    else:
+                        method = "GET"
+                        t0 = time.perf_counter()
+                        await http.get("/books")
+                    latencies[method].append(time.perf_counter() - t0)
+
+            await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+
+        total = sum(len(v) for v in latencies.values())
+        print(f"toplam {total} istek, {total / args.seconds:,.0f} istek/sn")
+        for method, samples in latencies.items():
+            if not samples:
+                continue
+            samples.sort()
+            p99 = samples[max(0, int(len(samples) * 0.99) - 1)]
+            print(f"  {method:<7}{len(samples):>8}  p50 {statistics.median(samples) * 1000:7.2f} ms"
+                  f"  p99 {p99 * 1000:7.2f} ms")
+        w = app.state.writer.stats
+        print(f"yazıcı: {w.mutations} değişiklik / {w.groups} commit (en büyük grup {w.max_group})")
+        app.state.lib.close()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--concurrency", type=int, default=64)
+    ap.add_argument("--write-ratio", type=float, default=0.2)
+    ap.add_argument("--books", type=int, default=1000, help="Başlangıç kitap sayısı")
+    ap.add_argument("--seed", type=int, default=42, help="Rastgele sayı üreteci tohumu")
+    ap.add_argument("--isbns", type=int, default=500, help="Yazma trafiğinin ISBN havuzu")
+    ap.add_argument("--upstream-latency", type=float, default=0.02)
+    asyncio.run(run(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+# benchmarks/suite.py
+# Tekrarlanabilir performans paketi: sentetik katalog (Book/ComicBook/Magazine
+# karışık) üzerinde Library işlemlerini, ASGI üzerinden API'yi ve sahte Open
+# Library'ye karşı istemciyi ölçer; sonuçları JSON'a yazar. compare modu iki
+# sonuç dosyasını karşılaştırır ve eşiği aşan gerileme varsa 1 ile çıkar.
+#
+#   python benchmarks/suite.py run --sizes 10000 100000 --out bench.json
+#   python benchmarks/suite.py run --sizes 1000000 --only library --out big.json
+#   python benchmarks/suite.py compare base.json bench.json --threshold 0.2
+#   python benchmarks/suite.py run --only cli --cold-start-budget 150
+#
+# Aynı --seed ile katalog ve sorgu örnekleri birebir aynıdır. Karşılaştırma
+# varsayılan olarak medyan üzerinden yapılır (--stat min); ölçümler aynı
+# makinede alınmalıdır.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+
+from backends import JournalBackend
+from isbn import _isbn13_check
+from models import Book, Library
+
+
+# ---------- sentetik veri ----------
+def isbn13(i: int) -> str:
+    body = f"979{i:09d}"  # 979 öneki: gerçek ISBN'lerle çakışmasın
+    return body + _isbn13_check(body)
+
+
+def record(i: int, rnd: random.Random, authors: int) -> dict:
+    rec = {"title": f"Kitap {rnd.randrange(authors * 10)}", "author": f"Yazar {rnd.randrange(authors)}",
+           "isbn": isbn13(i)}
+    roll = rnd.random()
+    if roll < 0.1:
+        rec["illustrator"] = f"Çizer {rnd.randrange(500)}"
+        rec["type"] = "ComicBook"
+    elif roll < 0.2:
+        rec["issue_number"] = rnd.randrange(1, 500)
+        rec["type"] = "Magazine"
+    else:
+        rec["type"] = "Book"
+    return rec
+
+
+def write_catalogue(path: Path, n: int, seed: int) -> None:
+    """%80 Book, %10 ComicBook, %10 Magazine; yazar başına ~20 kitap. Akış halinde yazılır."""
+    rnd = random.Random(seed)
+    authors = max(1, n // 20)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(n):
+            if i:
+                f.write(",\n")
+            f.write(json.dumps(record(i, rnd, authors), ensure_ascii=False))
+        f.write("]")
+
+
+# ---------- ölçüm ----------
+def measure(fn: Callable[[], int], repeat: int) -> dict:
+    """fn bir tur çalıştırır ve yaptığı işlem sayısını döner; işlem başına süreler."""
+    per_op = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        ops = fn()
+        per_op.append((time.perf_counter() - t0) / max(ops, 1))
+    per_op.sort()
+    return {"unit": "s/op", "median": statistics.median(per_op), "min": per_op[0],
+            "max": per_op[-1], "runs": repeat}
+
+
+def open_library(path: Path, backend: str) -> Library:
+    if backend == "journal":
+        return Library(path, backend=JournalBackend(path))
+    if backend == "sqlite":
+        from sqlite_backend import migrate_json
+        db = path.with_suffix(".db")
+        if not db.exists():
+            migrate_json(path, db)
+        return Library(db)
+    return Library(path)
+
+
+def bench_library(path: Path, n: int, args, rnd: random.Random) -> Dict[str, dict]:
+    out = {}
+    lib = open_library(path, args.backend)
+    out["load_books"] = measure(lambda: (lib.load_books(), 1)[1], args.repeat)
+
+    sample = [isbn13(rnd.randrange(n)) for _ in range(args.lookups)]
+    books = [lib.find_book(i) for i in sample[:200]]
+    titles = [b.title for b in books]
+    authors = [b.author for b in books]
+    out["find_book"] = measure(lambda: sum(1 for i in sample if lib.find_book(i)), args.repeat)
+    out["find_by_title"] = measure(lambda: sum(1 for _ in map(lib.find_by_title, titles)), args.repeat)
+    out["list_by_author"] = measure(lambda: sum(1 for _ in map(lib.list_by_author, authors)), args.repeat)
+
+    # Her ekleme/silme kendi commit'ini yapar: backend'in gerçek yazım maliyeti
+    fresh = iter(range(n, n + 10 ** 9))
+
+    def add_round():
+        batch = [Book(f"Yeni {i}", "Yazar", isbn13(i)) for i in (next(fresh) for _ in range(args.writes))]
+        for b in batch:
+            lib.add_book(b)
+        added.extend(batch)
+        return len(batch)
+
+    def remove_round():
+        for _ in range(args.writes):
+            lib.remove_book(added.pop().isbn)
+        return args.writes
+
+    added: List[Book] = []
+    out["add_book"] = measure(add_round, args.repeat)
+    out["remove_book"] = measure(remove_round, args.repeat)
+    out["save_books"] = measure(lambda: (lib.save_books(), 1)[1], args.repeat)
+    lib.close()
+    return out
+
+
+def fake_openlibrary(latency: float) -> httpx.MockTransport:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if latency:
+            await asyncio.sleep(latency)
+        path = request.url.path
+        if path.startswith("/isbn/"):
+            return httpx.Response(200, json={"title": f"Uzak {path[6:19]}", "authors": [{"key": "/authors/OL1A"}]})
+        return httpx.Response(200, json={"name": "Sahte Yazar"})
+    return httpx.MockTransport(handler)
+
+
+def bench_api(path: Path, n: int, args, rnd: random.Random) -> Dict[str, dict]:
+    from api import create_app
+    from openlibrary_client import AsyncOpenLibraryClient
+
+    async def run() -> Dict[str, dict]:
+        upstream = AsyncOpenLibraryClient(transport=fake_openlibrary(args.upstream_latency), rate_limit=None)
+        app = create_app(str(path), ol_client=upstream)
+        out = {}
+        loop = asyncio.get_running_loop()
+        fresh = iter(range(2 * n, 2 * n + 10 ** 9))
+        posted: List[str] = []
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as http:
+            async def timed(round_fn) -> dict:
+                per_op = []
+                for _ in range(args.repeat):
+                    t0 = loop.time()
+                    ops = await round_fn()
+                    per_op.append((loop.time() - t0) / ops)
+                per_op.sort()
+                return {"unit": "s/op", "median": statistics.median(per_op), "min": per_op[0],
+                        "max": per_op[-1], "runs": args.repeat}
+
+            async def get_round():
+                for _ in range(args.requests):
+                    r = await http.get("/books", params={"limit": 100, "after": isbn13(rnd.randrange(n))})
+                    assert r.status_code == 200, r.status_code
+                return args.requests
+
+            async def post_round():
+                for _ in range(args.requests):
+                    isbn = isbn13(next(fresh))
+                    r = await http.post("/books", json={"isbn": isbn})
+                    assert r.status_code == 201, r.text
+                    posted.append(isbn)
+                return args.requests
+
+            async def delete_round():
+                for _ in range(args.requests):
+                    r = await http.delete(f"/books/{posted.pop()}")
+                    assert r.status_code == 204, r.status_code
+                return args.requests
+
+            out["GET /books?limit=100"] = await timed(get_round)
+            out["POST /books"] = await timed(post_round)
+            out["DELETE /books/{isbn}"] = await timed(delete_round)
+        await app.state.writer.stop()
+        await upstream.aclose()
+        app.state.lib.close()
+        return out
+
+    return asyncio.run(run())
+
+
+def bench_client(args) -> Dict[str, dict]:
+    from openlibrary_client import AsyncOpenLibraryClient
+
+    async def run() -> Dict[str, dict]:
+        client = AsyncOpenLibraryClient(transport=fake_openlibrary(args.upstream_latency), rate_limit=None)
+        loop = asyncio.get_running_loop()
+        fresh = iter(range(10 ** 8, 10 ** 9))
+        per_op = []
+        for _ in range(args.repeat):
+            isbns = [isbn13(next(fresh)) for _ in range(args.requests)]
+            t0 = loop.time()
+            for isbn in isbns:
+                await client.fetch_by_isbn(isbn)
+            per_op.append((loop.time() - t0) / len(isbns))
+        await client.aclose()
+        per_op.sort()
+        return {"fetch_by_isbn": {"unit": "s/op", "median": statistics.median(per_op), "min": per_op[0],
+                                  "max": per_op[-1], "runs": args.repeat}}
+
+    return asyncio.run(run())
+
+
+def bench_cli(path: Path, n: int, args, rnd: random.Random) -> Dict[str, dict]:
+    """
+    Soğuk açılış: her çağrı yeni bir `python main.py ...` sürecidir (betiklerin
+    gördüğü süre). `python_startup` yorumlayıcının kendi tabanıdır.
+    """
+    from snapshot import write_snapshot
+    from backends import iter_json_records
+    from isbn import isbn_key
+
+    main_py = str(Path(__file__).resolve().parent.parent / "main.py")
+    snap = path.with_suffix(".snap")
+    write_snapshot(snap, ((isbn_key(r["isbn"]), r) for r in iter_json_records(path)))
+    isbn = isbn13(rnd.randrange(n))
+    commands = {
+        "python_startup": [sys.executable, "-c", "pass"],
+        "help": [sys.executable, main_py, "--help"],
+        "find": [sys.executable, main_py, "--db", str(path), "find", isbn],
+        "find_snapshot": [sys.executable, main_py, "--snapshot", str(snap), "find", isbn],
+        "list_page": [sys.executable, main_py, "--snapshot", str(snap), "list", "--limit", "20"],
+    }
+    out = {}
+    for name, cmd in commands.items():
+        def once(cmd=cmd):
+            for _ in range(args.cli_runs):
+                subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+            return args.cli_runs
+        out[name] = measure(once, args.repeat)
+    return out
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run(args) -> int:
+    results: Dict[str, dict] = {}
+    groups = set(args.only or ("library", "api", "client", "cli"))
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as d:
+            rnd = random.Random(args.seed)
+            db = Path(d) / "library.json"
+            t0 = time.perf_counter()
+            write_catalogue(db, n, args.seed)
+            print(f"[n={n:,}] katalog {time.perf_counter() - t0:.1f} sn", file=sys.stderr)
+            if "library" in groups:
+                for name, res in bench_library(db, n, args, rnd).items():
+                    results[f"library.{name}[n={n}]"] = res
+            if "api" in groups:
+                for name, res in bench_api(db, n, args, rnd).items():
+                    results[f"api.{name}[n={n}]"] = res
+            if "cli" in groups:
+                for name, res in bench_cli(db, n, args, rnd).items():
+                    results[f"cli.{name}[n={n}]"] = res
+    if "client" in groups:
+        for name, res in bench_client(args).items():
+            results[f"client.{name}[latency={args.upstream_latency}]"] = res
+
+    report = {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "revision": git_revision(), "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                 "seed": args.seed, "backend": args.backend, "repeat": args.repeat},
+        "results": results,
+    }
+    for name, res in results.items():
+        print(f"{name:<48} {res['median'] * 1e6:12.1f} µs/op", file=sys.stderr)
+    over = check_budget(results, args.cold_start_budget)
+    if args.cold_start_budget is not None:
+        report["meta"]["cold_start_budget_ms"] = args.cold_start_budget
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.out:
+        Path(args.out).write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 1 if over else 0
+
+
+def check_budget(results: Dict[str, dict], budget_ms) -> int:
+    """
+    CLI çağrısının yorumlayıcı tabanına (python_startup) göre ek süresi (medyan,
+    ms) bütçeyi aşıyorsa raporlar; aşan sayısı döner. Taban çıkarıldığı için
+    bütçe makineden makineye daha az oynar.
+    """
+    if budget_ms is None:
+        return 0
+    over = 0
+    for name, res in results.items():
+        if not name.startswith("cli.") or name.startswith("cli.python_startup"):
+            continue
+        base = results.get("cli.python_startup" + name[name.index("["):], {"median": 0.0})
+        ms = (res["median"] - base["median"]) * 1e3
+        if ms > budget_ms:
+            over += 1
+            print(f"{name:<48} +{ms:7.1f} ms > bütçe {budget_ms:.0f} ms  BÜTÇE AŞILDI", file=sys.stderr)
+    return over
+
+
+def compare(args) -> int:
+    base = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    curr = json.loads(Path(args.current).read_text(encoding="utf-8"))["results"]
+    regressions = 0
+    for name in sorted(base.keys() & curr.keys()):
+        before, after = base[name][args.stat], curr[name][args.stat]
+        ratio = after / before if before else float("inf")
+        flag = ""
+        if ratio > 1 + args.threshold:
+            flag = "  GERİLEME"
+            regressions += 1
+        elif ratio < 1 - args.threshold:
+            flag = "  iyileşme"
+        print(f"{name:<48} {before * 1e6:12.1f} -> {after * 1e6:12.1f} µs/op  {ratio:6.2f}x{flag}")
+    for name in sorted(base.keys() - curr.keys()):
+        print(f"{name:<48} yeni sonuçta yok")
+    print(f"{regressions} gerileme (eşik %{args.threshold * 100:.0f})")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="Ölçümleri çalıştır ve JSON yaz")
+    r.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    r.add_argument("--only", nargs="+", choices=["library", "api", "client", "cli"])
+    r.add_argument("--backend", choices=["json", "journal", "sqlite"], default="json")
+    r.add_argument("--repeat", type=int, default=5, help="Her ölçümün tur sayısı")
+    r.add_argument("--lookups", type=int, default=10_000, help="Tur başına arama")
+    r.add_argument("--writes", type=int, default=5, help="Tur başına ekleme/silme (her biri bir commit)")
+    r.add_argument("--requests", type=int, default=50, help="Tur başına HTTP isteği / upstream çağrısı")
+    r.add_argument("--upstream-latency", type=float, default=0.0, help="Sahte Open Library gecikmesi (sn)")
+    r.add_argument("--cli-runs", type=int, default=10, help="Tur başına CLI süreci (soğuk açılış)")
+    r.add_argument("--cold-start-budget", type=float, metavar="MS",
+                   help="CLI çağrısı yorumlayıcı açılışına ek olarak bu kadar ms'yi aşarsa 1 ile çık")
+    r.add_argument("--seed", type=int, default=42)
+    r.add_argument("--out", help="Sonuç dosyası (yoksa stdout)")
+
+    c = sub.add_parser("compare", help="İki sonucu karşılaştır; gerileme varsa 1 ile çık")
+    c.add_argument("baseline")
+    c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=0.2, help="İzin verilen oran (0.2 = %%20 yavaşlama)")
+    c.add_argument("--stat", choices=["median", "min"], default="median",
+                   help="min gürültülü makinelerde daha kararlıdır")
+
+    args = ap.parse_args()
+    return run(args) if args.cmd == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
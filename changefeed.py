@@ -0,0 +1,120 @@
+# changefeed.py
+"""
+Library için sıralı değişiklik akışı (change feed).
+
+Bellekteki görünüme uygulanan her ekleme/silme, monoton artan bir sıra
+numarasıyla (seq) kaydedilir. Aşağı akıştaki kopyalar (arama, önbellekler,
+ayna örnekler) tüm kataloğu çekmek yerine bir kez snapshot alır, sonra yalnızca
+`seq`ten sonraki olayları uygular:
+
+    {"seq": 42, "op": "add", "key": "9780441172719", "book": {<kayıt>}}
+    {"seq": 43, "op": "remove", "key": "9780441172719"}
+
+Akış bellekte sınırlı bir halkadır (`retain` olay). Görünüm tam yeniden
+yüklendiğinde (başka süreç izlenemeyen bir değişiklik yaptı, snapshot sürümü
+değişti) delta ifade edilemez: `epoch` yenilenir ve eski imleçler geçersiz
+olur. İstemci epoch değişince ya da imleci halkadan düşmüşse (StaleCursor)
+yeniden snapshot almalıdır. Süreç yeniden başlayınca da epoch değişir.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections import deque
+from typing import TYPE_CHECKING, Deque, List, Optional, Tuple
+
+from isbn import isbn_key
+
+if TYPE_CHECKING:  # asyncio yalnızca bekleyen varken gerekir: CLI açılışına yük olmasın
+    import asyncio
+
+# (seq, op, kanonik anahtar, kayıt | None)
+Event = Tuple[int, str, str, Optional[dict]]
+
+
+class StaleCursor(Exception):
+    """İmleç bu akışla sürdürülemez (epoch değişti ya da olaylar halkadan düştü)."""
+
+
+class ChangeLog:
+    def __init__(self, retain: int = 10_000) -> None:
+        self._lock = threading.Lock()
+        self._events: Deque[Event] = deque(maxlen=retain)
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        self.seq = 0
+        self.oldest = 0  # bu seq'ten sonrası halkada (since >= oldest sürdürülebilir)
+        self.epoch = os.urandom(6).hex()
+
+    def record(self, ops) -> None:
+        """Backend işlemlerini ("add", kayıt) / ("remove", isbn) olay olarak ekler."""
+        with self._lock:
+            for op, payload in ops:
+                self.seq += 1
+                if op == "add":
+                    event = (self.seq, op, isbn_key(payload["isbn"]), payload)
+                else:
+                    event = (self.seq, op, isbn_key(payload), None)
+                if len(self._events) == self._events.maxlen:
+                    self.oldest = self._events[0][0]
+                self._events.append(event)
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    def reset(self) -> None:
+        """Görünüm baştan kuruldu: yeni epoch, halka boş. seq gerilemez."""
+        with self._lock:
+            self._events.clear()
+            self.oldest = self.seq
+            self.epoch = os.urandom(6).hex()
+            waiters, self._waiters = self._waiters, []
+        self._wake(waiters)
+
+    def since(self, seq: int, epoch: Optional[str] = None, limit: Optional[int] = None) -> List[Event]:
+        """`seq`ten sonraki olaylar (en fazla `limit`); sürdürülemiyorsa StaleCursor."""
+        with self._lock:
+            if (epoch is not None and epoch != self.epoch) or seq < self.oldest or seq > self.seq:
+                raise StaleCursor(f"imleç {seq} geçersiz (epoch {self.epoch}, en eski {self.oldest})")
+            if seq == self.seq:
+                return []
+            # Halka seq sırasında ve ardışık: başlangıç konumu doğrudan hesaplanır
+            start = seq - self._events[0][0] + 1
+            out = [self._events[i] for i in range(start, len(self._events))]
+        return out[:limit] if limit is not None else out
+
+    async def wait(self, seq: int, timeout: float) -> bool:
+        """`seq`ten yeni bir olay (ya da reset) gelene kadar en fazla `timeout` bekler."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._lock:
+            if self.seq > seq:
+                return True
+            self._waiters.append((loop, fut))
+        try:
+            await asyncio.wait_for(fut, timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._lock:
+                if (loop, fut) in self._waiters:
+                    self._waiters.remove((loop, fut))
+            return False
+
+    @staticmethod
+    def _wake(waiters) -> None:
+        # Olaylar yazıcıdan, refresh'ten ya da CLI thread'inden gelebilir
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_resolve, fut)
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+def event_json(event: Event) -> dict:
+    seq, op, key, record = event
+    out = {"seq": seq, "op": op, "key": key}
+    if record is not None:
+        out["book"] = record
+    return out
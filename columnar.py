@@ -0,0 +1,120 @@
+# columnar.py
+"""
+Büyük kataloglar için sütunlu kayıt deposu.
+
+Library'nin birincil `kanonik ISBN -> Book` sözlüğünün yerine geçebilen bir
+MutableMapping. Kitap nesneleri tutulmaz; her alan paralel dizilerde durur:
+
+- titles:   başlıklar (list[str])
+- authors:  yazar kimlikleri (array('I')) -> string tablosu
+- isbns:    saklandığı biçimde ISBN; kanonik anahtarla aynıysa aynı nesne paylaşılır
+- kinds:    tür kodu (array('B'))
+- extras:   yalnızca ComicBook/Magazine'in ek alanları (satır -> tuple)
+- author_keys: yalnızca yazar anahtarı olan satırlar (satır -> tuple)
+
+Book nesneleri erişimde tembelce üretilir (görünüm); aynı anahtar için her
+erişim yeni bir nesne döndürür. Silinen satırlar boş listeye alınıp yeniden
+kullanılır; yineleme sırası ekleme sırasıdır.
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import MutableMapping
+from dataclasses import fields
+from typing import Dict, Iterator, List, Tuple
+
+
+class StringTable:
+    """Tekrarlanan değerler (yazarlar) için string -> kimlik tablosu."""
+
+    def __init__(self) -> None:
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        sid = self._ids.get(value)
+        if sid is None:
+            sid = self._ids[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return sid
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class ColumnarStore(MutableMapping):
+    def __init__(self, kinds: Dict[str, type]) -> None:
+        """kinds: tür adı -> sınıf (ör. {"Book": Book, ...}); ilk sınıf temel türdür."""
+        self._classes: Tuple[type, ...] = tuple(kinds.values())
+        self._codes = {cls: i for i, cls in enumerate(self._classes)}
+        # title, author, isbn sütunlarda; geri kalan konumsal alanlar extras'a
+        self._extra_names = {cls: tuple(f.name for f in fields(cls) if not f.kw_only)[3:]
+                             for cls in self._classes}
+        self._rows: Dict[str, int] = {}  # kanonik ISBN -> satır (ekleme sırası)
+        self._free: List[int] = []
+        self.titles: List[str] = []
+        self.authors = array("I")
+        self.isbns: List[str] = []
+        self.kinds = array("B")
+        self.extras: Dict[int, tuple] = {}
+        self.author_keys: Dict[int, tuple] = {}
+        self.strings = StringTable()
+
+    # ---------- MutableMapping ----------
+    def __getitem__(self, key: str):
+        return self._materialize(self._rows[key])
+
+    def __setitem__(self, key: str, book) -> None:
+        if key in self._rows:
+            del self[key]
+        cls = type(book)
+        code = self._codes.get(cls)
+        if code is None:
+            raise TypeError(f"Sütunlu depoda desteklenmeyen tür: {cls.__name__}")
+        extra = tuple(getattr(book, n) for n in self._extra_names[cls])
+        isbn = key if book.isbn == key else book.isbn
+        author = self.strings.intern(book.author)
+        if self._free:
+            row = self._free.pop()
+            self.titles[row], self.authors[row], self.isbns[row], self.kinds[row] = (
+                book.title, author, isbn, code)
+        else:
+            row = len(self.titles)
+            self.titles.append(book.title)
+            self.authors.append(author)
+            self.isbns.append(isbn)
+            self.kinds.append(code)
+        if extra:
+            self.extras[row] = extra
+        if book.author_keys:
+            self.author_keys[row] = book.author_keys
+        self._rows[key] = row
+
+    def __delitem__(self, key: str) -> None:
+        row = self._rows.pop(key)
+        self.titles[row] = ""
+        self.isbns[row] = ""
+        self.extras.pop(row, None)
+        self.author_keys.pop(row, None)
+        self._free.append(row)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows
+
+    def get(self, key, default=None):
+        row = self._rows.get(key)
+        return default if row is None else self._materialize(row)
+
+    # ---------- yardımcılar ----------
+    def _materialize(self, row: int):
+        cls = self._classes[self.kinds[row]]
+        author = self.strings.values[self.authors[row]]
+        return cls(self.titles[row], author, self.isbns[row], *self.extras.get(row, ()),
+                   author_keys=self.author_keys.get(row, ()))
@@ -0,0 +1,233 @@
+# dump_ingest.py
+"""
+Open Library toplu döküm dosyalarından çevrimdışı katalog kurma.
+
+ISBN başına HTTP isteği milyonlarca edition için ölçeklenmez. Bu modül
+https://openlibrary.org/developers/dumps adresindeki edition/yazar dökümlerini
+yerel diskten akış halinde okur; ağ kullanmaz.
+
+Biçimler (gzip'li ya da düz):
+- Open Library TSV: `tür \\t anahtar \\t revizyon \\t tarih \\t JSON`
+- JSON satırları: her satır bir kayıt (`{"key": ..., ...}`)
+
+Boru hattı (her adım bir üreteç, bellek parça boyutuyla sınırlı):
+
+    satırlar -> parçalar (chunk_size) -> işçi süreçlerde JSON ayrıştırma/süzme
+             -> yazar birleştirme (disk indeksi) -> Library'ye parça başına tek commit
+
+Yazar indeksi metadata önbelleğinin sqlite dosyasıdır (`<db>.cache.sqlite`):
+yazar dökümü oraya toplu yazılır, edition'lar yazar isimlerini oradan alır.
+Aynı dosyayı çevrimiçi istemci de kullanır; Open Library yanıt vermediğinde
+süresi dolmuş kayıtlar da yedek olarak sunulur (bkz. openlibrary_client.py).
+
+    python main.py ingest-dump --authors ol_dump_authors.txt.gz \\
+        --editions ol_dump_editions.txt.gz --isbns isbns.txt
+"""
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from authors import SEPARATOR
+from isbn import canonical_isbn
+from metadata_cache import AUTHOR, EDITION, MetadataCache
+from models import Book, Library
+
+EDITION_TYPE = "/type/edition"
+AUTHOR_TYPE = "/type/author"
+
+# (kanonik isbn, başlık, yazar anahtarları)
+Edition = Tuple[str, str, Tuple[str, ...]]
+
+# İşçi süreç durumu (initializer ile bir kez kurulur; görev başına taşınmaz)
+_WANTED: Optional[frozenset] = None
+
+
+# ---------- okuma ----------
+def read_lines(path: str | Path) -> Iterator[bytes]:
+    """Döküm satırları; `.gz` uzantılıysa akış halinde açılır."""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rb") as f:
+        yield from f
+
+
+def chunks(lines: Iterable[bytes], size: int) -> Iterator[List[bytes]]:
+    it = iter(lines)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _record(line: bytes, kind: str) -> Optional[dict]:
+    """Tek satırı çözer; başka türden ya da bozuk satır için None."""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        if line.startswith(b"{"):
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                return None
+            rtype = data.get("type") or kind
+            if isinstance(rtype, dict):  # {"key": "/type/edition"}
+                rtype = rtype.get("key", kind)
+        else:
+            rtype, _key, _rev, _modified, payload = line.split(b"\t", 4)
+            rtype = rtype.decode()
+            if rtype != kind:  # türü JSON'u çözmeden ele
+                return None
+            data = json.loads(payload)
+    except ValueError:
+        return None
+    return data if rtype == kind and isinstance(data, dict) else None
+
+
+# ---------- işçi süreçte çalışan ayrıştırıcılar ----------
+def _init_worker(wanted: Optional[frozenset]) -> None:
+    global _WANTED
+    _WANTED = wanted
+
+
+def parse_authors(lines: List[bytes]) -> List[Tuple[str, str]]:
+    out = []
+    for line in lines:
+        data = _record(line, AUTHOR_TYPE)
+        if data is None:
+            continue
+        name = data.get("name") or data.get("personal_name")
+        if data.get("key") and name:
+            out.append((data["key"], name))
+    return out
+
+
+def parse_editions(lines: List[bytes]) -> List[Edition]:
+    out = []
+    for line in lines:
+        if b'"isbn_' not in line:  # ISBN'siz edition: JSON'u hiç çözme
+            continue
+        data = _record(line, EDITION_TYPE)
+        if data is None or not data.get("title"):
+            continue
+        isbn = None
+        for raw in (data.get("isbn_13") or []) + (data.get("isbn_10") or []):
+            key = canonical_isbn(str(raw))
+            if key is not None and (_WANTED is None or key in _WANTED):
+                isbn = key
+                break
+        if isbn is None:
+            continue
+        keys = []
+        for a in data.get("authors") or []:
+            key = a.get("key") or (a.get("author") or {}).get("key")  # iki biçim de var
+            if key and key not in keys:
+                keys.append(key)
+        out.append((isbn, data["title"], tuple(keys)))
+    return out
+
+
+def parallel_map(fn: Callable, items: Iterable, workers: int, wanted: Optional[frozenset] = None) -> Iterator:
+    """
+    `fn`i parçalara süreç havuzunda uygular; sıra korunur. Aynı anda en fazla
+    2 × workers parça bellekte bekler (Pool.imap girdinin tamamını okurdu).
+    workers=0: aynı süreçte çalışır.
+    """
+    if workers <= 0:
+        _init_worker(wanted)
+        try:
+            yield from map(fn, items)
+        finally:
+            _init_worker(None)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(wanted,)) as pool:
+        window = deque()
+        for item in items:
+            window.append(pool.submit(fn, item))
+            if len(window) >= workers * 2:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+# ---------- yükleme ----------
+def ingest_authors(path: str | Path, cache: MetadataCache, workers: int = 0,
+                   chunk_size: int = 20_000) -> int:
+    """Yazar dökümünü önbelleğin disk indeksine yazar; yazılan yazar sayısı döner."""
+    total = 0
+    for pairs in parallel_map(parse_authors, chunks(read_lines(path), chunk_size), workers):
+        total += cache.put_many(AUTHOR, pairs)
+    return total
+
+
+def ingest_editions(path: str | Path, lib: Library, cache: MetadataCache,
+                    isbns: Optional[Iterable[str]] = None, workers: int = 0, chunk_size: int = 20_000,
+                    cache_editions: bool = False,
+                    progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+    """
+    Edition dökümünü Library'ye yükler. `isbns` verilirse yalnızca o ISBN'ler
+    (10/13 haneli, tireli yazımlar kanonikleştirilir) alınır. Yazar isimleri
+    önbellek indeksinden gelir; bulunamayan yazarın anahtarı düşer, hiçbiri
+    yoksa yazar "Unknown" olur (çevrimiçi istemciyle aynı kural).
+    cache_editions=True: sonuçlar edition önbelleğine de yazılır.
+    Dönüş: {"matched", "added", "duplicate"}.
+    """
+    wanted = None
+    if isbns is not None:
+        wanted = frozenset(filter(None, (canonical_isbn(i.strip()) for i in isbns)))
+    counts = {"matched": 0, "added": 0, "duplicate": 0}
+    for editions in parallel_map(parse_editions, chunks(read_lines(path), chunk_size), workers, wanted):
+        results = []
+        with lib.batch():  # parça başına tek commit
+            for isbn, title, keys in editions:
+                names, author_keys = [], []
+                for key in keys:
+                    name = cache.get_author(key, allow_stale=True)
+                    if isinstance(name, str):
+                        names.append(name)
+                        author_keys.append(key)
+                result = {"title": title, "author": SEPARATOR.join(names) if names else "Unknown",
+                          "isbn": isbn, "author_keys": author_keys}
+                results.append((isbn, result))
+                added = lib.add_book(Book(title=title, author=result["author"], isbn=isbn,
+                                          author_keys=author_keys))
+                counts["added" if added else "duplicate"] += 1
+        counts["matched"] += len(editions)
+        if cache_editions and results:
+            cache.put_many(EDITION, results)
+        if progress is not None:
+            progress(counts)
+    return counts
+
+
+def run(args) -> int:
+    """`python main.py ingest-dump ...` girişi; sonuç sayıları stdout'a JSON olarak yazılır."""
+    cache = MetadataCache(args.cache or Path(args.db).with_suffix(".cache.sqlite"))
+    lib = Library(args.db)
+    workers = args.workers if args.workers is not None else (os.cpu_count() or 1)
+    try:
+        summary = {}
+        if args.authors:
+            summary["authors"] = ingest_authors(args.authors, cache, workers, args.chunk_size)
+            print(f"Yazarlar: {summary['authors']}", file=sys.stderr)
+        if args.editions:
+            isbns = None
+            if args.isbns:
+                with open(args.isbns, encoding="utf-8") as f:
+                    isbns = [line for line in f if line.strip() and not line.lstrip().startswith("#")]
+            summary.update(ingest_editions(
+                args.editions, lib, cache, isbns=isbns, workers=workers, chunk_size=args.chunk_size,
+                cache_editions=args.cache_editions,
+                progress=lambda c: print(f"{c['matched']} edition işlendi: {c}", file=sys.stderr)))
+    finally:
+        lib.close()
+        cache.close()
+    print(json.dumps(summary))
+    return 0
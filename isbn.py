@@ -0,0 +1,85 @@
+# isbn.py
+"""
+ISBN normalizasyonu: tek kanonik anahtar (ISBN-13).
+
+- "978-0441172719", "978 0441172719", "0441172717" → "9780441172719"
+- Checksum doğrulanır; geçersiz girdi için `canonical_isbn` None döner.
+- `isbn_key` indeks anahtarıdır: geçerli ISBN'ler için ISBN-13, Stage 1'deki
+  serbest kimlikler (ör. "1234567890" gibi checksum'ı tutmayanlar) için
+  ayırıcıları temizlenmiş hali.
+
+Sıcak yolda regex yok: ayırıcılar önceden derlenmiş `str.translate` tablosuyla
+silinir, sonuçlar LRU önbelleğinde tutulur.
+"""
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional
+
+# Kullanıcıların ISBN yazarken kullandığı ayırıcılar (tire çeşitleri, boşluk, nokta)
+_SEPARATORS = str.maketrans("", "", " -‐‑‒–—−._/\t")
+
+
+def clean(raw: str) -> str:
+    """Ayırıcıları siler, sondaki 'x'i büyütür. Doğrulama yapmaz."""
+    s = (raw or "").strip().translate(_SEPARATORS)
+    if s.endswith("x"):
+        s = s[:-1] + "X"
+    return s
+
+
+def _isbn10_valid(s: str) -> bool:
+    if not s[:9].isdigit() or not (s[9].isdigit() or s[9] == "X"):
+        return False
+    total = sum((10 - i) * int(c) for i, c in enumerate(s[:9]))
+    total += 10 if s[9] == "X" else int(s[9])
+    return total % 11 == 0
+
+
+def _isbn13_check(digits12: str) -> str:
+    if digits12.isascii():
+        # Bayt toplamları C'de: tek/çift konumlar ayrı toplanır, ASCII '0' (48) ofseti düşülür
+        b = digits12.encode("ascii")
+        total = sum(b[0::2]) + 3 * sum(b[1::2]) - 48 * (len(b[0::2]) + 3 * len(b[1::2]))
+    else:  # Unicode rakamlar (ör. Arapça-Hint) int() ile
+        total = sum(int(c) * (3 if i % 2 else 1) for i, c in enumerate(digits12))
+    return str((10 - total % 10) % 10)
+
+
+@lru_cache(maxsize=65536)
+def canonical_isbn(raw: str) -> Optional[str]:
+    """Geçerli ISBN-10/13 → ISBN-13; aksi halde None."""
+    s = clean(raw)
+    if len(s) == 13:
+        if s.isdigit() and s[:3] in ("978", "979") and _isbn13_check(s[:12]) == s[12]:
+            return s
+        return None
+    if len(s) == 10 and _isbn10_valid(s):
+        body = "978" + s[:9]
+        return body + _isbn13_check(body)
+    return None
+
+
+def isbn_key(raw: str) -> str:
+    """İndeks/tekrar kontrolü anahtarı: kanonik ISBN-13 ya da temizlenmiş kimlik."""
+    # Ayırıcısız 13 rakam ya kanoniktir ya da checksum'ı tutmayan kimlik; iki
+    # durumda da anahtar kendisidir. Kayıtların çoğu böyle saklanır: lazy açılış
+    # taramasında checksum ve önbellek maliyeti atlanır.
+    if len(raw) == 13 and raw.isdigit() and raw.isascii():
+        return raw
+    return _isbn_key(raw)
+
+
+@lru_cache(maxsize=65536)
+def _isbn_key(raw: str) -> str:
+    return canonical_isbn(raw) or clean(raw)
+
+
+def to_isbn10(isbn13: str) -> Optional[str]:
+    """978 önekli ISBN-13'ün ISBN-10 karşılığı (979 için yok)."""
+    s = canonical_isbn(isbn13)
+    if s is None or not s.startswith("978"):
+        return None
+    body = s[3:12]
+    check = (11 - sum((10 - i) * int(c) for i, c in enumerate(body)) % 11) % 11
+    return body + ("X" if check == 10 else str(check))
@@ -0,0 +1,325 @@
+# jobs.py
+"""
+Arka planda metadata çekme ve zenginleştirme iş kuyruğu.
+
+POST /books'un asenkron modunda ISBN doğrulanır, kalıcı kuyruğa yazılır ve
+istek 202 + iş kimliğiyle hemen döner; Open Library gecikmesi yanıt süresine
+girmez. İşler:
+
+- "add":    ISBN'i çek ve kitabı ekle.
+- "enrich": kayıtlı kitabı yeniden çek; yazarı artık çözülebiliyorsa
+            ("Unknown" değilse) kaydı günceller.
+
+Kuyruk sqlite dosyasıdır (JobStore): süreç yeniden başlasa da bekleyen işler
+kaybolmaz. Aynı dosyayı birden çok süreç (gunicorn worker'ları) paylaşabilir:
+iş alma `BEGIN IMMEDIATE` altında tek transaction'dır, bir iş tek bir store'a
+verilir. Alınan iş `lease` saniyelik kira taşır; sahibi bu sürede bitirmezse
+(süreç çöktü) kira dolunca herhangi bir store onu yeniden alır. Kirası dolmuş
+bir işin eski sahibinin geç gelen sonucu yazılmaz.
+
+EnrichmentWorker `workers` adet görevle kuyruğu boşaltır: her görev sırası
+gelmiş işlerden en fazla `batch_size` kadarını alır, hepsini tek
+`fetch_many` ile çeker ve sonuçları yazıcıya (writer.py) tek grup olarak
+gönderir. Servis yanıt veremezse iş üstel geri çekilmeyle yeniden kuyruğa
+girer; `max_attempts` denemeden sonra "failed" olur.
+
+JobStore senkron sqlite'tır (meşgul kuyrukta `timeout` kadar bekleyebilir); worker
+ve ekleme yöntemleri onu `asyncio.to_thread` ile çağırır, event loop bloklanmaz.
+
+Durumlar: queued | running | done | duplicate | not_found | unchanged | failed
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import replace
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from isbn import isbn_key
+from metrics import JOBS
+from models import Book, Library
+from resilience import UpstreamError
+from writer import CommitQueue
+
+ADD = "add"
+ENRICH = "enrich"
+UNKNOWN_AUTHOR = "Unknown"  # openlibrary_client yazar çözülemeyince bunu yazar
+
+QUEUED, RUNNING = "queued", "running"
+STATUSES = (QUEUED, RUNNING, "done", "duplicate", "not_found", "unchanged", "failed")
+
+_COLUMNS = "id, kind, isbn, status, attempts, error, result, created, updated"
+
+
+class JobStore:
+    """Kalıcı iş tablosu; tüm yöntemler thread-safe ve kısa sürelidir."""
+
+    def __init__(self, path: str | Path | None = None, clock: Callable[[], float] = time.time,
+                 lease: float = 120.0) -> None:
+        """lease: alınan işin sahibine ayrıldığı süre (sn); dolunca iş yeniden alınabilir."""
+        self.clock = clock
+        self.lease = lease
+        self._owner = os.urandom(6).hex()  # bu store'un aldığı işlerdeki imzası
+        self._lock = threading.Lock()
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path) if path is not None else ":memory:", timeout=30.0,
+                                   check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, isbn TEXT NOT NULL, status TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0, not_before REAL NOT NULL, error TEXT, result TEXT,"
+            " created REAL NOT NULL, updated REAL NOT NULL, owner TEXT, lease_until REAL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "lease_until" not in columns:  # kiralardan önce oluşturulmuş kuyruk
+            self._db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            self._db.execute("ALTER TABLE jobs ADD COLUMN lease_until REAL")
+            self._db.execute("UPDATE jobs SET lease_until = 0 WHERE status = ?", (RUNNING,))
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, not_before)")
+        self._db.commit()
+
+    def enqueue(self, kind: str, isbn: str) -> dict:
+        """İş ekler; aynı tür ve ISBN için bekleyen iş varsa onu döndürür."""
+        now = self.clock()
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE kind = ? AND isbn = ? AND status IN (?, ?)",
+                (kind, isbn, QUEUED, RUNNING)).fetchone()
+            if row is None:
+                job_id = os.urandom(8).hex()
+                self._db.execute(
+                    "INSERT INTO jobs (id, kind, isbn, status, not_before, created, updated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)", (job_id, kind, isbn, QUEUED, now, now, now))
+                self._db.commit()
+                row = (job_id, kind, isbn, QUEUED, 0, None, None, now, now)
+        return _job(row)
+
+    def claim(self, limit: int) -> List[dict]:
+        """
+        Sırası gelmiş en eski `limit` işi (ve kirası dolmuş "running" işleri) bu
+        store adına kiralayıp döndürür. Seçim ve güncelleme tek yazma
+        transaction'ıdır: iki süreç aynı işi alamaz.
+        """
+        now = self.clock()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    f"SELECT {_COLUMNS} FROM jobs WHERE (status = ? AND not_before <= ?)"
+                    " OR (status = ? AND lease_until <= ?) ORDER BY not_before, created LIMIT ?",
+                    (QUEUED, now, RUNNING, now, limit)).fetchall()
+                if rows:
+                    self._db.executemany(
+                        "UPDATE jobs SET status = ?, owner = ?, lease_until = ?, updated = ? WHERE id = ?",
+                        [(RUNNING, self._owner, now + self.lease, now, r[0]) for r in rows])
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._db.commit()
+        return [_job(r) for r in rows]
+
+    def finish(self, job_id: str, status: str, result: Optional[dict] = None,
+               error: Optional[str] = None) -> None:
+        """İşi sonuçlandırır; kira başka bir store'a geçtiyse yazmaz."""
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, attempts = attempts + 1, updated = ?"
+                " WHERE id = ? AND status = ? AND owner = ?",
+                (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+                 error, self.clock(), job_id, RUNNING, self._owner))
+            self._db.commit()
+
+    def retry(self, job_id: str, error: str, not_before: float) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, attempts = attempts + 1, not_before = ?, updated = ?"
+                " WHERE id = ? AND status = ? AND owner = ?",
+                (QUEUED, error, not_before, self.clock(), job_id, RUNNING, self._owner))
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job(row) if row is not None else None
+
+    def next_due(self) -> Optional[float]:
+        """En yakın bekleyen işin (ya da dolacak kiranın) zamanı; yoksa None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT MIN(CASE WHEN status = ? THEN not_before ELSE lease_until END)"
+                " FROM jobs WHERE status IN (?, ?)", (QUEUED, QUEUED, RUNNING)).fetchone()
+        return row[0]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _job(row) -> dict:
+    job_id, kind, isbn, status, attempts, error, result, created, updated = row
+    return {"id": job_id, "kind": kind, "isbn": isbn, "status": status, "attempts": attempts,
+            "error": error, "book": json.loads(result) if result else None,
+            "created": created, "updated": updated}
+
+
+def _book_out(b: Book) -> dict:
+    return {"title": b.title, "author": b.author, "isbn": b.isbn, "kind": b.__class__.__name__}
+
+
+class EnrichmentWorker:
+    def __init__(self, lib: Library, writer: CommitQueue, upstream: Callable[[], object],
+                 store: Optional[JobStore] = None, workers: int = 2, batch_size: int = 50,
+                 max_attempts: int = 5, backoff: float = 2.0, max_backoff: float = 300.0,
+                 poll: float = 5.0) -> None:
+        """
+        upstream: çağrıldığında AsyncOpenLibraryClient döndürür (istemci
+        çalışırken değiştirilebilsin diye fonksiyon).
+        poll: kuyruk boşken en fazla bu kadar uyunur (sn).
+        """
+        self.lib = lib
+        self.writer = writer
+        self.upstream = upstream
+        self.store = store if store is not None else JobStore()
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll = poll
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    # ---------- iş ekleme ----------
+    async def submit_add(self, isbn: str) -> dict:
+        job = await asyncio.to_thread(self.store.enqueue, ADD, isbn_key(isbn))
+        self._notify()
+        return job
+
+    async def submit_enrich(self, isbns) -> List[dict]:
+        keys = [isbn_key(i) for i in isbns]
+        jobs = await asyncio.to_thread(lambda: [self.store.enqueue(ENRICH, k) for k in keys])
+        self._notify()
+        return jobs
+
+    async def enrich_unknown(self) -> List[dict]:
+        """Yazarı "Unknown" kalmış tüm kitaplar için zenginleştirme işi açar."""
+        return await self.submit_enrich([b.isbn for b in self.lib.list_by_author(UNKNOWN_AUTHOR)])
+
+    def export_metrics(self) -> None:
+        counts = self.store.counts()
+        for status in STATUSES:
+            JOBS.set(counts.get(status, 0), status=status)
+
+    # ---------- yaşam döngüsü ----------
+    def start(self) -> None:
+        """Havuzu çalışan loop üzerinde başlatır (zaten çalışıyorsa bir şey yapmaz)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and all(not t.done() for t in self._tasks):
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._tasks = [loop.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _notify(self) -> None:
+        self.start()
+        self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()  # claim'den önce: arada gelen iş uyandırmayı kaçırmaz
+            batch = await asyncio.to_thread(self.store.claim, self.batch_size)
+            if batch:
+                await self._process(batch)
+                continue
+            due = await asyncio.to_thread(self.store.next_due)
+            timeout = self.poll if due is None else min(self.poll, max(0.0, due - self.store.clock()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _process(self, batch: List[dict]) -> None:
+        try:
+            fetched = await self.upstream().fetch_many([job["isbn"] for job in batch])
+        except Exception as exc:  # beklenmeyen istemci hatası: tüm grup yeniden denenir
+            fetched = [UpstreamError(str(exc))] * len(batch)
+
+        now = self.store.clock()  # aynı gruptan düşenler yine birlikte denensin
+        ready, failed = [], []
+        for job, data in zip(batch, fetched):
+            if isinstance(data, Exception):
+                failed.append((job, data))
+            else:
+                ready.append((job, data))
+        if failed:
+            await asyncio.to_thread(self._retry_all, failed, now)
+        if not ready:
+            return
+
+        def apply(lib: Library):
+            return [(job, *self._apply(lib, job, data)) for job, data in ready]
+
+        try:
+            outcomes = await self.writer.submit(apply)
+        except Exception as exc:  # commit başarısız: bellek diske geri döndü, tekrar dene
+            await asyncio.to_thread(self._retry_all, [(job, exc) for job, _ in ready], now)
+            return
+        await asyncio.to_thread(self._finish_all, outcomes)
+
+    def _finish_all(self, outcomes) -> None:
+        for job, status, book in outcomes:
+            self.store.finish(job["id"], status, result=_book_out(book) if book is not None else None)
+
+    @staticmethod
+    def _apply(lib: Library, job: dict, data: Optional[dict]):
+        """Yazıcıda çalışır; (durum, kitap | None) döndürür."""
+        current = lib.find_book(job["isbn"])
+        if job["kind"] == ADD:
+            if current is not None:
+                return "duplicate", current
+            if not data:
+                return "not_found", None
+            b = Book(title=data["title"], author=data["author"], isbn=data["isbn"],
+                     author_keys=data.get("author_keys", ()))
+            if not lib.add_book(b):
+                return "duplicate", lib.find_book(b.isbn)
+            return "done", b
+        # ENRICH: yalnızca yazar bilgisi güncellenir; tür ve diğer alanlar korunur
+        if current is None:
+            return "not_found", None
+        if not data or data["author"] == UNKNOWN_AUTHOR or data["author"] == current.author:
+            return "unchanged", current
+        b = replace(current, author=data["author"], author_keys=tuple(data.get("author_keys", ())))
+        lib.replace_book(b)
+        return "done", b
+
+    def _retry_all(self, failed, now: float) -> None:
+        for job, exc in failed:
+            self._retry(job, exc, now)
+
+    def _retry(self, job: dict, exc: Exception, now: float) -> None:
+        attempts = job["attempts"] + 1
+        if attempts >= self.max_attempts:
+            self.store.finish(job["id"], "failed", error=str(exc))
+            return
+        delay = min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+        retry_after = getattr(exc, "retry_after", None)
+        self.store.retry(job["id"], str(exc), now + max(delay, retry_after or 0))
@@ -0,0 +1,100 @@
+# lazystore.py
+"""
+library.json için tembel (mmap) kayıt deposu.
+
+Hızlı açılış modu: dosya belleğe eşlenir ve tek bir regex taramasıyla her
+kaydın bayt aralığı bulunur; yalnızca `kanonik ISBN -> (başlangıç, bitiş)`
+tutulur. Kayıtlar erişimde çözülür (json + Book). Açılışta Book nesnesi ve
+ikincil indeks kurulmaz.
+
+Sonradan eklenen/değiştirilen kitaplar bellekte (overlay) durur; silinenler
+ofset tablosundan düşer. Dosya yeniden yazılsa bile (atomik rename) eşleme eski
+içeriği görmeye devam eder; depo, yüklendiği andaki snapshot + overlay'dir.
+
+Varsayım: kayıtlar düz JSON nesneleridir (iç içe nesne yok), `isbn` alanı
+zorunludur — Library'nin yazdığı biçim budur.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import re
+from array import array
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional
+
+# "Döngü açılmış" desenler: karakter başına alternatif denemez, büyük dosyada hızlıdır
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_RECORD = re.compile(rb'\{[^"{}]*(?:' + _STRING + rb'[^"{}]*)*\}')
+_ISBN = re.compile(rb'"isbn"\s*:\s*(' + _STRING + rb')')
+
+
+class LazyStore(MutableMapping):
+    def __init__(self, path: str | Path, decode: Callable[[dict], object],
+                 key: Callable[[str], str]) -> None:
+        """
+        decode: kayıt dict -> Book (models.book_from_record)
+        key:    saklanan ISBN -> kanonik anahtar (isbn.isbn_key)
+        """
+        self.path = Path(path)
+        self._decode = decode
+        self._buf: Optional[mmap.mmap] = None
+        self._starts = array("Q")
+        self._ends = array("Q")
+        self._rows: Dict[str, int] = {}         # anahtar -> ofset satırı
+        self._overlay: Dict[str, object] = {}   # sonradan eklenenler (Book)
+        self._scan(key)
+
+    def _scan(self, key: Callable[[str], str]) -> None:
+        with open(self.path, "rb") as f:
+            try:
+                self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # boş dosya eşlenemez
+                return
+        for m in _RECORD.finditer(self._buf):
+            found = _ISBN.search(self._buf, m.start(), m.end())
+            if found is None:
+                raise ValueError(f"isbn alanı olmayan kayıt (bayt {m.start()})")
+            raw = found.group(1)
+            k = key(json.loads(raw) if b"\\" in raw else raw[1:-1].decode("utf-8"))
+            row = self._rows.pop(k, None)  # aynı anahtar tekrar ederse sonuncusu kazanır
+            if row is None:
+                row = len(self._starts)
+                self._starts.append(m.start())
+                self._ends.append(m.end())
+            else:
+                self._starts[row], self._ends[row] = m.start(), m.end()
+            self._rows[k] = row
+
+    # ---------- MutableMapping ----------
+    def __getitem__(self, key: str):
+        book = self._overlay.get(key)
+        if book is not None:
+            return book
+        row = self._rows[key]
+        raw = self._buf[self._starts[row]:self._ends[row]]
+        return self._decode(json.loads(raw))
+
+    def __setitem__(self, key: str, book) -> None:
+        self._rows.pop(key, None)
+        self._overlay[key] = book
+
+    def __delitem__(self, key: str) -> None:
+        if self._overlay.pop(key, None) is None:
+            del self._rows[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._rows
+        yield from self._overlay
+
+    def __len__(self) -> int:
+        return len(self._rows) + len(self._overlay)
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows or key in self._overlay
+
+    def close(self) -> None:
+        if self._buf is not None:
+            self._buf.close()
+            self._buf = None
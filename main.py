@@ -1,5 +1,47 @@
 # main.py
-from models import Book, ComicBook, Magazine, Library
+"""
+Kütüphane CLI. Argümansız: etkileşimli menü. Betikler için alt komutlar:
+
+    python main.py list [--author A] [--title T] [--kind K] [--limit N] [--json]
+    python main.py find 9780441172719
+    python main.py add 9780441172719                # Open Library'den
+    python main.py add 9780441172719 --title Dune --author "Frank Herbert"
+    python main.py remove 9780441172719
+    python main.py search "dune herbert" --limit 5
+    python main.py export -o yedek.json
+
+Açılış ucuz tutulur: ağır modüller (httpx, models, sqlite) yalnızca kullanan
+komutta yüklenir; katalog lazy modda açılır (yalnızca ISBN -> bayt aralığı
+tablosu, bkz. lazystore.py). `--snapshot library.snap` okumaları ikili
+snapshot'ın sıralı tablosundan, `.db` veritabanında find/list SQLite
+indekslerinden yanıtlar; katalog belleğe yüklenmez.
+
+Çıkış kodları: 0 başarı, 1 bulunamadı / zaten var, 75 Open Library geçici
+olarak yanıt vermiyor (tekrar denenebilir).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from models import Library
+
+EXIT_NOT_FOUND = 1
+EXIT_TEMPFAIL = 75  # sysexits EX_TEMPFAIL
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def make_client(db_path, **options):
+    """DB dosyasının yanındaki metadata önbelleğiyle Open Library istemcisi (API ile aynı yerleşim)."""
+    from pathlib import Path
+
+    from metadata_cache import MetadataCache
+    from openlibrary_client import OpenLibraryClient
+    return OpenLibraryClient(cache=MetadataCache(Path(db_path).with_suffix(".cache.sqlite")), **options)
+
 
 def print_menu():
     print("\n--- Kütüphane ---")
@@ -9,7 +51,8 @@ def print_menu():
     print("4) Kitap Ara (ISBN)")
     print("5) Başlığa Göre Ara")          # YENİ
     print("6) Yazara Göre Listele")       # YENİ
-    print("7) Çıkış")
+    print("7) Tam Metin Ara (başlık/yazar)")
+    print("8) Çıkış")
 
 
 def prompt_book_type() -> str:
@@ -22,6 +65,8 @@ def prompt_book_type() -> str:
     return mapping.get(choice, "Book")
 
 def handle_add(lib: Library):
+    from models import Book, ComicBook, Magazine
+
     kind = prompt_book_type()
 
     title = input("Başlık: ").strip()
@@ -47,8 +92,15 @@ def handle_add(lib: Library):
     print("Eklendi ✅" if ok else "Eklenemedi ❌ (Aynı ISBN zaten var mı / ISBN boş mu?)")
 
 def handle_add_auto(lib: Library):
+    from resilience import UpstreamError
+
     isbn = input("ISBN: ").strip()
-    ok = lib.add_book(isbn)  # <-- sadece ISBN string veriyoruz
+    client = make_client(lib.db_path)
+    try:
+        ok = lib.add_book(isbn, client=client)  # <-- sadece ISBN string veriyoruz
+    except UpstreamError as exc:
+        print(f"Eklenemedi ❌ ({exc}; daha sonra tekrar deneyin)")
+        return
     print("Eklendi ✅ (Open Library)" if ok else "Eklenemedi ❌ (İnternet/ISBN bulunamadı ya da ISBN zaten var)")
 
 def handle_remove(lib: Library):
@@ -88,9 +140,297 @@ def handle_list_by_author(lib: Library):
         for i, b in enumerate(items, start=1):
             print(f"{i}. {b}")
 
+def handle_search(lib: Library):
+    query = input("Arama: ").strip()
+    hits = lib.search(query, limit=10)
+    if not hits:
+        print("Sonuç yok.")
+    else:
+        for i, (b, score) in enumerate(hits, start=1):
+            print(f"{i}. {b}  [{score:.2f}]")
+
+
+def run_import(args) -> int:
+    """
+    `python main.py import isbns.txt` (ya da `-` ile stdin): her satırda bir ISBN.
+    Her girdi için stdout'a bir JSON satırı, stderr'e ilerleme yazar.
+    """
+    from models import Library
+
+    src = sys.stdin if args.file == "-" else open(args.file, encoding="utf-8")
+    isbns = (line for line in src if line.strip() and not line.lstrip().startswith("#"))
+    lib = Library(args.db)
+    client = make_client(args.db, max_connections=args.workers)
+    counts = {}
+    try:
+        for i, res in enumerate(lib.add_many(isbns, client=client, workers=args.workers,
+                                             chunk_size=args.chunk_size), start=1):
+            counts[res["status"]] = counts.get(res["status"], 0) + 1
+            print(json.dumps({"isbn": res["isbn"], "status": res["status"]}, ensure_ascii=False))
+            if i % args.chunk_size == 0:
+                print(f"{i} işlendi: {counts}", file=sys.stderr)
+    finally:
+        lib.close()
+        client.close()
+        if src is not sys.stdin:
+            src.close()
+    print(f"Bitti: {counts}", file=sys.stderr)
+    return 0
+
+
+# ---------- betik alt komutları ----------
+def open_library(args) -> Library:
+    """Hızlı açılış: lazy katalog ya da (--snapshot) paylaşılan ikili snapshot."""
+    from models import Library
+
+    if args.snapshot:
+        from snapshot import SnapshotBackend
+        return Library(args.snapshot, backend=SnapshotBackend(args.snapshot), lazy=True)
+    return Library(args.db, lazy=True)
+
+
+def sqlite_backend(args):
+    """`.db` veritabanında okumalar kalıcı indekslerden yapılır (Library kurulmaz)."""
+    from pathlib import Path
+
+    if args.snapshot or Path(args.db).suffix not in SQLITE_SUFFIXES:
+        return None
+    from sqlite_backend import SqliteBackend
+    return SqliteBackend(args.db)
+
+
+def emit(books, as_json: bool) -> int:
+    """Kitapları satır satır yazar (--json: kayıt başına bir JSON satırı); yazılan sayı döner."""
+    from models import book_to_record
+
+    n = 0
+    for b in books:
+        print(json.dumps(book_to_record(b), ensure_ascii=False) if as_json else b)
+        n += 1
+    return n
+
+
+def cmd_list(args) -> int:
+    filters = {"author": args.author, "title": args.title, "kind": args.kind}
+    backend = sqlite_backend(args)
+    if backend is not None and args.after is None:
+        from models import book_from_record
+        try:
+            # Filtreli/sınırlı liste JSON ve snapshot yollarındaki gibi kanonik ISBN sırasıyla
+            records = backend.query(limit=args.limit, by_key=args.limit is not None or any(filters.values()),
+                                    **filters)
+        finally:
+            backend.close()
+        emit(map(book_from_record, records), args.json)
+        return 0
+    if backend is not None:
+        backend.close()
+
+    lib = open_library(args)
+    try:
+        if args.limit is None and args.after is None and not any(filters.values()):
+            emit(lib.iter_books(), args.json)  # ekleme sırası, liste kurulmaz
+        else:
+            emit(lib.page(after=args.after, limit=args.limit, **filters), args.json)
+    finally:
+        lib.close()
+    return 0
+
+
+def cmd_find(args) -> int:
+    backend = sqlite_backend(args)
+    if backend is not None:
+        from models import book_from_record
+        try:
+            rec = backend.get(args.isbn)
+        finally:
+            backend.close()
+        book = book_from_record(rec) if rec else None
+    else:
+        lib = open_library(args)
+        try:
+            book = lib.find_book(args.isbn)
+        finally:
+            lib.close()
+    if book is None:
+        print("Bulunamadı", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    emit([book], args.json)
+    return 0
+
+
+def cmd_add(args) -> int:
+    from models import Book, ComicBook, Magazine
+
+    lib = open_library(args)
+    client = None
+    try:
+        if args.title is None:
+            from resilience import UpstreamError
+            client = make_client(args.db)
+            try:
+                ok = lib.add_book(args.isbn, client=client)
+            except UpstreamError as exc:
+                print(f"Open Library yanıt vermiyor: {exc}", file=sys.stderr)
+                return EXIT_TEMPFAIL
+        else:
+            common = {"title": args.title, "author": args.author or "Unknown", "isbn": args.isbn}
+            if args.illustrator is not None:
+                book = ComicBook(**common, illustrator=args.illustrator)
+            elif args.issue_number is not None:
+                book = Magazine(**common, issue_number=args.issue_number)
+            else:
+                book = Book(**common)
+            ok = lib.add_book(book)
+        if not ok:
+            print("Eklenemedi (zaten kayıtlı ya da ISBN bulunamadı)", file=sys.stderr)
+            return EXIT_NOT_FOUND
+        emit([lib.find_book(args.isbn)], args.json)
+        return 0
+    finally:
+        lib.close()
+        if client is not None:
+            client.close()
+
+
+def cmd_remove(args) -> int:
+    lib = open_library(args)
+    try:
+        ok = lib.remove_book(args.isbn)
+    finally:
+        lib.close()
+    if not ok:
+        print("Bulunamadı", file=sys.stderr)
+        return EXIT_NOT_FOUND
+    return 0
+
+
+def cmd_search(args) -> int:
+    lib = open_library(args)
+    try:
+        hits = lib.search(args.query, limit=args.limit)
+    finally:
+        lib.close()
+    if args.json:
+        from models import book_to_record
+        for b, score in hits:
+            print(json.dumps({**book_to_record(b), "score": round(score, 4)}, ensure_ascii=False))
+    else:
+        for b, score in hits:
+            print(f"{b}  [{score:.2f}]")
+    return 0 if hits else EXIT_NOT_FOUND
+
+
+def cmd_export(args) -> int:
+    """Tüm katalog: JSON dizi (library.json biçimi) ya da NDJSON; akış halinde yazılır."""
+    from models import book_to_record
+
+    lib = open_library(args)
+    out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        if args.format == "ndjson":
+            for b in lib.iter_books():
+                out.write(json.dumps(book_to_record(b), ensure_ascii=False) + "\n")
+        else:
+            out.write("[")
+            for i, b in enumerate(lib.iter_books()):
+                out.write(("," if i else "") + "\n  " + json.dumps(book_to_record(b), ensure_ascii=False))
+            out.write("\n]\n")
+    finally:
+        lib.close()
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+COMMANDS = {"list": cmd_list, "find": cmd_find, "add": cmd_add, "remove": cmd_remove,
+            "search": cmd_search, "export": cmd_export}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Kütüphane CLI (argümansız: etkileşimli menü)")
+    parser.add_argument("--db", default="library.json", help="Veritabanı yolu (.json ya da .db)")
+    parser.add_argument("--snapshot", metavar="DOSYA",
+                        help="Katalog yerine ikili snapshot'ı kullan (bkz. snapshot.py)")
+    parser.add_argument("--profile", metavar="DOSYA",
+                        help="Çalışmayı cProfile ile ölç ve pstats dökümünü DOSYA'ya yaz")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="--profile ile birlikte: en çok bellek ayıran satırları stderr'e yaz")
+    sub = parser.add_subparsers(dest="command")
+    imp = sub.add_parser("import", help="Dosyadan/stdin'den toplu ISBN içe aktar")
+    imp.add_argument("file", nargs="?", default="-", help="ISBN listesi (varsayılan: stdin)")
+    imp.add_argument("--workers", type=int, default=16, help="Eşzamanlı Open Library isteği")
+    imp.add_argument("--chunk-size", type=int, default=500, help="Commit başına kitap sayısı")
+
+    ls = sub.add_parser("list", help="Kitapları listele (filtreler: kanonik ISBN sırası)")
+    ls.add_argument("--author", help="Yazar (büyük/küçük harf duyarsız, tam eşleşme)")
+    ls.add_argument("--title", help="Başlık (büyük/küçük harf duyarsız, tam eşleşme)")
+    ls.add_argument("--kind", choices=["Book", "ComicBook", "Magazine"])
+    ls.add_argument("--limit", type=int, help="En fazla bu kadar kitap")
+    ls.add_argument("--after", metavar="ISBN", help="İmleç: bu ISBN'den sonrası")
+    find = sub.add_parser("find", help="ISBN ile kitap bul (yoksa çıkış kodu 1)")
+    find.add_argument("isbn")
+    add = sub.add_parser("add", help="Kitap ekle: yalnızca ISBN ile Open Library'den, --title ile elle")
+    add.add_argument("isbn")
+    add.add_argument("--title")
+    add.add_argument("--author")
+    kind = add.add_mutually_exclusive_group()
+    kind.add_argument("--illustrator", help="ComicBook olarak ekle")
+    kind.add_argument("--issue-number", type=int, help="Magazine olarak ekle")
+    rm = sub.add_parser("remove", help="ISBN ile kitap sil (yoksa çıkış kodu 1)")
+    rm.add_argument("isbn")
+    search = sub.add_parser("search", help="Başlık/yazarda tam metin arama")
+    search.add_argument("query")
+    search.add_argument("--limit", type=int, default=10)
+    for p in (ls, find, add, search):
+        p.add_argument("--json", action="store_true", help="Kayıt başına bir JSON satırı yaz")
+    export = sub.add_parser("export", help="Tüm kataloğu dışa aktar")
+    export.add_argument("-o", "--output", default="-", help="Hedef dosya (varsayılan: stdout)")
+    export.add_argument("--format", choices=["json", "ndjson"], default="json")
+
+    dump = sub.add_parser("ingest-dump", help="Open Library döküm dosyalarından çevrimdışı yükle")
+    dump.add_argument("--editions", help="Edition dökümü (TSV ya da JSON satırları, .gz olabilir)")
+    dump.add_argument("--authors", help="Yazar dökümü; önbelleğin yazar indeksine yazılır")
+    dump.add_argument("--isbns", help="Yalnızca bu ISBN'leri al (satır başına bir ISBN)")
+    dump.add_argument("--cache", help="Yazar indeksi / metadata önbelleği (varsayılan: <db>.cache.sqlite)")
+    dump.add_argument("--workers", type=int, default=None,
+                      help="Ayrıştırma süreci sayısı (varsayılan: CPU sayısı; 0: tek süreç)")
+    dump.add_argument("--chunk-size", type=int, default=20_000, help="Parça başına satır (parça başına tek commit)")
+    dump.add_argument("--cache-editions", action="store_true",
+                      help="Sonuçları edition önbelleğine de yaz (çevrimiçi istemci için yerel yedek)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if not args.profile:
+        return run(args)
+
+    from profiling import PROFILER
+    PROFILER.configure(sample_rate=1.0, memory=args.profile_memory)
+    try:
+        with PROFILER.section(f"cli.{args.command or 'menu'}"):
+            return run(args)
+    finally:
+        with open(args.profile, "wb") as f:
+            f.write(PROFILER.dump() or b"")
+        print(f"Profil yazıldı -> {args.profile} (python -m pstats {args.profile})", file=sys.stderr)
+        for item in PROFILER.top_allocations(10):
+            print(f"{item['size'] / 1024:10.1f} KiB  {item['count']:8d} blok  {item['file']}:{item['line']}",
+                  file=sys.stderr)
+
+
+def run(args):
+    if args.command == "import":
+        return run_import(args)
+    if args.command == "ingest-dump":
+        import dump_ingest  # ağ/HTTP bağımlılığı yok
+        return dump_ingest.run(args)
+    if args.command in COMMANDS:
+        return COMMANDS[args.command](args)
 
-def main():
-    lib = Library("library.json")
+    from models import Library
+    lib = Library(args.db, lazy=True)  # menü hemen gelsin: kayıtlar erişimde çözülür
     while True:
         print_menu()
         choice = input("Seçim: ").strip()
@@ -107,6 +447,8 @@ def main():
         elif choice == "6":
             handle_list_by_author(lib)    # YENİ
         elif choice == "7":
+            handle_search(lib)
+        elif choice == "8":
             print("Görüşmek üzere 👋")
             break
         else:
@@ -114,4 +456,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,198 @@
+# metadata_cache.py
+"""
+Open Library metadata önbelleği (OpenLibraryClient'ın önünde).
+
+İki katman:
+- Bellek: sınırlı LRU (OrderedDict), edition ve yazar için ayrı.
+- Disk: sqlite dosyası; süreç yeniden başlasa da sonuçlar korunur.
+
+Olumlu ve olumsuz (404) sonuçların TTL'leri ayrıdır; yazar anahtarları
+(/authors/OL...A) kendi önbelleğinde ve daha uzun TTL ile tutulur, çünkü aynı
+yazar birçok ISBN'de tekrar eder.
+
+`get_*` üç sonuç verebilir: MISS (önbellekte yok), None (olumsuz kayıt) ya da değer.
+`allow_stale=True` süresi dolmuş kaydı da döndürür: servis yanıt vermediğinde
+istemci önbelleği yerel yedek olarak kullanır. `put_many` toplu yazımdır (bkz.
+dump_ingest.py); kayıtlar yalnızca diske gider, bellek katmanı şişmez.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+MISS = object()
+
+EDITION = "edition"
+AUTHOR = "author"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    negative_hits: int = 0
+    disk_hits: int = 0
+    expired: int = 0
+    evictions: int = 0
+    stale_hits: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class _LRU:
+    """key -> (son_geçerlilik, değer); kapasite aşılınca en eski atılır."""
+
+    def __init__(self, max_entries: int, stats: CacheStats) -> None:
+        self.max_entries = max_entries
+        self.stats = stats
+        self._data: "OrderedDict[str, tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def put(self, key: str, expires: float, value: Any) -> None:
+        self._data[key] = (expires, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def pop(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class MetadataCache:
+    def __init__(
+        self,
+        path: str | Path | None = None,
+        max_entries: int = 4096,
+        positive_ttl: float = 7 * 24 * 3600,
+        negative_ttl: float = 3600,
+        author_ttl: float = 30 * 24 * 3600,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.author_ttl = author_ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._tiers = {EDITION: _LRU(max_entries, self.stats), AUTHOR: _LRU(max_entries, self.stats)}
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if path is not None:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT, expires REAL NOT NULL,"
+                " PRIMARY KEY (ns, key))"
+            )
+            self._db.commit()
+
+    # ---------- genel API ----------
+    def get_edition(self, isbn: str, allow_stale: bool = False):
+        return self._get(EDITION, isbn, allow_stale)
+
+    def put_edition(self, isbn: str, data: Optional[dict]) -> None:
+        ttl = self.positive_ttl if data is not None else self.negative_ttl
+        self._put(EDITION, isbn, data, ttl)
+
+    def get_author(self, key: str, allow_stale: bool = False):
+        return self._get(AUTHOR, key, allow_stale)
+
+    def put_author(self, key: str, name: Optional[str]) -> None:
+        ttl = self.author_ttl if name is not None else self.negative_ttl
+        self._put(AUTHOR, key, name, ttl)
+
+    def put_many(self, ns: str, items: Iterable[Tuple[str, Any]]) -> int:
+        """(anahtar, değer) çiftlerini tek işlemde diske yazar; yazılan sayı döner."""
+        ttl = self.author_ttl if ns == AUTHOR else self.positive_ttl
+        expires = self.clock() + ttl
+        rows = [(ns, key, json.dumps(value, ensure_ascii=False), expires) for key, value in items]
+        with self._lock:
+            tier = self._tiers[ns]
+            for row in rows:
+                tier.pop(row[1])  # bellekteki eski değer diskle çelişmesin
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO entries (ns, key, value, expires) VALUES (?, ?, ?, ?)", rows)
+                self._db.commit()
+            else:
+                for _, key, value, _ in rows:
+                    tier.put(key, expires, json.loads(value))
+        return len(rows)
+
+    def clear(self) -> None:
+        with self._lock:
+            for tier in self._tiers.values():
+                tier._data.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM entries")
+                self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __len__(self) -> int:
+        return sum(len(t) for t in self._tiers.values())
+
+    # ---------- iç işleyiş ----------
+    def _get(self, ns: str, key: str, allow_stale: bool = False):
+        now = self.clock()
+        with self._lock:
+            tier = self._tiers[ns]
+            item = tier.get(key)
+            if item is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, expires FROM entries WHERE ns = ? AND key = ?", (ns, key)
+                ).fetchone()
+                if row is not None:
+                    value = json.loads(row[0]) if row[0] is not None else None
+                    item = (row[1], value)
+                    if row[1] > now:
+                        self.stats.disk_hits += 1
+                        tier.put(key, row[1], value)  # belleğe terfi
+            if item is None:
+                self.stats.misses += 1
+                return MISS
+            expires, value = item
+            if expires <= now and allow_stale:
+                self.stats.stale_hits += 1
+                return value
+            if expires <= now:
+                tier.pop(key)
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return MISS
+            self.stats.hits += 1
+            if value is None:
+                self.stats.negative_hits += 1
+            return value
+
+    def _put(self, ns: str, key: str, value: Any, ttl: float) -> None:
+        expires = self.clock() + ttl
+        with self._lock:
+            self._tiers[ns].put(key, expires, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries (ns, key, value, expires) VALUES (?, ?, ?, ?)",
+                    (ns, key, json.dumps(value, ensure_ascii=False) if value is not None else None, expires),
+                )
+                self._db.commit()
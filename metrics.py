@@ -0,0 +1,221 @@
+# metrics.py
+"""
+Prometheus metin biçiminde (text exposition 0.0.4) süreç içi metrikler.
+
+Harici bağımlılık yoktur. Sayaçlar, gösterge (gauge) ve histogramlar etiket
+değerleriyle çocuk serilere ayrılır; hepsi thread-safe'tir (commit thread'i,
+import havuzu ve event loop aynı anda ölçüm yazar).
+
+`LIB_METRICS=0` ile kapatılır: ölçüm noktaları tek bir bayrak kontrolüyle
+çıkar, API ara katmanı hiç eklenmez. gunicorn altında her worker kendi
+değerlerini tutar (süreç başına metrik).
+
+    from metrics import STORAGE_COMMIT_SECONDS
+    with STORAGE_COMMIT_SECONDS.time(backend="JsonFileBackend", op="commit"):
+        ...
+    print(render())
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+ENABLED = os.environ.get("LIB_METRICS", "1").lower() not in ("0", "false", "no")
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Prometheus istemcilerinin varsayılan süre kovaları (saniye)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1 << 20, 4 << 20, 16 << 20, 64 << 20)
+
+_NOOP = nullcontext()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), registry=None) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> Iterator[str]:  # pragma: no cover - alt sınıflar
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=(), registry=None) -> None:
+        super().__init__(name, help, labelnames, registry)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, v in items:
+            yield f"{self.name}{_labels(self.labelnames, key)} {_num(v)}"
+
+
+class Gauge(_Metric):
+    """Anlık değer. Değerler genelde kazıma (scrape) sırasında bir kancayla doldurulur."""
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=(), registry=None) -> None:
+        super().__init__(name, help, labelnames, registry)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    samples = Counter.samples
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 registry=None) -> None:
+        super().__init__(name, help, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+        # etiketler -> [kova sayıları..., +Inf sayısı], toplam
+        self._values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        if not ENABLED:
+            return
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)  # değer <= sınır olan ilk kova
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def time(self, **labels):
+        """Blok süresini gözlemleyen bağlam yöneticisi (kapalıyken boş bağlam)."""
+        return self._timer(labels) if ENABLED else _NOOP
+
+    @contextmanager
+    def _timer(self, labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = f'le="{_num(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_num(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._hooks: Dict[str, Callable[[], None]] = {}
+
+    def register(self, metric: _Metric) -> None:
+        self._metrics[metric.name] = metric
+
+    def hook(self, name: str, fn: Callable[[], None]) -> None:
+        """Kazımadan önce çağrılacak kanca (ör. indeks boyutlarını gauge'lara yazmak).
+        Aynı adla yeniden kaydedilen kanca öncekinin yerini alır."""
+        self._hooks[name] = fn
+
+    def render(self) -> str:
+        for fn in list(self._hooks.values()):
+            fn()
+        lines = []
+        for m in self._metrics.values():
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+render = REGISTRY.render
+
+
+# ---------- uygulama metrikleri ----------
+HTTP_REQUEST_SECONDS = Histogram(
+    "library_http_request_duration_seconds", "API istek süresi (yanıt gövdesi gönderilene kadar).",
+    ("method", "route", "status"))
+STORAGE_COMMIT_SECONDS = Histogram(
+    "library_storage_commit_duration_seconds", "Backend commit/dışa aktarım süresi.",
+    ("backend", "op"))
+STORAGE_WRITE_BYTES = Histogram(
+    "library_storage_write_bytes", "Tek yazımda diske giden bayt (dosya türüne göre).",
+    ("file",), buckets=BYTE_BUCKETS)
+LOAD_SECONDS = Histogram(
+    "library_load_duration_seconds", "Kalıcı durumun belleğe yüklenme süresi.", ("backend", "mode"))
+INDEX_BUILD_SECONDS = Histogram(
+    "library_index_build_duration_seconds", "Tembel ikincil indekslerin kurulma süresi.")
+INDEX_ENTRIES = Gauge(
+    "library_index_entries", "İndeks başına anahtar sayısı (kurulmamışsa 0).", ("index",))
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "library_upstream_request_duration_seconds", "Open Library istek süresi (deneme başına).",
+    ("endpoint", "outcome"))
+UPSTREAM_REJECTED = Counter(
+    "library_upstream_rejected_total", "Devre açık olduğu için ağa çıkmadan reddedilen çağrılar.",
+    ("endpoint",))
+JOBS = Gauge(
+    "library_jobs", "Arka plan iş kuyruğu: duruma göre iş sayısı (bkz. jobs.py).", ("status",))
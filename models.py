@@ -1,24 +1,51 @@
 # models.py
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
 from pathlib import Path
-from typing import List, Optional
-import json
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import sys
+import time
+
+from authors import AuthorTable, split_names
+from backends import JsonFileBackend, StorageBackend
+from changefeed import ChangeLog
+from columnar import ColumnarStore
+from isbn import isbn_key
+from metrics import INDEX_BUILD_SECONDS, INDEX_ENTRIES, LOAD_SECONDS, STORAGE_COMMIT_SECONDS
+from profiling import PROFILER
+from search import SearchIndex, build_index
 
 
 # ---------- Base Class ----------
-@dataclass
+# slots=True: örnek başına __dict__ yok; milyonlarca kayıtta RSS'in büyük kısmı buydu.
+@dataclass(slots=True)
 class Book:
     """Her bir kitabı temsil eder."""
     title: str
     author: str
-    isbn: str  # benzersiz kimlik
+    isbn: str  # benzersiz kimlik (girildiği biçimde saklanır)
+    # Open Library yazar anahtarları ("/authors/OL1A", ...), `author` ile aynı sırada;
+    # elle eklenen kitaplarda boş. Yalnızca isimle verilir (alt sınıfların alan sırası değişmez).
+    author_keys: Tuple[str, ...] = field(default=(), kw_only=True)
+
+    def __post_init__(self) -> None:
+        # Aynı yazar binlerce kayıtta tekrar eder: tek string nesnesi paylaşılsın
+        self.author = sys.intern(self.author)
+        if self.author_keys:
+            self.author_keys = tuple(map(sys.intern, self.author_keys))
+
+    @property
+    def key(self) -> str:
+        """Kanonik ISBN-13 (ya da temizlenmiş kimlik); indeks ve tekrar kontrolü anahtarı."""
+        return isbn_key(self.isbn)
 
     def __str__(self) -> str:
         return f"{self.title} by {self.author} (ISBN: {self.isbn})"
 
 
 # ---------- Derived Classes ----------
-@dataclass
+@dataclass(slots=True)
 class ComicBook(Book):
     illustrator: str
 
@@ -26,7 +53,7 @@ class ComicBook(Book):
         return f"{self.title} (Comic) by {self.author}, illus. {self.illustrator} (ISBN: {self.isbn})"
 
 
-@dataclass
+@dataclass(slots=True)
 class Magazine(Book):
     issue_number: int
 
@@ -34,19 +61,261 @@ class Magazine(Book):
         return f"{self.title} Magazine Issue {self.issue_number} by {self.author} (ISBN: {self.isbn})"
 
 
+# ---------- Serileştirme ----------
+_KINDS = {"Book": Book, "ComicBook": ComicBook, "Magazine": Magazine}
+_FIELDS = {cls: tuple(f.name for f in fields(cls)) for cls in _KINDS.values()}
+
+
+def book_to_record(b: Book) -> dict:
+    names = _FIELDS.get(type(b)) or tuple(f.name for f in fields(b))
+    entry = {name: getattr(b, name) for name in names}
+    keys = entry.pop("author_keys", ())
+    if keys:  # yazar anahtarı olmayan kayıtlar eski biçimle aynı kalır
+        entry["author_keys"] = list(keys)
+    entry["type"] = b.__class__.__name__  # Book/ComicBook/Magazine
+    return entry
+
+
+def book_from_record(item: dict) -> Book:
+    item = dict(item)
+    type_ = item.pop("type", "Book")
+    return _KINDS.get(type_, Book)(**item)
+
+
+def _default_backend(path: Path) -> StorageBackend:
+    """Uzantıya göre: .db/.sqlite/.sqlite3 -> SQLite, diğerleri -> JSON dosyası."""
+    if path.suffix in (".db", ".sqlite", ".sqlite3"):
+        from sqlite_backend import SqliteBackend
+        return SqliteBackend(path)
+    return JsonFileBackend(path)
+
+
+def _fold(text: str) -> str:
+    """İndeks anahtarı: baştaki/sondaki boşluk atılmış, küçük harfli metin."""
+    return (text or "").strip().lower()
+
+
+def _author_folds(b: Book) -> List[str]:
+    """Yazar indeksinin kovaları: birleşik metin + (ortak yazarlıysa) her yazar ayrı."""
+    folds = [_fold(b.author)]
+    if len(b.author_keys) > 1:
+        for name in split_names(b.author, b.author_keys) or ():
+            folded = _fold(name)
+            if folded not in folds:
+                folds.append(folded)
+    return folds
+
+
 # ---------- Library ----------
 class Library:
-    """Tüm kütüphane operasyonlarını ve JSON kalıcılığını yönetir."""
-    def __init__(self, db_path: str | Path = "library.json") -> None:
+    """
+    Tüm kütüphane operasyonlarını yönetir. Kalıcılık bir StorageBackend'e
+    devredilir (varsayılan: tek JSON dosyası; bkz. backends.py). db_path .db /
+    .sqlite uzantılıysa SQLite kullanılır (bkz. sqlite_backend.py).
+
+    Bellekte üç indeks tutulur ve add/remove/load ile senkron kalır:
+    - _by_isbn:   kanonik ISBN -> Book (ekleme sırasını korur, birincil kayıt)
+    - _by_title:  katlanmış başlık -> [kanonik ISBN, ...]
+    - _by_author: katlanmış yazar  -> [kanonik ISBN, ...] (ortak yazarlı kitaplar
+                  her yazarın kovasında da bulunur)
+    - _by_author_key: Open Library yazar anahtarı -> {kanonik ISBN: None}
+    - _by_kind:   sınıf adı -> {kanonik ISBN: None} (sıralı küme)
+    - _sorted:    kanonik ISBN'lerin sıralı listesi (ilk sayfalı sorguda kurulur,
+                  sonra artımlı güncellenir)
+    - _search:    tam metin indeksi (search.py; ilk aramada kurulur, sonra artımlı)
+
+    `version` her değişiklikte artan bir sayaçtır; aynı sürümde içerik aynıdır.
+
+    `authors` yazar anahtarı -> isim tablosudur (bkz. authors.py); yüklenen
+    kayıtlar ve Open Library istemcisi tarafından doldurulur.
+
+    `feed` görünüme uygulanan ekleme/silmelerin sıralı akışıdır (bkz.
+    changefeed.py); tam yeniden yüklemede yeni bir epoch başlar.
+
+    Tüm ISBN parametreleri `isbn.isbn_key` ile kanonikleştirilir; "978-0441172719",
+    "9780441172719" ve "0441172717" aynı kitabı gösterir.
+
+    columnar=True ile birincil kayıt Book nesneleri yerine paralel dizilerde
+    tutulur (bkz. columnar.py); kitaplar erişimde üretilir. Bellek belirgin
+    biçimde düşer, karşılığında dönen Book'lar birer kopyadır: üzerlerinde
+    yapılan değişiklik kütüphaneye yansımaz.
+
+    lazy=True hızlı açılış modudur: library.json belleğe eşlenir, açılışta yalnızca
+    ISBN -> bayt aralığı tablosu kurulur (bkz. lazystore.py). Kayıtlar erişimde
+    çözülür; başlık/yazar/tür indeksleri ilk ihtiyaçta kurulur. Backend desteklemiyorsa
+    normal yüklemeye düşülür.
+
+    Okuma metotları diğer süreçlerin yazımlarını en fazla `refresh_interval`
+    saniyede bir kontrol eder (sıcak yolda her aramada dosya stat'ı olmasın);
+    add/remove ve açık `refresh()` çağrısı her zaman kontrol eder.
+    """
+    def __init__(self, db_path: str | Path = "library.json",
+                 backend: StorageBackend | None = None, columnar: bool = False,
+                 lazy: bool = False, refresh_interval: float = 0.5) -> None:
+        if columnar and lazy:
+            raise ValueError("columnar ve lazy birlikte kullanılamaz")
         self.db_path = Path(db_path)
-        self.books: List[Book] = []
-        self._ensure_file()
+        self.backend = backend or _default_backend(self.db_path)
+        self.columnar = columnar
+        self.lazy = lazy
+        self.refresh_interval = refresh_interval
+        self._refreshed = time.monotonic()  # son değişiklik kontrolü (okuma kısıtlaması için)
+        self._by_isbn: Dict[str, Book] = self._new_store()
+        # İkincil indeksler; None = henüz kurulmadı (tembel yükleme), bkz. _indexes()
+        self._by_title: Optional[Dict[str, List[str]]] = {}
+        self._by_author: Optional[Dict[str, List[str]]] = {}
+        self._by_author_key: Optional[Dict[str, Dict[str, None]]] = {}
+        self._by_kind: Optional[Dict[str, Dict[str, None]]] = {}
+        self._sorted: Optional[List[str]] = None
+        self._search: Optional[SearchIndex] = None
+        self._pending: Optional[list] = None  # deferred()/batch() içindeyken biriken işlemler
+        self._view: Optional[Tuple[Book, ...]] = None
+        self.version = 0  # add/remove/load ile monoton artar
+        self.authors = AuthorTable()  # yeniden yüklemelerde korunur: isimler eskimez
+        self.feed = ChangeLog()
         self.load_books()
 
-    def _ensure_file(self) -> None:
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.db_path.exists():
-            self.db_path.write_text("[]", encoding="utf-8")
+    @property
+    def books(self) -> List[Book]:
+        return list(self._by_isbn.values())
+
+    @books.setter
+    def books(self, items: Iterable[Book]) -> None:
+        self._reset(self._new_store(), indexed=True)
+        for b in items:
+            self._index(b)
+
+    def _reset(self, store, indexed: bool) -> None:
+        self._changed()
+        self.feed.reset()  # delta ifade edilemez: kopyalar yeniden snapshot almalı
+        self._sorted = None
+        self._search = None
+        old, self._by_isbn = self._by_isbn, store
+        if old is not store and hasattr(old, "close"):  # tembel depolar dosya eşlemesi tutar
+            old.close()
+        empty = (lambda: {}) if indexed else (lambda: None)
+        self._by_title, self._by_author, self._by_kind = empty(), empty(), empty()
+        self._by_author_key = empty()
+
+    def _fresh(self) -> None:
+        """Okuma yolu: son kontrolden beri `refresh_interval` geçtiyse refresh()."""
+        if time.monotonic() - self._refreshed >= self.refresh_interval:
+            self.refresh()
+
+    def refresh(self) -> bool:
+        """
+        Başka süreçlerin yaptığı değişiklikleri belleğe alır; okuma metotları
+        bunu (kısıtlı olarak) kendileri çağırır. Görünüm değiştiyse True.
+        - Paylaşılan ikili snapshot'ın yeni sürümü varsa ona geçilir (snapshot.py).
+        - Backend değişiklik günlüğü tutuyorsa yalnızca yeni işlemler uygulanır;
+          izlenemiyorsa tam yeniden yükleme yapılır (backends.JsonFileBackend).
+        """
+        if self._pending is not None:  # yarım kalmış bir grup varken görünüm değişmesin
+            return False
+        self._refreshed = time.monotonic()
+        refresh = getattr(self._by_isbn, "refresh", None)
+        if refresh is not None and refresh():
+            self._reset(self._by_isbn, indexed=False)
+            return True
+        ops = self.backend.changes()
+        if ops is None:
+            self.load_books()
+            return True
+        for op, payload in ops:
+            if op == "add":
+                self._index(book_from_record(payload))  # aynı anahtar varsa yerini alır
+            else:
+                key = isbn_key(payload)
+                if key in self._by_isbn:
+                    self._unindex(key, self._by_isbn[key])
+        if ops:
+            self.feed.record(ops)
+        return bool(ops)
+
+    def _indexes(self) -> None:
+        """Tembel yüklemede başlık/yazar/tür indekslerini ilk ihtiyaçta kurar."""
+        if self._by_title is not None:
+            return
+        with INDEX_BUILD_SECONDS.time():
+            self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        by_title: Dict[str, List[str]] = {}
+        by_author: Dict[str, List[str]] = {}
+        by_kind: Dict[str, Dict[str, None]] = {}
+        by_author_key: Dict[str, Dict[str, None]] = {}
+        for key, b in self._by_isbn.items():
+            by_title.setdefault(_fold(b.title), []).append(key)
+            for folded in _author_folds(b):
+                by_author.setdefault(folded, []).append(key)
+            by_kind.setdefault(type(b).__name__, {})[key] = None
+            if b.author_keys:
+                self.authors.learn(b.author, b.author_keys)
+                for akey in b.author_keys:
+                    by_author_key.setdefault(akey, {})[key] = None
+        self._by_title, self._by_author, self._by_kind = by_title, by_author, by_kind
+        self._by_author_key = by_author_key
+
+    def index_sizes(self) -> Dict[str, int]:
+        """İndeks başına anahtar sayısı; kurulmamış tembel indeksler 0 (metrikler için)."""
+        return {"isbn": len(self._by_isbn), "title": len(self._by_title or ()),
+                "author": len(self._by_author or ()), "kind": len(self._by_kind or ()),
+                "author_key": len(self._by_author_key or ()), "sorted": len(self._sorted or ())}
+
+    def export_metrics(self) -> None:
+        """İndeks boyutlarını `library_index_entries` gauge'una yazar."""
+        for name, size in self.index_sizes().items():
+            INDEX_ENTRIES.set(size, index=name)
+
+    def _new_store(self):
+        return ColumnarStore(_KINDS) if self.columnar else {}
+
+    def _changed(self) -> None:
+        # Her değişiklik sürümü artırır; önbellekler (görünüm, HTTP yanıtları) buna bakar
+        self.version += 1
+        self._view = None
+
+    def _index(self, b: Book) -> None:
+        self._changed()
+        key = b.key
+        old = self._by_isbn.get(key)
+        if old is not None:
+            self._unindex(key, old)
+        self._by_isbn[key] = b
+        if self._by_title is not None:
+            self._by_title.setdefault(_fold(b.title), []).append(key)
+            for folded in _author_folds(b):
+                self._by_author.setdefault(folded, []).append(key)
+            self._by_kind.setdefault(type(b).__name__, {})[key] = None
+            if b.author_keys:
+                self.authors.learn(b.author, b.author_keys)
+                for akey in b.author_keys:
+                    self._by_author_key.setdefault(akey, {})[key] = None
+        if self._sorted is not None:
+            insort(self._sorted, key)
+        if self._search is not None:
+            self._search.add(key, b.title, b.author)
+
+    def _unindex(self, key: str, b: Book) -> None:
+        self._changed()
+        del self._by_isbn[key]
+        if self._by_title is not None:
+            for index, folded in [(self._by_title, _fold(b.title))] + \
+                    [(self._by_author, f) for f in _author_folds(b)]:
+                bucket = index[folded]
+                bucket.remove(key)
+                if not bucket:
+                    del index[folded]
+            del self._by_kind[type(b).__name__][key]
+            for akey in b.author_keys:
+                links = self._by_author_key[akey]
+                del links[key]
+                if not links:
+                    del self._by_author_key[akey]
+        if self._sorted is not None:
+            del self._sorted[bisect_left(self._sorted, key)]
+        if self._search is not None:
+            self._search.remove(key, b.title, b.author)
 
     def add_book(self, book_or_isbn, client=None) -> bool:
         """
@@ -54,91 +323,330 @@ class Library:
         - Book verildiğinde: eskisi gibi ekler (Stage 1 uyumlu)
         - str (ISBN) verildiğinde: Open Library'den bilgileri çekip ekler (Stage 2)
 
-        Dönüş: eklendiyse True, aksi halde False.
+        Dönüş: eklendiyse True, aksi halde False (zaten kayıtlı ya da ISBN bulunamadı).
+
+        Hata: ISBN modunda Open Library yanıt veremezse (yeniden denemeler tükendi
+        ya da devre açık) `resilience.UpstreamError` (`CircuitOpenError` dahil)
+        yükselir; bu "bulunamadı"dan ayrıdır, çağıran daha sonra yeniden denemelidir.
         """
+        self.refresh()  # başka bir süreç aynı kitabı eklemiş olabilir
+
         # 1) Book nesnesi ise doğrudan eski yol
         if isinstance(book_or_isbn, Book):
-            if any(b.isbn == book_or_isbn.isbn for b in self.books):
+            if book_or_isbn.key in self._by_isbn:
                 return False
-            self.books.append(book_or_isbn)
-            self.save_books()
+            self._index(book_or_isbn)
+            self._commit([("add", book_to_record(book_or_isbn))])
             return True
 
         # 2) Str ISBN ise Open Library'den çek
         if isinstance(book_or_isbn, str):
+            # Zaten kayıtlıysa dış servise hiç gitme
+            if isbn_key(book_or_isbn) in self._by_isbn:
+                return False
+
             from openlibrary_client import OpenLibraryClient
+            owned = client is None  # geçici istemcinin loop thread'i ve bağlantıları kapatılmalı
             client = client or OpenLibraryClient()
-
-            result = client.fetch_by_isbn(book_or_isbn)
+            try:
+                result = client.fetch_by_isbn(book_or_isbn)
+            finally:
+                if owned:
+                    client.close()
             if not result:
                 return False
 
-            # Duplicate kontrolü (aynı ISBN JSON'ımızda var mı?)
-            if any(b.isbn == result["isbn"] for b in self.books):
+            # Duplicate kontrolü (servis farklı biçimde döndürmüş olabilir)
+            if isbn_key(result["isbn"]) in self._by_isbn:
                 return False
 
             # Book oluştur ve kaydet
-            b = Book(title=result["title"], author=result["author"], isbn=result["isbn"])
-            self.books.append(b)
-            self.save_books()
+            b = Book(title=result["title"], author=result["author"], isbn=result["isbn"],
+                     author_keys=result.get("author_keys", ()))
+            self._index(b)
+            self._commit([("add", book_to_record(b))])
             return True
 
         # 3) Ne Book ne str → desteklemiyoruz
         return False
 
+    def add_many(self, isbns: Iterable[str], client=None, workers: int = 8,
+                 chunk_size: int = 500) -> Iterator[dict]:
+        """
+        Toplu ISBN içe aktarımı. Her girdi için sırayla bir sonuç üretir:
+            {"isbn": <girdi>, "status": "added" | "duplicate" | "invalid" | "not_found" | "error",
+             "book": Book | None}
+
+        - Geçersiz ve zaten kayıtlı (ya da girdide tekrar eden) ISBN'ler dış
+          servise hiç gitmeden elenir.
+        - Metadata en fazla `workers` eşzamanlı istekle çekilir.
+        - Her `chunk_size` girdide bir kez commit edilir (kitap başına değil).
+        - Dış servis yanıt veremezse ilgili girdi "error" olur; içe aktarım sürer.
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        from itertools import islice
+
+        from resilience import UpstreamError
+
+        owned = client is None
+        if owned:
+            from openlibrary_client import OpenLibraryClient
+            client = OpenLibraryClient()
+
+        def fetch(key):
+            try:
+                return client.fetch_by_isbn(key)
+            except UpstreamError as exc:
+                return exc
+
+        seen = set()
+        it = iter(isbns)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+                while True:
+                    chunk = list(islice(it, chunk_size))
+                    if not chunk:
+                        break
+                    results, todo = self.plan_import(chunk, seen)
+                    fetched = list(pool.map(fetch, [key for _, key in todo]))
+                    with self.batch():  # parça başına tek commit
+                        self.apply_import(todo, fetched)
+                    yield from results
+        finally:  # tüketim yarıda bırakılsa da (generator kapanınca) çalışır
+            if owned:
+                client.close()
+
+    def plan_import(self, chunk: Iterable[str], seen: set) -> tuple:
+        """
+        Toplu içe aktarımın ağsız ilk adımı. (sonuçlar, yapılacaklar) döndürür;
+        yapılacaklar (sonuç, kanonik isbn) çiftleridir ve çekilmesi gerekenlerdir.
+        `seen` parçalar arası tekrarları yakalamak için çağıran tarafından tutulur.
+        """
+        from isbn import canonical_isbn
+
+        results: List[dict] = []
+        todo: List[tuple] = []
+        for raw in chunk:
+            raw = raw.strip()
+            res = {"isbn": raw, "status": "invalid", "book": None}
+            results.append(res)
+            key = canonical_isbn(raw)
+            if key is None:
+                continue
+            if key in self._by_isbn or key in seen:
+                res["status"] = "duplicate"
+                continue
+            seen.add(key)
+            todo.append((res, key))
+        return results, todo
+
+    def apply_import(self, todo: List[tuple], fetched: List[Optional[dict]]) -> None:
+        """
+        `plan_import` yapılacaklarını çekilen metadata ile belleğe/backend'e uygular.
+        fetched öğesi bir istisnaysa (dış servis hatası) girdi "error" olur.
+        """
+        for (res, _key), data in zip(todo, fetched):
+            if isinstance(data, Exception):
+                res["status"] = "error"
+                continue
+            if not data:
+                res["status"] = "not_found"
+                continue
+            b = Book(title=data["title"], author=data["author"], isbn=data["isbn"],
+                     author_keys=data.get("author_keys", ()))
+            if not self.add_book(b):  # servis farklı biçimde döndürmüş olabilir
+                res["status"] = "duplicate"
+                continue
+            res["status"], res["book"] = "added", b
 
     def remove_book(self, isbn: str) -> bool:
-        before = len(self.books)
-        self.books = [b for b in self.books if b.isbn != isbn]
-        removed = len(self.books) != before
-        if removed:
-            self.save_books()
-        return removed
+        self.refresh()
+        key = isbn_key(isbn)
+        b = self._by_isbn.get(key)
+        if b is None:
+            return False
+        self._unindex(key, b)
+        self._commit([("remove", b.isbn)])  # backend kaydı saklandığı biçimle tanır
+        return True
+
+    def replace_book(self, book: Book) -> bool:
+        """Aynı ISBN'li kaydı `book` ile değiştirir (ör. yazar zenginleştirme); yoksa False."""
+        self.refresh()
+        old = self._by_isbn.get(book.key)
+        if old is None:
+            return False
+        self._index(book)  # eskisini indekslerden düşürür
+        self._commit([("remove", old.isbn), ("add", book_to_record(book))])
+        return True
 
     def list_books(self) -> List[Book]:
-        return list(self.books)
+        self._fresh()
+        return list(self._by_isbn.values())
+
+    def iter_books(self) -> Iterator[Book]:
+        """Kitapları liste kurmadan tek tek üretir; lazy modda her kayıt erişimde çözülür."""
+        self._fresh()
+        for key in list(self._by_isbn):  # anahtarlar şimdi: tüketim sırasında yazım olabilir
+            b = self._by_isbn.get(key)
+            if b is not None:
+                yield b
 
     def find_book(self, isbn: str) -> Optional[Book]:
-        for b in self.books:
-            if b.isbn == isbn:
-                return b
-        return None
+        self._fresh()
+        return self._by_isbn.get(isbn_key(isbn))
 
     def load_books(self) -> None:
+        """
+        Backend'deki kalıcı durumu (snapshot + günlük) belleğe yükler. Kayıtlar
+        akış halinde okunur ve indeksler kayıt geldikçe kurulur; lazy modda
+        yalnızca ofset tablosu kurulur.
+        """
+        labels = {"backend": type(self.backend).__name__, "mode": "lazy" if self.lazy else "eager"}
         try:
-            raw = self.db_path.read_text(encoding="utf-8").strip()
-            data = json.loads(raw) if raw else []
-            self.books = []
-            for item in data:
-                type_ = item.pop("type", "Book")
-                if type_ == "ComicBook":
-                    self.books.append(ComicBook(**item))
-                elif type_ == "Magazine":
-                    self.books.append(Magazine(**item))
+            with LOAD_SECONDS.time(**labels), PROFILER.section("storage.load_books"):
+                store = self.backend.open_lazy(book_from_record, isbn_key) if self.lazy else None
+                if store is None:
+                    self.books = (book_from_record(item) for item in self.backend.load())
                 else:
-                    self.books.append(Book(**item))
-        except (OSError, json.JSONDecodeError):
+                    self._reset(store, indexed=False)
+        except (OSError, ValueError):  # json.JSONDecodeError bir ValueError'dır
             self.books = []
 
     def save_books(self) -> None:
-        data = []
-        for b in self.books:
-            entry = b.__dict__.copy()
-            entry["type"] = b.__class__.__name__  # Book/ComicBook/Magazine
-            data.append(entry)
-        text = json.dumps(data, ensure_ascii=False, indent=2)
-        self.db_path.write_text(text, encoding="utf-8")
-        
+        """Tüm koleksiyonu JSON formatında yazar (tam dışa aktarım)."""
+        with STORAGE_COMMIT_SECONDS.time(backend=type(self.backend).__name__, op="export"), \
+                PROFILER.section("storage.save_books"):
+            self.backend.export(self._records())
+
+    def close(self) -> None:
+        """Bekleyen yazımları diske indirir ve backend'i kapatır."""
+        self.backend.close()
+        if hasattr(self._by_isbn, "close"):
+            self._by_isbn.close()
+
+    def _records(self) -> Iterable[dict]:
+        books = list(self._by_isbn.values())  # referanslar şimdi; serileştirme tüketilince
+        return (book_to_record(b) for b in books)
+
+    @contextmanager
+    def deferred(self):
+        """
+        Blok içindeki değişiklikler belleğe hemen uygulanır; backend işlemleri
+        verilen listede biriktirilir ve commit çağırana kalır (bkz. commit_ops).
+        """
+        ops: list = []
+        prev, self._pending = self._pending, ops
+        try:
+            yield ops
+        finally:
+            self._pending = prev
+
+    @contextmanager
+    def batch(self):
+        """
+        Blok içindeki tüm değişiklikleri tek bir commit ile yazar. Dıştaki bir
+        batch()/deferred() içinde çağrılırsa onun commit'ine katılır.
+        """
+        if self._pending is not None:
+            yield
+            return
+        ops: list = []
+        self._pending = ops
+        try:
+            yield
+        finally:
+            self._pending = None
+            self.commit_ops(ops)
+
+    def commit_ops(self, ops) -> None:
+        """Biriktirilmiş işlemleri backend'e yazar (grup commit)."""
+        if ops:
+            with STORAGE_COMMIT_SECONDS.time(backend=type(self.backend).__name__, op="commit"), \
+                    PROFILER.section("storage.commit"):
+                self.backend.commit(ops, self._records)
+
+    def snapshot(self) -> Tuple[Book, ...]:
+        """
+        Tüm kitapların değişmez görünümü. Bir sonraki değişikliğe kadar aynı
+        tuple döner; okuyucular kilitsiz paylaşabilir.
+        """
+        self._fresh()
+        if self._view is None:
+            self._view = tuple(self._by_isbn.values())
+        return self._view
+
+    def _commit(self, ops) -> None:
+        self.feed.record(ops)  # bellek zaten değişti; akış görünümü izler
+        if self._pending is not None:
+            self._pending.extend(ops)
+        else:
+            self.commit_ops(ops)
+
     def find_by_title(self, title: str):
         """Başlığa göre tek kitap döndürür (büyük/küçük harf duyarsız)."""
-        needle = (title or "").strip().lower()
-        for b in self.books:
-            if b.title.strip().lower() == needle:
-                return b
-        return None
+        self._fresh()
+        self._indexes()
+        keys = self._by_title.get(_fold(title))
+        return self._by_isbn[keys[0]] if keys else None
 
     def list_by_author(self, author: str):
         """Yazara göre tüm kitapları listeler (büyük/küçük harf duyarsız)."""
-        needle = (author or "").strip().lower()
-        return [b for b in self.books if b.author.strip().lower() == needle]
+        self._fresh()
+        self._indexes()
+        return [self._by_isbn[k] for k in self._by_author.get(_fold(author), ())]
 
+    def list_by_author_key(self, key: str) -> List[Book]:
+        """Open Library yazar anahtarına ("/authors/OL1A") bağlı kitaplar; O(k)."""
+        self._fresh()
+        self._indexes()
+        return [self._by_isbn[k] for k in self._by_author_key.get(key, ())]
+
+    def page(self, after: Optional[str] = None, limit: Optional[int] = None,
+             author: Optional[str] = None, title: Optional[str] = None,
+             kind: Optional[str] = None) -> List[Book]:
+        """
+        Kanonik ISBN sırasıyla `after`dan sonraki en fazla `limit` kitap (keyset
+        sayfalama). Yazar/başlık filtreleri indeks kovalarından, tür filtresi
+        tür indeksinden çalışır; tam tarama yapılmaz.
+        """
+        self._fresh()
+        if author is not None or title is not None or kind is not None:
+            self._indexes()
+        if author is not None or title is not None:
+            keys = None
+            for index, value in ((self._by_author, author), (self._by_title, title)):
+                if value is None:
+                    continue
+                bucket = index.get(_fold(value), ())
+                if keys is None:
+                    keys = list(bucket)
+                else:
+                    wanted = set(bucket)
+                    keys = [k for k in keys if k in wanted]
+            keys.sort()
+        elif kind is not None and len(self._by_kind.get(kind, ())) * 8 < len(self._by_isbn):
+            keys = sorted(self._by_kind.get(kind, ()))  # seyrek tür: kendi kovası
+        else:
+            if self._sorted is None:
+                self._sorted = sorted(self._by_isbn)
+            keys = self._sorted
+
+        i = bisect_right(keys, isbn_key(after)) if after else 0
+        out: List[Book] = []
+        while i < len(keys) and (limit is None or len(out) < limit):
+            b = self._by_isbn[keys[i]]
+            i += 1
+            if kind is None or type(b).__name__ == kind:
+                out.append(b)
+        return out
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[Book, float]]:
+        """
+        Başlık ve yazarlarda tam metin arama (önek, yazım hatası toleransı,
+        BM25 sıralaması). "Herbert" gibi tek bir ortak yazarı da bulur.
+        Dönüş: (kitap, puan) listesi, en alakalı önce.
+        """
+        self._fresh()
+        if self._search is None:
+            self._search = build_index((k, b.title, b.author) for k, b in self._by_isbn.items())
+        return [(self._by_isbn[k], score) for k, score in self._search.search(query, limit=limit)]
@@ -1,32 +1,202 @@
 # openlibrary_client.py
 from __future__ import annotations
-import re
+import asyncio
+import importlib.util
+import threading
+import time
+
 import httpx
 
-class OpenLibraryClient:
+from authors import SEPARATOR, AuthorTable
+from isbn import canonical_isbn, clean
+from metadata_cache import MISS, MetadataCache
+from metrics import UPSTREAM_REJECTED, UPSTREAM_REQUEST_SECONDS
+from resilience import CircuitBreaker, RetryPolicy, TokenBucket, UpstreamError
+from singleflight import AsyncSingleFlight
+
+# HTTP/2 için httpx[http2] (h2) gerekir; yoksa HTTP/1.1 keep-alive ile devam
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class AsyncOpenLibraryClient:
+    """
+    Paylaşılan tek bir httpx.AsyncClient üzerinden çalışır: bağlantılar
+    (TLS el sıkışması dahil) istekler arasında yeniden kullanılır. Bir
+    edition'ın yazarları `asyncio.gather` ile eşzamanlı çözülür; çok yazarlı
+    kitaplarda edition'dan sonra yalnızca ~1 tur gecikme kalır.
+
+    Aynı kanonik ISBN'in (ve aynı yazar anahtarının) eşzamanlı istekleri tek
+    bir dış çağrıyı paylaşır (bkz. singleflight.py).
+
+    Her GET hız sınırından (token bucket) geçer; ağ hatası, zaman aşımı, 429 ve
+    5xx yanıtlar jitter'lı üstel geri çekilmeyle yeniden denenir. Art arda
+    başarısızlıklar devreyi açar; açıkken çağrılar ağa çıkmadan reddedilir
+    (bkz. resilience.py). Servis yanıt veremiyorsa önce önbellekteki (süresi
+    dolmuş olsa da) olumlu kayda düşülür (ör. dump_ingest.py ile doldurulmuş
+    yerel önbellek); o da yoksa `UpstreamError` atılır. None yalnızca
+    "bulunamadı" demektir.
+
+    `authors` (AuthorTable) verilirse yazar isimleri önce oradan okunur ve
+    çözülen her yazar oraya yazılır: tabloda olan anahtar bir daha çekilmez.
+    """
     BASE = "https://openlibrary.org"
 
-    def _get_json(self, url: str, timeout: int = 10):
-        r = httpx.get(url, timeout=timeout, follow_redirects=True)
-        if r.status_code == 404:
-            return None
-        r.raise_for_status()
-        return r.json()
+    def __init__(self, cache: MetadataCache | None = None,
+                 transport: httpx.AsyncBaseTransport | None = None,
+                 max_connections: int = 20,
+                 max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 3.0,
+                 read_timeout: float = 5.0,
+                 http2: bool | None = None,
+                 rate_limit: float | None = 20.0,
+                 burst: int = 40,
+                 retry: RetryPolicy | None = None,
+                 breaker: CircuitBreaker | None = None,
+                 authors: AuthorTable | None = None) -> None:
+        """
+        cache: verilirse edition/yazar sonuçları (404'ler dahil) önbellekten sunulur.
+        transport: testlerde sahte HTTP katmanı (ör. httpx.MockTransport).
+        http2: None ise h2 kuruluysa açılır.
+        rate_limit: saniyede en fazla istek (None: sınırsız), burst: ani yük payı.
+        """
+        self.cache = cache
+        self._transport = transport
+        self._limits = httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_keepalive_connections,
+                                    keepalive_expiry=keepalive_expiry)
+        self._timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limiter = TokenBucket(rate_limit, burst) if rate_limit else None
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.authors = authors
+        self._http2 = HTTP2_AVAILABLE if http2 is None else http2
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self.flight = AsyncSingleFlight()
 
-    def fetch_by_isbn(self, isbn: str) -> dict | None:
-        """ISBN -> {title, author, isbn} (başarısızlıkta None)."""
+    def _http(self) -> httpx.AsyncClient:
+        # İlk kullanımda, çalışan event loop içinde kurulur. Havuz loop'a bağlıdır;
+        # loop değişmişse (ör. yeniden başlatılan uygulama) yenisi açılır.
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            self._loop = loop
+            self._client = httpx.AsyncClient(transport=self._transport, limits=self._limits,
+                                             timeout=self._timeout, http2=self._http2,
+                                             follow_redirects=True)
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._loop = None
+
+    async def fetch_many(self, isbns, concurrency: int = 8) -> list:
+        """
+        ISBN listesini en fazla `concurrency` eşzamanlı istekle çözer; sıra korunur.
+        Servise ulaşılamayan girdilerin yerinde UpstreamError örneği döner.
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(isbn):
+            async with sem:
+                try:
+                    return await self.fetch_by_isbn(isbn)
+                except UpstreamError as exc:
+                    return exc
+
+        return await asyncio.gather(*(one(i) for i in isbns))
+
+    async def _get_json(self, url: str, endpoint: str):
+        """
+        GET + JSON; 404 -> None. Geçici hatalar yeniden denenir, sonunda UpstreamError.
+        endpoint ("edition" | "author") yalnızca metrik etiketidir.
+        """
+        try:
+            probe = self.breaker.before_call()
+        except UpstreamError:
+            UPSTREAM_REJECTED.inc(endpoint=endpoint)
+            raise
+        try:
+            return await self._attempts(url, endpoint)
+        finally:
+            if probe:  # record_* çağrılmadan çıkıldıysa yarı açık devre kilitli kalmasın
+                self.breaker.release_probe()
+
+    async def _attempts(self, url: str, endpoint: str):
+        attempt = 0
+        while True:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+            retry_after = None
+            outcome = "error"
+            start = time.perf_counter()
+            try:
+                r = await self._http().get(url)
+                outcome = str(r.status_code)
+                if r.status_code == 404:
+                    self.breaker.record_success()
+                    return None
+                if r.status_code != 429 and r.status_code < 500:
+                    r.raise_for_status()  # diğer 4xx: yeniden denemek anlamsız
+                    self.breaker.record_success()
+                    return r.json()
+                error = f"HTTP {r.status_code}"
+                retry_after = _retry_after(r)
+            except httpx.TimeoutException as exc:
+                outcome, error = "timeout", f"{type(exc).__name__}: {exc}"
+            except httpx.TransportError as exc:  # bağlantı hatası
+                outcome, error = "transport_error", f"{type(exc).__name__}: {exc}"
+            except (httpx.HTTPStatusError, ValueError) as exc:  # 4xx, bozuk JSON
+                self.breaker.record_success()  # servis ayakta; istek/yanıt sorunlu
+                raise UpstreamError(f"Open Library beklenmeyen yanıt: {exc}") from exc
+            except httpx.HTTPError as exc:  # DecodingError, TooManyRedirects, ...
+                self.breaker.record_failure()
+                raise UpstreamError(f"Open Library beklenmeyen yanıt: {type(exc).__name__}: {exc}") from exc
+            finally:
+                UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start,
+                                                 endpoint=endpoint, outcome=outcome)
+
+            attempt += 1
+            if attempt >= self.retry.attempts:
+                self.breaker.record_failure()
+                raise UpstreamError(f"Open Library yanıt vermiyor ({error})", retry_after=retry_after)
+            await asyncio.sleep(max(self.retry.delay(attempt - 1), retry_after or 0))
+
+    async def fetch_by_isbn(self, isbn: str) -> dict | None:
+        """
+        ISBN -> {title, author, isbn, author_keys}; bulunamazsa None. Servis yanıt
+        veremiyorsa UpstreamError (API bunu 503'e çevirir). author_keys, `author`
+        içindeki isimlerle aynı sıradaki Open Library yazar anahtarlarıdır.
+        """
         if not isbn:
             return None
 
-        raw = isbn.strip()
-        normalized = re.sub(r"[^0-9Xx]", "", raw)  # 978-... -> 978...
+        raw = clean(isbn)  # 978-... -> 978...
+        canonical = canonical_isbn(raw)
+        cache_key = canonical or raw
 
-        # Önce ham, olmazsa normalize dene
-        for candidate in [raw, normalized] if raw != normalized else [raw]:
-            try:
-                data = self._get_json(f"{self.BASE}/isbn/{candidate}.json")
-            except (httpx.RequestError, httpx.HTTPStatusError):
-                data = None
+        if self.cache is not None:
+            cached = self.cache.get_edition(cache_key)
+            if cached is not MISS:
+                return cached
+
+        # 10 ve 13 haneli yazımlar aynı kanonik anahtarda buluşur
+        try:
+            return await self.flight.do(("edition", cache_key),
+                                        lambda: self._fetch_edition(raw, canonical, cache_key))
+        except UpstreamError:
+            stale = self._stale("edition", cache_key)
+            if stale is None:
+                raise
+            return stale
+
+    async def _fetch_edition(self, raw: str, canonical: str | None, cache_key: str) -> dict | None:
+        failed = False  # bir yazar çözülemediyse sonucu önbelleğe yazma
+        # Önce girildiği haliyle, olmazsa kanonik ISBN-13 ile dene
+        for candidate in [raw, canonical] if canonical and canonical != raw else [raw]:
+            data = await self._get_json(f"{self.BASE}/isbn/{candidate}.json", "edition")  # UpstreamError yükselir
             if not data:
                 continue
 
@@ -34,22 +204,114 @@ class OpenLibraryClient:
             if not title:
                 continue
 
-            # Yazar isimleri (opsiyonel)
-            authors = []
-            for a in data.get("authors", []):
-                key = a.get("key")
-                if not key:
-                    continue
-                try:
-                    adata = self._get_json(f"{self.BASE}{key}.json")
-                    name = adata.get("name") if adata else None
-                    if name:
-                        authors.append(name)
-                except (httpx.RequestError, httpx.HTTPStatusError):
-                    pass
+            # Yazar isimleri (opsiyonel) — hepsi aynı anda
+            keys = [a.get("key") for a in data.get("authors", []) if a.get("key")]
+            names = await asyncio.gather(*(self._author_name(k) for k in keys), return_exceptions=True)
+            authors, author_keys = [], []
+            for key, name in zip(keys, names):
+                if isinstance(name, UpstreamError):
+                    failed = True  # kitap yine eklenir ama eksik yazarlı sonuç kalıcı olmaz
+                elif isinstance(name, BaseException):
+                    raise name
+                elif name:
+                    authors.append(name)
+                    author_keys.append(key)  # isimle hizalı: çözülemeyen yazarın anahtarı da düşer
 
-            author_str = ", ".join(authors) if authors else "Unknown"
-            return {"title": title, "author": author_str, "isbn": normalized or raw}
+            author_str = SEPARATOR.join(authors) if authors else "Unknown"
+            result = {"title": title, "author": author_str, "isbn": canonical or raw,
+                      "author_keys": author_keys}
+            if self.cache is not None and not failed:
+                self.cache.put_edition(cache_key, result)
+            return result
 
+        if self.cache is not None:
+            self.cache.put_edition(cache_key, None)
         return None
 
+    async def _author_name(self, key: str) -> str | None:
+        """Yazar anahtarı -> isim; ağ hataları çağırana yükselir."""
+        if self.authors is not None:
+            name = self.authors.name(key)
+            if name is not None:
+                return name
+        if self.cache is not None:
+            cached = self.cache.get_author(key)
+            if cached is not MISS:
+                if self.authors is not None:
+                    self.authors.add(key, cached)
+                return cached
+        try:
+            return await self.flight.do(("author", key), lambda: self._fetch_author(key))
+        except UpstreamError:
+            stale = self._stale("author", key)
+            if stale is None:
+                raise
+            return stale
+
+    def _stale(self, kind: str, key: str):
+        """Servis yanıt vermezken önbellekteki (süresi dolmuş olabilir) olumlu kayıt; yoksa None."""
+        if self.cache is None:
+            return None
+        get = self.cache.get_edition if kind == "edition" else self.cache.get_author
+        value = get(key, allow_stale=True)
+        return None if value is MISS else value
+
+    async def _fetch_author(self, key: str) -> str | None:
+        adata = await self._get_json(f"{self.BASE}{key}.json", "author")
+        name = adata.get("name") if adata else None
+        if self.cache is not None:
+            self.cache.put_author(key, name)
+        if self.authors is not None:
+            self.authors.add(key, name)
+        return name
+
+
+def _retry_after(r: httpx.Response) -> float | None:
+    try:
+        return min(float(r.headers["Retry-After"]), 30.0)
+    except (KeyError, ValueError):
+        return None
+
+
+class OpenLibraryClient:
+    """
+    AsyncOpenLibraryClient'ın senkron sarmalayıcısı (CLI ve Library.add_book için).
+    Coroutine'ler özel bir arka plan event loop'unda koşar; böylece bağlantı
+    havuzu çağrılar ve thread'ler arasında paylaşılır.
+    """
+    BASE = AsyncOpenLibraryClient.BASE
+
+    def __init__(self, cache: MetadataCache | None = None,
+                 transport: httpx.AsyncBaseTransport | None = None, **options) -> None:
+        self.aio = AsyncOpenLibraryClient(cache=cache, transport=transport, **options)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self) -> MetadataCache | None:
+        return self.aio.cache
+
+    def _run(self, coro):
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="openlibrary-loop", daemon=True)
+                self._thread.start()
+                self._loop = loop
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def fetch_by_isbn(self, isbn: str) -> dict | None:
+        """ISBN -> {title, author, isbn}; bulunamazsa None, servis yoksa UpstreamError."""
+        return self._run(self.aio.fetch_by_isbn(isbn))
+
+    def close(self) -> None:
+        """Bağlantı havuzunu kapatır ve arka plan loop thread'ini sonlandırır."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.aio.aclose(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
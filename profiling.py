@@ -0,0 +1,214 @@
+# profiling.py
+"""
+Canlı süreçte örneklemeli profil çıkarma (cProfile + tracemalloc).
+
+Profiler kapalıyken her kanca tek bir bayrak kontrolüdür. Açıkken isteklerin
+(ve storage bölümlerinin) `sample_rate` kadarı cProfile altında çalıştırılır;
+istatistikler etiket başına (ör. "GET /books", "storage.save_books") bellekte
+birleştirilir. `memory=True` ise tracemalloc da açılır ve örneklenen bölümün
+net ayırmaları satır bazında toplanır.
+
+Kısıtlar:
+- cProfile aynı anda tek bir profil kabul eder: bir örnek sürerken gelen diğer
+  örnekler atlanır (`skipped`). Async bir istek örneklenirken aynı thread'de
+  araya giren diğer görevler de ölçüme girer.
+- tracemalloc açıkken tüm süreç yavaşlar (~%30+); yalnızca ihtiyaçta açın.
+
+    LIB_PROFILE=0.05 LIB_PROFILE_MEMORY=1 uvicorn api:app
+    curl localhost:8000/admin/profiling/pstats -o api.pstats
+    python -m pstats api.pstats
+"""
+from __future__ import annotations
+
+import os
+import random
+import sys
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+# cProfile/pstats/tracemalloc ilk örnekte yüklenir: kapalı profiler CLI açılışına yük olmasın
+if TYPE_CHECKING:
+    import cProfile
+    import pstats
+    import tracemalloc
+
+
+class Profiler:
+    def __init__(self, sample_rate: float = 0.0, memory: bool = False, frames: int = 1) -> None:
+        self._lock = threading.Lock()
+        self._busy = False
+        self._stats: Dict[str, pstats.Stats] = {}
+        self._samples: Dict[str, int] = {}
+        self._allocs: Dict[Tuple[str, int], List[int]] = {}  # (dosya, satır) -> [bayt, blok]
+        self.skipped = 0
+        self.frames = frames
+        self.sample_rate = 0.0
+        self.memory = False
+        self.configure(sample_rate=sample_rate, memory=memory)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def configure(self, sample_rate: Optional[float] = None, memory: Optional[bool] = None) -> None:
+        """Örnekleme oranını (0 = kapalı, 1 = her çağrı) ve bellek izlemeyi ayarlar."""
+        if sample_rate is not None:
+            if not 0 <= sample_rate <= 1:
+                raise ValueError("sample_rate 0 ile 1 arasında olmalı")
+            self.sample_rate = sample_rate
+        if memory is not None:
+            self.memory = memory
+        tracing = self.memory and self.enabled
+        if tracing:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+        elif _tracing():
+            sys.modules["tracemalloc"].stop()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._samples.clear()
+            self._allocs.clear()
+            self.skipped = 0
+
+    # ---------- örnekleme ----------
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and (self.sample_rate >= 1 or random.random() < self.sample_rate)
+
+    def start(self) -> Optional["_Sample"]:
+        """Örnek başlatır; başka bir örnek sürüyorsa None."""
+        with self._lock:
+            if self._busy:
+                self.skipped += 1
+                return None
+            self._busy = True
+        return _Sample(self)
+
+    @contextmanager
+    def section(self, label: str):
+        """Bloğu (örneklenirse) `label` etiketiyle profiller. Kapalıyken maliyetsiz."""
+        sample = self.start() if self.should_sample() else None
+        if sample is None:
+            yield
+            return
+        try:
+            yield
+        finally:
+            sample.finish(label)
+
+    def _record(self, label: str, prof: cProfile.Profile, before, after) -> None:
+        import pstats
+
+        diffs = []
+        if before is not None and after is not None:
+            diffs = [d for d in after.compare_to(before, "lineno") if d.size_diff > 0]
+        with self._lock:
+            self._busy = False
+            stats = self._stats.get(label)
+            if stats is None:
+                self._stats[label] = pstats.Stats(prof)
+            else:
+                stats.add(prof)
+            self._samples[label] = self._samples.get(label, 0) + 1
+            for diff in diffs:
+                frame = diff.traceback[0]
+                slot = self._allocs.setdefault((frame.filename, frame.lineno), [0, 0])
+                slot[0] += diff.size_diff
+                slot[1] += diff.count_diff
+
+    # ---------- raporlar ----------
+    def status(self) -> dict:
+        with self._lock:
+            return {"enabled": self.enabled, "sample_rate": self.sample_rate, "memory": self.memory,
+                    "samples": dict(self._samples), "skipped": self.skipped}
+
+    def _merged(self, label: Optional[str]) -> Optional[pstats.Stats]:
+        import pstats
+
+        with self._lock:
+            chosen = [s for name, s in self._stats.items() if label is None or name == label]
+            if not chosen:
+                return None
+            return pstats.Stats().add(*chosen)  # kopya: kayıtlı istatistikler değişmez
+
+    def dump(self, label: Optional[str] = None) -> Optional[bytes]:
+        """`pstats.Stats(dosya)` ile açılabilen ikili döküm (etiket verilmezse hepsi)."""
+        import marshal
+
+        stats = self._merged(label)
+        return None if stats is None else marshal.dumps(stats.stats)
+
+    def top(self, label: Optional[str] = None, limit: int = 30, sort: str = "cumulative") -> str:
+        """pstats metin raporu (en pahalı `limit` fonksiyon)."""
+        import io
+
+        stats = self._merged(label)
+        if stats is None:
+            return "Örnek yok.\n"
+        out = io.StringIO()
+        stats.stream = out
+        stats.sort_stats(sort).print_stats(limit)
+        return out.getvalue()
+
+    def top_allocations(self, limit: int = 20) -> List[dict]:
+        """Örneklenen bölümlerde net en çok bellek ayıran satırlar."""
+        with self._lock:
+            items = sorted(self._allocs.items(), key=lambda kv: kv[1][0], reverse=True)[:limit]
+        return [{"file": f, "line": line, "size": size, "count": count}
+                for (f, line), (size, count) in items]
+
+
+def _tracing() -> bool:
+    # Modül hiç yüklenmediyse izleme de yoktur (yüklemeye gerek yok)
+    return "tracemalloc" in sys.modules and sys.modules["tracemalloc"].is_tracing()
+
+
+def _snapshot() -> Optional[tracemalloc.Snapshot]:
+    if not _tracing():
+        return None
+    import tracemalloc
+
+    # Profiler'ın kendi ayırmaları rapora girmesin
+    own = (tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__))
+    return tracemalloc.take_snapshot().filter_traces(own)
+
+
+class _Sample:
+    """Tek bir örneğin cProfile/tracemalloc durumu."""
+
+    def __init__(self, profiler: Profiler) -> None:
+        import cProfile
+
+        self.profiler = profiler
+        self.before = _snapshot()
+        self.prof = cProfile.Profile()
+        try:
+            self.prof.enable()
+        except ValueError:  # başka bir profil aracı (ör. dış profiler) etkin
+            self.prof = None
+
+    def finish(self, label: str) -> None:
+        if self.prof is None:
+            with self.profiler._lock:
+                self.profiler._busy = False
+                self.profiler.skipped += 1
+            return
+        self.prof.disable()
+        after = _snapshot() if self.before is not None else None
+        self.profiler._record(label, self.prof, self.before, after)
+
+
+def _from_env() -> Profiler:
+    try:
+        rate = float(os.environ.get("LIB_PROFILE", "0") or 0)
+    except ValueError:
+        rate = 0.0
+    memory = os.environ.get("LIB_PROFILE_MEMORY", "").lower() in ("1", "true", "yes")
+    return Profiler(sample_rate=min(max(rate, 0.0), 1.0), memory=memory)
+
+
+# Süreç genelinde tek profiler: API ara katmanı, Library ve CLI aynı örneği kullanır
+PROFILER = _from_env()
@@ -0,0 +1,131 @@
+# resilience.py
+"""
+Dış servis (Open Library) çağrıları için dayanıklılık yapı taşları.
+
+- TokenBucket: istemci tarafı hız sınırı; saniyede `rate` istek, `burst` kadar
+  ani yük. Jeton yoksa çağıran (event loop'u bloklamadan) bekler.
+- RetryPolicy: idempotent GET'ler için tam jitter'lı üstel geri çekilme
+  (delay = U(0, min(cap, base * 2^deneme))); aynı anda düşen istemciler
+  aynı anda yeniden denemez.
+- CircuitBreaker: art arda `failure_threshold` başarısız çağrıdan sonra açılır
+  ve `reset_timeout` boyunca çağrıları hiç denemeden reddeder; süre dolunca tek
+  bir deneme çağrısına izin verir (yarı açık), başarılıysa kapanır.
+
+Hepsi thread-safe'tir: senkron istemcinin arka plan loop'u ile API loop'u aynı
+örnekleri paylaşabilir. Saat enjekte edilebilir (testler).
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+
+class UpstreamError(Exception):
+    """Dış servis şu an yanıt veremiyor (ağ hatası, 5xx, zaman aşımı, açık devre)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(UpstreamError):
+    """Devre açık: çağrı denenmeden reddedildi."""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int, clock: Callable[[], float] = time.monotonic) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Jeton alınabildiyse 0, aksi halde bir jeton için beklenecek süre (saniye)."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+@dataclass
+class RetryPolicy:
+    attempts: int = 3          # toplam deneme (ilk çağrı dahil)
+    base: float = 0.2          # ilk geri çekilme üst sınırı (saniye)
+    cap: float = 2.0           # tek bekleme için üst sınır
+
+    def delay(self, attempt: int) -> float:
+        """`attempt`. başarısızlıktan (0'dan başlar) sonra beklenecek süre."""
+        return random.uniform(0, min(self.cap, self.base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> bool:
+        """
+        Çağrıya izin yoksa CircuitOpenError atar. Çağrı yarı açık deneme ise True;
+        o zaman çağıran sonucu record_* ile bildirmeli, bildiremezse release_probe().
+        """
+        with self._lock:
+            if self._state == self.CLOSED:
+                return False
+            remaining = self.reset_timeout - (self._clock() - self._opened_at)
+            if remaining > 0 or self._probing:
+                raise CircuitOpenError("Open Library geçici olarak devre dışı (devre açık)",
+                                       retry_after=max(remaining, 1.0))
+            self._probing = True  # yarı açık: yalnızca bu çağrı geçer
+            return True
+
+    def release_probe(self) -> None:
+        """Deneme sonuçsuz bitti (beklenmeyen hata, iptal): sıradaki çağrı yeniden deneyebilsin."""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+            self._probing = False
@@ -0,0 +1,79 @@
+# response_cache.py
+"""
+Okuma endpoint'leri için serileştirilmiş yanıt önbelleği + ETag üretimi.
+
+Girdiler (Library.version, sorgu) çiftine bağlıdır. Library sürümü değiştiği
+anda (her add/remove/load) önbellek tümüyle boşaltılır; değişmeyen bir
+kütüphaneyi yoklayan istemciler ya 304 alır ya da hazır byte'ları.
+
+ETag gövdeden değil (süreç dönemi, sürüm, sorgu) üçlüsünden hesaplanır; bu
+yüzden If-None-Match kontrolü için gövdeyi kurmaya gerek yoktur. Dönem,
+yeniden başlatma sonrası aynı sürüm numarasının eski içerikle karışmasını önler.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    media_type: str = "application/json"
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.epoch = os.urandom(4).hex()
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[int] = None
+        self._data: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    @staticmethod
+    def query_key(path: str, items) -> str:
+        """Parametre sırasından bağımsız sorgu anahtarı."""
+        return path + "?" + "&".join(f"{k}={v}" for k, v in sorted(items))
+
+    def etag(self, version: int, key: str) -> str:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=6).hexdigest()
+        return f'"{self.epoch}-{version}-{digest}"'
+
+    def get(self, version: int, key: str) -> Optional[CachedResponse]:
+        self._sync(version)
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item
+
+    def put(self, version: int, key: str, item: CachedResponse) -> None:
+        self._sync(version)
+        self._data[key] = item
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def invalidate(self) -> None:
+        self._data.clear()
+        self._version = None
+
+    def _sync(self, version: int) -> None:
+        if version != self._version:  # kütüphane değişti: eski yanıtların hepsi bayat
+            self._data.clear()
+            self._version = version
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match başlığı (virgüllü liste, W/ öneki ya da *) verilen ETag'i kapsıyor mu?"""
+    if not if_none_match:
+        return False
+    candidates: Tuple[str, ...] = tuple(t.strip() for t in if_none_match.split(","))
+    return "*" in candidates or any(t.removeprefix("W/") == etag for t in candidates)
@@ -0,0 +1,235 @@
+# search.py
+"""
+Başlık ve yazarlar üzerinde bellek içi tam metin arama.
+
+- Türkçe duyarlı katlama: İ/I/ı → i, ardından casefold ve aksan silme
+  (ç→c, ş→s, ğ→g, ö→o, ü→u); "İSTANBUL", "istanbul", "Istanbul" aynı terimdir.
+- Ters indeks: terim -> {doküman: ağırlıklı tf}. Başlık eşleşmeleri yazar
+  eşleşmelerinden ağır basar.
+- Önek eşleşmesi: sıralı terim listesi üzerinde bisect ("dun" → "dune").
+- Yazım hatası toleransı: trigram indeksinden aday terimler, ardından
+  Damerau-Levenshtein (OSA) mesafesi ile doğrulama ("dnue" → "dune").
+- BM25 sıralaması; önek/bulanık genişlemeler ceza katsayısıyla puanlanır.
+
+İndeks artımlıdır: Library add/remove ile `add`/`remove` çağırır.
+"""
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+_TR = str.maketrans({"İ": "i", "I": "i", "ı": "i"})
+_TOKEN = re.compile(r"\w+")
+
+TITLE_WEIGHT = 2
+AUTHOR_WEIGHT = 1
+PREFIX_PENALTY = 0.7
+FUZZY_PENALTY = 0.4
+MAX_PREFIX_TERMS = 64
+MAX_FUZZY_CANDIDATES = 200
+RESULT_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=65536)
+def fold(text: str) -> str:
+    """Türkçe duyarlı, aksansız küçük harf."""
+    s = unicodedata.normalize("NFKD", (text or "").translate(_TR).casefold())
+    return "".join(c for c in s if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(fold(text))
+
+
+def trigrams(term: str) -> Set[str]:
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def osa_distance(a: str, b: str, limit: int) -> int:
+    """Optimal string alignment mesafesi (yer değiştirme = 1); `limit`i aşınca erken çıkar."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+class SearchIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_len: Dict[str, int] = {}
+        self._total_len = 0
+        self._terms: List[str] = []  # önek araması için sözlük (gerektiğinde sıralanır)
+        self._terms_dirty = False
+        self._trigrams: Dict[str, Set[str]] = {}
+        # Tekrarlanan sorgular için sonuç önbelleği; her add/remove'da boşaltılır
+        self._results: "OrderedDict[tuple, List[Tuple[str, float]]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    # ---------- bakım ----------
+    def _weighted_terms(self, title: str, author: str) -> Counter:
+        tf: Counter = Counter()
+        for t in tokenize(title):
+            tf[t] += TITLE_WEIGHT
+        for t in tokenize(author):
+            tf[t] += AUTHOR_WEIGHT
+        return tf
+
+    def add(self, doc_id: str, title: str, author: str) -> None:
+        if doc_id in self._doc_len:
+            raise KeyError(f"{doc_id} zaten indekste")
+        self._results.clear()
+        tf = self._weighted_terms(title, author)
+        for term, w in tf.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._terms.append(term)
+                self._terms_dirty = True
+                for g in trigrams(term):
+                    self._trigrams.setdefault(g, set()).add(term)
+            posting[doc_id] = w
+        length = sum(tf.values())
+        self._doc_len[doc_id] = length
+        self._total_len += length
+
+    def remove(self, doc_id: str, title: str, author: str) -> None:
+        length = self._doc_len.pop(doc_id, None)
+        if length is None:
+            return
+        self._results.clear()
+        self._total_len -= length
+        for term in self._weighted_terms(title, author):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(doc_id, None)
+            if not posting:
+                del self._postings[term]
+                terms = self._sorted_terms()
+                del terms[bisect_left(terms, term)]
+                for g in trigrams(term):
+                    bucket = self._trigrams[g]
+                    bucket.discard(term)
+                    if not bucket:
+                        del self._trigrams[g]
+
+    def _sorted_terms(self) -> List[str]:
+        # Toplu kurulumda her yeni terim için insort O(V²) olurdu; sona ekleyip
+        # ilk ihtiyaçta bir kez sıralıyoruz (neredeyse sıralı listede Timsort ~O(V)).
+        if self._terms_dirty:
+            self._terms.sort()
+            self._terms_dirty = False
+        return self._terms
+
+    # ---------- sorgu ----------
+    def expand(self, token: str, prefix: bool = True, fuzzy: bool = True) -> Dict[str, float]:
+        """Sorgu terimini indeks terimlerine genişletir: terim -> ağırlık."""
+        out: Dict[str, float] = {}
+        if token in self._postings:
+            out[token] = 1.0
+        if prefix:
+            terms = self._sorted_terms()
+            i = bisect_left(terms, token)
+            end = min(len(terms), i + MAX_PREFIX_TERMS)  # "a" gibi kısa öneklerde patlamasın
+            while i < end and terms[i].startswith(token):
+                out.setdefault(terms[i], PREFIX_PENALTY)
+                i += 1
+        if fuzzy and not out and len(token) >= 3:
+            limit = 1 if len(token) <= 4 else 2
+            shared: Counter = Counter()
+            for g in trigrams(token):
+                shared.update(self._trigrams.get(g, ()))
+            for term, _ in shared.most_common(MAX_FUZZY_CANDIDATES):
+                d = osa_distance(token, term, limit)
+                if d <= limit:
+                    out[term] = FUZZY_PENALTY / d
+        return out
+
+    def search(self, query: str, limit: int = 20, prefix: bool = True,
+               fuzzy: bool = True) -> List[Tuple[str, float]]:
+        """
+        BM25 ile sıralı (doküman, puan) listesi. Tüm sorgu terimlerini içeren
+        dokümanlar aranır; hiçbiri yoksa en az birini içerenlere düşülür.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens or not self._doc_len:
+            return []
+        cache_key = (tuple(tokens), limit, prefix, fuzzy)
+        cached = self._results.get(cache_key)
+        if cached is not None:
+            self._results.move_to_end(cache_key)
+            return list(cached)
+        expansions = [self.expand(t, prefix, fuzzy) for t in tokens]
+
+        # Aday kümesi: en seçici terimden başlayarak kesişim. Tek terimde küme
+        # kurulmaz; posting'ler doğrudan puanlanır.
+        candidates: Optional[Set[str]] = None
+        if sum(1 for exp in expansions if exp) > 1:
+            per_token: List[Set[str]] = []
+            for exp in expansions:
+                if not exp:
+                    continue
+                docs: Set[str] = set()
+                for term in exp:
+                    docs.update(self._postings[term])
+                per_token.append(docs)
+            per_token.sort(key=len)
+            candidates = per_token[0]
+            for docs in per_token[1:]:
+                candidates = candidates & docs
+            if not candidates:
+                candidates = None  # hiçbir doküman hepsini içermiyor: en az birini içerenler
+
+        n = len(self._doc_len)
+        avg = self._total_len / n
+        k1, b, doc_len = self.k1, self.b, self._doc_len
+        scores: Dict[str, float] = {}
+        for exp in expansions:
+            for term, weight in exp.items():
+                posting = self._postings[term]
+                idf = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+                if candidates is None:
+                    items: Iterable = posting.items()
+                elif len(candidates) < len(posting):
+                    items = ((d, posting[d]) for d in candidates if d in posting)
+                else:
+                    items = ((d, tf) for d, tf in posting.items() if d in candidates)
+                scale = weight * idf * (k1 + 1)
+                for doc, tf in items:
+                    norm = tf + k1 * (1 - b + b * doc_len[doc] / avg)
+                    scores[doc] = scores.get(doc, 0.0) + scale * tf / norm
+        top = heapq.nlargest(limit, scores.items(), key=lambda kv: (kv[1], kv[0]))
+        self._results[cache_key] = top
+        while len(self._results) > RESULT_CACHE_SIZE:
+            self._results.popitem(last=False)
+        return list(top)
+
+
+def build_index(items: Iterable[Tuple[str, str, str]], index: Optional[SearchIndex] = None) -> SearchIndex:
+    """(doküman, başlık, yazar) üçlülerinden indeks kurar."""
+    index = index or SearchIndex()
+    for doc_id, title, author in items:
+        index.add(doc_id, title, author)
+    return index
@@ -0,0 +1,46 @@
+# singleflight.py
+"""
+Eşzamanlı aynı işleri tek bir uçuştaki çağrıda birleştirme (single-flight).
+
+Aynı anahtar için iş sürerken gelen çağıranlar yeni bir iş başlatmaz, süren
+işin sonucunu (ya da hatasını) paylaşır. İş ayrı bir görevde koşar; ilk
+çağıran iptal edilse (ör. istemci bağlantıyı kesse) bile diğerleri etkilenmez.
+Sonuç saklanmaz: iş bitince anahtar boşalır, önbellek MetadataCache'in işidir.
+
+Görevler event loop'a bağlıdır; farklı bir loop'tan gelen çağrı kendi işini
+başlatır. Senkron OpenLibraryClient tüm thread'lerin isteklerini tek bir arka
+plan loop'unda koştuğu için senkron yol da aynı katmandan yararlanır.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class AsyncSingleFlight:
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0      # başlatılan iş sayısı
+        self.coalesced = 0  # süren bir işe katılan çağrı sayısı
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """`fn()`i `key` için en fazla bir kez uçuşta tutar; sonucunu döndürür."""
+        loop = asyncio.get_running_loop()
+        task = self._calls.get(key)
+        if task is not None and task.get_loop() is loop and not task.done():
+            self.coalesced += 1
+        else:
+            self.calls += 1
+            task = loop.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t, key=key: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # kimse beklemiyorsa "never retrieved" uyarısı çıkmasın
@@ -0,0 +1,331 @@
+# snapshot.py
+"""
+Süreçler arası paylaşılan ikili snapshot biçimi (library.snap).
+
+gunicorn altında her worker kendi kataloğunu kurmak yerine aynı dosyayı mmap
+ile açar; salt okunur sayfalar işletim sisteminin sayfa önbelleğinden
+paylaşılır. Açılışta çözümleme yapılmaz; arama ofset tablosunda ikili aramadır.
+
+Düzen (little-endian):
+
+    başlık   : magic "LIBSNAP1" | biçim sürümü u32 | kayıt sayısı u32 |
+               tablo ofseti u64 | heap ofseti u64
+    tablo    : kanonik ISBN'e göre sıralı, kayıt başına 24 bayt
+               anahtar ofseti u64 | anahtar uzunluğu u32 | kayıt ofseti u64 | kayıt uzunluğu u32
+    heap     : UTF-8 anahtarlar ve kayıtlar (kompakt JSON)
+
+Yazıcılar `<snap>.lock` kilidi altında diskteki en güncel sürümü okur, kendi
+işlemlerini onun üzerine uygular ve yeni snapshot'ı geçici dosyaya yazıp rename
+ile yayımlar; aynı dosyaya yazan worker'lar birbirinin yazımını ezmez. Okuyucular
+dosyanın kimliğini (inode, mtime, boyut) aralıklarla kontrol eder ve değişmişse
+yeni sürümü açar; eski eşleme, onu kullanan son okuyucu bırakınca kapanır.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from backends import Op, SnapshotFn, StorageBackend, file_lock
+from isbn import isbn_key
+from metrics import STORAGE_WRITE_BYTES
+
+MAGIC = b"LIBSNAP1"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQQ")
+_ENTRY = struct.Struct("<QIQI")
+
+
+def _encode(rec: dict) -> bytes:
+    return json.dumps(rec, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_snapshot(path: str | Path, items: Iterable[Tuple[str, dict]]) -> None:
+    """(kanonik anahtar, kayıt) çiftlerinden snapshot yazar ve atomik olarak yayımlar."""
+    _write_entries(Path(path), sorted((key.encode("utf-8"), _encode(rec)) for key, rec in items))
+
+
+def _write_entries(path: Path, entries: List[Tuple[bytes, bytes]]) -> None:
+    """Anahtara göre sıralı (anahtar, kayıt JSON'u) bayt çiftlerini yayımlar."""
+    table_off = _HEADER.size
+    heap_off = table_off + _ENTRY.size * len(entries)
+    table = bytearray()
+    heap = bytearray()
+    for key, rec in entries:
+        key_off = heap_off + len(heap)
+        heap += key
+        rec_off = heap_off + len(heap)
+        heap += rec
+        table += _ENTRY.pack(key_off, len(key), rec_off, len(rec))
+
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(entries), table_off, heap_off))
+        f.write(table)
+        f.write(heap)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp, path)
+    STORAGE_WRITE_BYTES.observe(size, file="snapshot")
+
+
+def _identity(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class SnapshotReader:
+    """Tek bir snapshot sürümünün salt okunur görünümü."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.identity = _identity(self.path)
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.count, self._table, _heap = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{self.path}: tanınmayan snapshot biçimi")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, i: int) -> Tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self._buf, self._table + i * _ENTRY.size)
+
+    def key_at(self, i: int) -> str:
+        key_off, key_len, _, _ = self._entry(i)
+        return self._buf[key_off:key_off + key_len].decode("utf-8")
+
+    def record_at(self, i: int) -> dict:
+        _, _, rec_off, rec_len = self._entry(i)
+        return json.loads(self._buf[rec_off:rec_off + rec_len])
+
+    def find(self, key: str) -> int:
+        """Anahtarın tablo satırı; yoksa -1 (ikili arama)."""
+        needle = key.encode("utf-8")
+        lo, hi = 0, self.count
+        buf, unpack, table, size = self._buf, _ENTRY.unpack_from, self._table, _ENTRY.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_off, key_len, _, _ = unpack(buf, table + mid * size)
+            probe = buf[key_off:key_off + key_len]
+            if probe < needle:
+                lo = mid + 1
+            elif probe > needle:
+                hi = mid
+            else:
+                return mid
+        return -1
+
+    def get(self, key: str) -> Optional[dict]:
+        i = self.find(key)
+        return None if i < 0 else self.record_at(i)
+
+    def keys(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self.key_at(i)
+
+    def raw_entries(self) -> Iterator[Tuple[bytes, bytes]]:
+        """(anahtar, kayıt JSON'u) bayt çiftleri, anahtar sırasıyla; kayıtlar çözülmez."""
+        buf = self._buf
+        for i in range(self.count):
+            key_off, key_len, rec_off, rec_len = self._entry(i)
+            yield buf[key_off:key_off + key_len], buf[rec_off:rec_off + rec_len]
+
+    def records(self) -> Iterator[dict]:
+        for i in range(self.count):
+            yield self.record_at(i)
+
+
+class SnapshotStore(MutableMapping):
+    """
+    Library için `kanonik anahtar -> Book` deposu: taban snapshot + bellekte
+    yapılan değişiklikler (overlay). Taban anahtar sırasıyla, sonra eklenenler
+    ekleme sırasıyla gezilir.
+    """
+
+    def __init__(self, path: str | Path, decode: Callable[[dict], object],
+                 check_interval: float = 0.5, backend: Optional["SnapshotBackend"] = None) -> None:
+        self.path = Path(path)
+        self._decode = decode
+        self.check_interval = check_interval
+        self._backend = backend  # bu sürecin yayımladığı sürümleri bilir
+        self._reader = SnapshotReader(self.path)
+        self._overlay: Dict[str, object] = {}
+        self._hidden: Set[str] = set()  # tabanda olup silinen/ezilen anahtarlar
+        self._checked = time.monotonic()
+
+    def refresh(self) -> bool:
+        """
+        Yeni bir snapshot yayımlandıysa ona geçer (overlay boşaltılır: yeni sürüm
+        bu sürecin commit ettiği değişiklikleri de içerir). İçerik değiştiyse True;
+        yeni sürümü bu süreç kendi görünümünden yayımladıysa geçiş sessizdir (False),
+        görünüm aynı kaldığı için indeksler ve değişiklik akışı sıfırlanmaz.
+        """
+        now = time.monotonic()
+        if now - self._checked < self.check_interval:
+            return False
+        self._checked = now
+        identity = _identity(self.path)
+        if identity is None or identity == self._reader.identity:
+            return False
+        backend = self._backend
+        # Bu süreç yayımlarken bekleme: yeni sürüm sonraki kontrolde alınır
+        if backend is not None and not backend._mutex.acquire(blocking=False):
+            return False
+        try:
+            reader = SnapshotReader(self.path)
+            own = backend is not None and backend._adopt(reader.identity)
+        finally:
+            if backend is not None:
+                backend._mutex.release()
+        # Nesneler yerinde boşaltılmaz, değiştirilir: başka thread'de süren bir
+        # gezinti (ör. commit sırasında snapshot alma) eski sürümü tutarlı görür.
+        # Eski eşleme, onu kullanan son gezinti bitince kapanır.
+        self._reader = reader
+        self._overlay = {}
+        self._hidden = set()
+        return not own
+
+    def _in_base(self, key: str) -> bool:
+        return key not in self._hidden and self._reader.find(key) >= 0
+
+    # ---------- MutableMapping ----------
+    def __getitem__(self, key: str):
+        book = self._overlay.get(key)
+        if book is not None:
+            return book
+        if key in self._hidden:
+            raise KeyError(key)
+        i = self._reader.find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._decode(self._reader.record_at(i))
+
+    def __setitem__(self, key: str, book) -> None:
+        if key not in self._overlay and self._in_base(key):
+            self._hidden.add(key)
+        self._overlay.pop(key, None)
+        self._overlay[key] = book
+
+    def __delitem__(self, key: str) -> None:
+        if self._overlay.pop(key, None) is not None:
+            return
+        if not self._in_base(key):
+            raise KeyError(key)
+        self._hidden.add(key)
+
+    def __iter__(self) -> Iterator[str]:
+        for key, _ in self._walk(decode=False):
+            yield key
+
+    def items(self):
+        return list(self._walk())
+
+    def values(self):
+        return [book for _, book in self._walk()]
+
+    def _walk(self, decode: bool = True) -> Iterator[Tuple[str, object]]:
+        reader, overlay, hidden = self._reader, list(self._overlay.items()), self._hidden
+        for i in range(reader.count):
+            key = reader.key_at(i)
+            if key not in hidden:
+                yield key, self._decode(reader.record_at(i)) if decode else None
+        yield from overlay
+
+    def __len__(self) -> int:
+        return self._reader.count - len(self._hidden) + len(self._overlay)
+
+    def __contains__(self, key) -> bool:
+        return key in self._overlay or self._in_base(key)
+
+    def close(self) -> None:
+        self._overlay.clear()
+
+
+class SnapshotBackend(StorageBackend):
+    """
+    İkili snapshot dosyasını kalıcı durum olarak kullanır. Her commit yeni bir
+    snapshot yayımlar (O(n) yeniden yazım); okuma ağırlıklı, çok süreçli
+    dağıtımlar içindir. `Library(..., lazy=True)` ile açılınca kayıtlar mmap'ten
+    erişimde çözülür ve diğer süreçlerin yayımladığı sürümler otomatik alınır.
+
+    Commit'ler `<snap>.lock` ile sıralanır ve işlemler bellekteki görünüm yerine
+    diskteki en güncel snapshot'ın üzerine uygulanır (aynı ISBN'de son yazan
+    kazanır); başka bir worker'ın arada yayımladığı ekleme kaybolmaz.
+
+    Görünümün dayandığı sürüm arada değişmediyse yayımlanan dosya bellekteki
+    görünümün aynısıdır; kimliği kaydedilir ve SnapshotStore ona geçerken bunu
+    yabancı bir değişiklik saymaz (değişiklik akışının epoch'u korunur).
+    """
+
+    def __init__(self, path: str | Path, check_interval: float = 0.5) -> None:
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.check_interval = check_interval
+        self._mutex = threading.Lock()  # aynı süreçteki thread'ler için
+        self._seen = None       # bellekteki görünümün dayandığı sürümün kimliği
+        self._published = None  # bu örneğin görünümüyle aynı olarak yayımladığı son sürüm
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            if not self.path.exists():
+                write_snapshot(self.path, [])
+
+    def load(self) -> Iterator[dict]:
+        with self._mutex:
+            reader = SnapshotReader(self.path)
+            self._seen = reader.identity
+        return reader.records()
+
+    def open_lazy(self, decode, key) -> Optional[MutableMapping]:
+        with self._mutex:
+            store = SnapshotStore(self.path, decode, check_interval=self.check_interval, backend=self)
+            self._seen = store._reader.identity
+        return store
+
+    def commit(self, ops: List[Op], snapshot: SnapshotFn) -> None:
+        if not ops:
+            return
+        with self._mutex, file_lock(self.lock_path):
+            # Diskteki kayıtlar çözülmeden taşınır; yalnızca işlemler kodlanır
+            reader = SnapshotReader(self.path)
+            entries = dict(reader.raw_entries())
+            for kind, payload in ops:
+                if kind == "add":
+                    entries[isbn_key(payload["isbn"]).encode("utf-8")] = _encode(payload)
+                else:
+                    entries.pop(isbn_key(payload).encode("utf-8"), None)
+            _write_entries(self.path, sorted(entries.items()))
+            self._published = None
+            if reader.identity == self._seen:  # arada başka yayımlayan yok
+                self._seen = self._published = _identity(self.path)
+
+    def export(self, records: Iterable[dict]) -> None:
+        with self._mutex, file_lock(self.lock_path):
+            write_snapshot(self.path, ((isbn_key(r["isbn"]), r) for r in records))
+            self._published = None  # tam yazım: açık görünümler yeniden kurulsun
+
+    def _adopt(self, identity) -> bool:
+        """SnapshotStore yeni sürüme geçti (mutex altında). Sürüm bu örneğin yayımladığıysa True."""
+        own = identity is not None and identity == self._published
+        self._seen = identity
+        return own
+
+
+if __name__ == "__main__":
+    # library.json -> library.snap dönüştürücü:  python snapshot.py library.json library.snap
+    import sys
+    from backends import iter_json_records
+
+    src, dst = sys.argv[1], sys.argv[2]
+    write_snapshot(dst, ((isbn_key(r["isbn"]), r) for r in iter_json_records(Path(src))))
@@ -0,0 +1,334 @@
+# sqlite_backend.py
+"""
+SQLite (stdlib sqlite3) kalıcılık katmanı.
+
+- WAL modu: okuyucular yazıcıyı beklemez; birden çok süreç (gunicorn worker'ları)
+  aynı veritabanına yazabilir. Her commit yalnızca değişen satırları yazar;
+  JSON backend'deki gibi birbirinin tam dosyasını ezmez.
+- Her commit işlemlerini aynı transaction'da `changes` tablosuna da (artan seq)
+  ekler. Diğer süreçler `changes()` ile yalnızca kendi son seq'lerinden sonraki
+  satırları okuyup belleklerini artımlı günceller (bkz. Library.refresh); bir şey
+  değişmediyse `PRAGMA data_version` tek başına yeter. Tablo son `max_log_rows`
+  satırla sınırlıdır; geride kalan okuyucu tam yeniden yükler.
+- Şema, Book/ComicBook/Magazine kalıtımını sınıf başına tabloyla modeller:
+  ortak alanlar `books`ta, alt sınıf alanları `comic_books`/`magazines`ta.
+- İndeksler: kanonik ISBN (birincil anahtar), katlanmış başlık ve yazar.
+- Yazarlar normalize edilir: `authors` (Open Library anahtarı -> isim) ve
+  kitap<->yazar bağları `book_authors`ta; `query(author_key=...)` bu indeksi kullanır.
+- Sabit SQL metinleri + executemany: sqlite3 derlenmiş ifadeleri önbellekte
+  tutar (hazır ifade); bir commit'in tüm işlemleri tek transaction'dır.
+
+library.json'dan taşıma:
+
+    python sqlite_backend.py library.json library.db
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional
+
+from authors import split_names
+from backends import Op, SnapshotFn, StorageBackend, iter_json_records
+from isbn import isbn_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id          INTEGER PRIMARY KEY,          -- ekleme sırası
+    key         TEXT NOT NULL UNIQUE,         -- kanonik ISBN
+    isbn        TEXT NOT NULL,                -- girildiği biçim
+    kind        TEXT NOT NULL DEFAULT 'Book',
+    title       TEXT NOT NULL,
+    author      TEXT NOT NULL,
+    title_fold  TEXT NOT NULL,
+    author_fold TEXT NOT NULL,
+    author_keys TEXT                          -- Open Library yazar anahtarları (\x1f ile)
+);
+CREATE INDEX IF NOT EXISTS books_title ON books(title_fold);
+CREATE INDEX IF NOT EXISTS books_author ON books(author_fold);
+CREATE TABLE IF NOT EXISTS comic_books (
+    key         TEXT PRIMARY KEY REFERENCES books(key) ON DELETE CASCADE,
+    illustrator TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS magazines (
+    key          TEXT PRIMARY KEY REFERENCES books(key) ON DELETE CASCADE,
+    issue_number INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS authors (
+    key  TEXT PRIMARY KEY,                    -- /authors/OL1A
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS book_authors (
+    key        TEXT NOT NULL REFERENCES books(key) ON DELETE CASCADE,
+    position   INTEGER NOT NULL,
+    author_key TEXT NOT NULL,
+    PRIMARY KEY (key, position)
+);
+CREATE INDEX IF NOT EXISTS book_authors_author ON book_authors(author_key);
+CREATE TABLE IF NOT EXISTS changes (
+    seq     INTEGER PRIMARY KEY AUTOINCREMENT,
+    src     TEXT NOT NULL,                    -- yazan örneğin imzası
+    op      TEXT NOT NULL,                    -- add | remove | reset (tam yeniden yazım)
+    payload TEXT                              -- add: kayıt JSON'u, remove: isbn
+);
+"""
+
+_KEY_SEP = "\x1f"  # books.author_keys: sıralı anahtarlar tek sütunda (okuma join'siz)
+
+# Alt sınıf tabloları: tür -> (tablo, alan)
+_SUBTYPES = {"ComicBook": ("comic_books", "illustrator"), "Magazine": ("magazines", "issue_number")}
+
+_SELECT = """
+SELECT b.title, b.author, b.isbn, b.kind, c.illustrator, m.issue_number, b.author_keys
+FROM books b
+LEFT JOIN comic_books c ON c.key = b.key
+LEFT JOIN magazines m ON m.key = b.key
+"""
+_DELETE = "DELETE FROM books WHERE key = ?"
+_INSERT = ("INSERT INTO books (key, isbn, kind, title, author, title_fold, author_fold, author_keys) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_INSERT_SUB = {kind: f"INSERT INTO {table} (key, {column}) VALUES (?, ?)"
+               for kind, (table, column) in _SUBTYPES.items()}
+_INSERT_LINK = "INSERT INTO book_authors (key, position, author_key) VALUES (?, ?, ?)"
+_INSERT_AUTHOR = "INSERT OR IGNORE INTO authors (key, name) VALUES (?, ?)"
+_INSERT_CHANGE = "INSERT INTO changes (src, op, payload) VALUES (?, ?, ?)"
+
+
+def _fold(text: str) -> str:
+    return (text or "").strip().lower()  # models._fold ile aynı
+
+
+def _record(row) -> dict:
+    title, author, isbn, kind, illustrator, issue_number, author_keys = row
+    rec = {"title": title, "author": author, "isbn": isbn}
+    if kind == "ComicBook":
+        rec["illustrator"] = illustrator
+    elif kind == "Magazine":
+        rec["issue_number"] = issue_number
+    if author_keys:
+        rec["author_keys"] = author_keys.split(_KEY_SEP)
+    rec["type"] = kind
+    return rec
+
+
+class SqliteBackend(StorageBackend):
+    def __init__(self, path: str | Path, timeout: float = 30.0, max_log_rows: int = 10_000) -> None:
+        """
+        timeout: başka bir süreç yazarken kilidin beklenme süresi (saniye).
+        max_log_rows: `changes` tablosunda tutulan son işlem sayısı.
+        """
+        self.path = Path(path)
+        self.max_log_rows = max_log_rows
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._token = os.urandom(6).hex()  # bu örneğin changes tablosundaki imzası
+        self._seq = 0                      # okunan son changes satırı
+        self._data_version = None          # PRAGMA data_version'ın son görülen değeri
+        # Commit'ler API'de thread havuzundan gelir; bağlantıyı kilitle koruyoruz
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None,
+                                   check_same_thread=False, cached_statements=64)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # WAL'da commit başına fsync gerekmez
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(books)")}
+        if "author_keys" not in columns:  # yazar varlıklarından önce oluşturulmuş veritabanı
+            self._db.execute("ALTER TABLE books ADD COLUMN author_keys TEXT")
+
+    # ---------- okuma ----------
+    def load(self) -> Iterator[dict]:
+        with self._lock:
+            self._db.execute("BEGIN")  # kayıtlar ve seq aynı ana ait olsun
+            try:
+                rows = self._db.execute(_SELECT + " ORDER BY b.id").fetchall()
+                self._seq = self._db.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+                self._data_version = self._db.execute("PRAGMA data_version").fetchone()[0]
+            finally:
+                self._db.execute("COMMIT")
+        return (_record(r) for r in rows)
+
+    def changes(self) -> Optional[List[Op]]:
+        # Commit sürüyorsa (bu süreçte) okuyucuyu bekletme
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            # Başka bir bağlantı commit etmediyse data_version aynıdır: sorgu yok
+            version = self._db.execute("PRAGMA data_version").fetchone()[0]
+            if version == self._data_version:
+                return []
+            self._db.execute("BEGIN")
+            try:
+                first = self._db.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+                rows = self._db.execute("SELECT seq, src, op, payload FROM changes WHERE seq > ? ORDER BY seq",
+                                        (self._seq,)).fetchall()
+            finally:
+                self._db.execute("COMMIT")
+            self._data_version = version
+            if not rows:
+                return []
+            if first is not None and first > self._seq + 1:
+                return None  # okunmamış satırlar budanmış
+            self._seq = rows[-1][0]
+            ops: List[Op] = []
+            for _seq, src, op, payload in rows:
+                if src == self._token:
+                    continue
+                if op == "reset":
+                    return None  # başka bir süreç tabloları baştan yazdı
+                ops.append((op, json.loads(payload) if op == "add" else payload))
+            return ops
+        finally:
+            self._lock.release()
+
+    def author_name(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT name FROM authors WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, isbn: str) -> Optional[dict]:
+        """Tek kayıt (kanonik ISBN indeksinden)."""
+        with self._lock:
+            row = self._db.execute(_SELECT + " WHERE b.key = ?", (isbn_key(isbn),)).fetchone()
+        return _record(row) if row else None
+
+    def query(self, title: Optional[str] = None, author: Optional[str] = None,
+              kind: Optional[str] = None, limit: Optional[int] = None,
+              author_key: Optional[str] = None, by_key: bool = False) -> List[dict]:
+        """
+        Başlık/yazar (büyük/küçük harf duyarsız, tam eşleşme), tür ve Open Library
+        yazar anahtarı (ortak yazarlı kitaplar dahil) filtreli sorgu. Sonuçlar
+        ekleme sırasıyla; by_key=True ise kanonik ISBN sırasıyla (Library.page gibi).
+        """
+        where, args = [], []
+        if author_key is not None:
+            where.append("b.key IN (SELECT key FROM book_authors WHERE author_key = ?)")
+            args.append(author_key)
+        for column, value in (("b.title_fold", title), ("b.author_fold", author)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(_fold(value))
+        if kind is not None:
+            where.append("b.kind = ?")
+            args.append(kind)
+        sql = _SELECT + (" WHERE " + " AND ".join(where) if where else "")
+        sql += " ORDER BY b.key" if by_key else " ORDER BY b.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            return [_record(r) for r in self._db.execute(sql, args)]
+
+    # ---------- yazma ----------
+    def commit(self, ops: List[Op], snapshot: SnapshotFn) -> None:
+        if not ops:
+            return
+        with self._lock, self._transaction():
+            self._apply(ops)
+            self._log([(kind, json.dumps(payload, ensure_ascii=False) if kind == "add" else payload)
+                       for kind, payload in ops])
+
+    def export(self, records: Iterable[dict]) -> None:
+        """Tabloların içeriğini verilen kayıtlarla değiştirir (tek transaction)."""
+        with self._lock, self._transaction():
+            self._db.execute("DELETE FROM books")
+            self._insert(records)
+            self._log([("reset", None)])
+
+    def insert_many(self, records: Iterable[dict], batch_size: int = 10_000) -> int:
+        """Toplu ekleme (taşıma): `batch_size` kayıtta bir transaction. Eklenen sayısı."""
+        total = 0
+        it = iter(records)
+        while True:
+            chunk = list(islice(it, batch_size))
+            if not chunk:
+                return total
+            with self._lock, self._transaction():
+                self._insert(chunk, replace=True)
+                self._log([("reset", None)])  # açık Library'ler satır satır izlemesin
+            total += len(chunk)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    # ---------- yardımcılar ----------
+    @contextmanager
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")  # yazma kilidi baştan: worker'lar arası deadlock yok
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _log(self, entries: List[tuple]) -> None:
+        """İşlemleri changes tablosuna ekler ve tabloyu son max_log_rows satıra budar."""
+        self._db.executemany(_INSERT_CHANGE, [(self._token, op, payload) for op, payload in entries])
+        seq = self._db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        self._db.execute("DELETE FROM changes WHERE seq <= ?", (seq - self.max_log_rows,))
+        # Bellek bu commit'i zaten içeriyor; arada başka yazım yoksa kendi satırlarımızı okunmuş say
+        if self._seq == seq - len(entries):
+            self._seq = seq
+
+    def _apply(self, ops: List[Op]) -> None:
+        # Ardışık aynı türden işlemler gruplanıp executemany ile yazılır
+        adds: List[dict] = []
+        for kind, payload in ops:
+            if kind == "add":
+                adds.append(payload)
+                continue
+            if adds:
+                self._insert(adds, replace=True)
+                adds = []
+            self._db.execute(_DELETE, (isbn_key(payload),))
+        if adds:
+            self._insert(adds, replace=True)
+
+    def _insert(self, records: Iterable[dict], replace: bool = False) -> None:
+        latest: dict = {}
+        for rec in records:  # aynı ISBN birden çok kez gelirse sonuncusu (sonda) kalır
+            key = isbn_key(rec["isbn"])
+            latest.pop(key, None)
+            latest[key] = rec
+        rows, subs, links, names = [], {kind: [] for kind in _SUBTYPES}, [], []
+        for key, rec in latest.items():
+            kind = rec.get("type", "Book")
+            author_keys = rec.get("author_keys") or ()
+            rows.append((key, rec["isbn"], kind, rec["title"], rec["author"],
+                         _fold(rec["title"]), _fold(rec["author"]),
+                         _KEY_SEP.join(author_keys) or None))
+            if kind in _SUBTYPES:
+                subs[kind].append((key, rec[_SUBTYPES[kind][1]]))
+            links.extend((key, i, akey) for i, akey in enumerate(author_keys))
+            names.extend(zip(author_keys, split_names(rec["author"], author_keys) or ()))
+        if replace:  # yeniden eklenen kayıt sona gider (JSON/günlük davranışı)
+            self._db.executemany(_DELETE, [(r[0],) for r in rows])
+        self._db.executemany(_INSERT, rows)
+        for kind, values in subs.items():
+            if values:
+                self._db.executemany(_INSERT_SUB[kind], values)
+        if links:
+            self._db.executemany(_INSERT_LINK, links)
+            self._db.executemany(_INSERT_AUTHOR, names)
+
+
+def migrate_json(json_path: str | Path, db_path: str | Path, batch_size: int = 10_000) -> int:
+    """library.json'daki kayıtları SQLite veritabanına aktarır; aktarılan kayıt sayısı."""
+    backend = SqliteBackend(db_path)
+    try:
+        return backend.insert_many(iter_json_records(Path(json_path)), batch_size=batch_size)
+    finally:
+        backend.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    count = migrate_json(sys.argv[1], sys.argv[2])
+    print(f"{count} kayıt aktarıldı -> {sys.argv[2]}")
@@ -4,12 +4,14 @@ import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 import os
 import json
+import subprocess
 import httpx
 import pytest
 from pathlib import Path
 from fastapi.testclient import TestClient
 
 from api import create_app
+from openlibrary_client import OpenLibraryClient
 
 
 @pytest.fixture()
@@ -20,6 +22,12 @@ def client(tmp_path: Path, monkeypatch):
     return TestClient(app)
 
 
+def _use_fake(client, fake_get):
+    """Open Library çağrılarını sahte yanıtlayıcıya yönlendirir (ağsız)."""
+    transport = httpx.MockTransport(lambda request: fake_get(str(request.url)))
+    client.app.state.ol_client = OpenLibraryClient(transport=transport)
+
+
 def test_get_books_initially_empty(client):
     r = client.get("/books")
     assert r.status_code == 200
@@ -27,7 +35,7 @@ def test_get_books_initially_empty(client):
 
 
 def test_post_books_success_with_isbn(client, monkeypatch):
-    # httpx.get'i taklit ederek Open Library çağrılarını sahte yanıtla dolduruyoruz
+    # Open Library çağrılarını sahte transport ile yanıtlıyoruz
     def fake_get(url, timeout=10, **kwargs):
         # /isbn/<isbn>.json
         if url.endswith("/isbn/9780441172719.json"):
@@ -43,7 +51,7 @@ def test_post_books_success_with_isbn(client, monkeypatch):
         r._content = json.dumps(data).encode("utf-8")
         return r
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    _use_fake(client, fake_get)
 
     # POST /books
     r = client.post("/books", json={"isbn": "9780441172719"})
@@ -64,7 +72,7 @@ def test_post_books_not_found_returns_404(client, monkeypatch):
     def fake_get(url, timeout=10, **kwargs):
         return httpx.Response(status_code=404, request=httpx.Request("GET", url))
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    _use_fake(client, fake_get)
 
     r = client.post("/books", json={"isbn": "0000000000"})
     assert r.status_code == 404
@@ -85,7 +93,7 @@ def test_delete_books_flow(client, monkeypatch):
         r._content = json.dumps(data).encode("utf-8")
         return r
 
-    monkeypatch.setattr(httpx, "get", fake_get)
+    _use_fake(client, fake_get)
 
     r = client.post("/books", json={"isbn": "9780132350884"})
     assert r.status_code == 201
@@ -97,3 +105,185 @@ def test_delete_books_flow(client, monkeypatch):
     # tekrar silmeye kalkınca 404
     r = client.delete("/books/9780132350884")
     assert r.status_code == 404
+
+
+def test_post_books_invalid_checksum_returns_400(client):
+    r = client.post("/books", json={"isbn": "9780441172718"})
+    assert r.status_code == 400
+
+
+def test_post_books_duplicate_in_other_form_returns_409(client, monkeypatch):
+    calls = []
+
+    def fake_get(url, timeout=10, **kwargs):
+        calls.append(url)
+        if url.endswith("/isbn/9780441172719.json"):
+            r = httpx.Response(200, request=httpx.Request("GET", url))
+            r._content = json.dumps({"title": "Dune", "authors": []}).encode("utf-8")
+            return r
+        return httpx.Response(404, request=httpx.Request("GET", url))
+
+    _use_fake(client, fake_get)
+
+    assert client.post("/books", json={"isbn": "978-0441172719"}).status_code == 201
+    # ISBN-10 yazımı aynı kitap: dış servise gitmeden 409
+    r = client.post("/books", json={"isbn": "0441172717"})
+    assert r.status_code == 409
+    assert len(calls) == 1
+    assert client.delete("/books/0-441-17271-7").status_code == 204
+
+
+def test_post_books_batch_streams_ndjson(client):
+    def fake_get(url, timeout=10, **kwargs):
+        if url.endswith("/isbn/9780132350884.json"):
+            return _json_resp(200, {"title": "Clean Code", "authors": []})
+        return _json_resp(404, {})
+
+    _use_fake(client, fake_get)
+
+    r = client.post("/books:batch", json={"isbns": ["9780132350884", "978-0132350884", "bad"]})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(l) for l in r.text.splitlines()]
+    assert [l.get("status") for l in lines[:3]] == ["added", "duplicate", "invalid"]
+    assert lines[0]["book"]["title"] == "Clean Code"
+    assert lines[-1] == {"summary": {"added": 1, "duplicate": 1, "invalid": 1}}
+    assert len(client.get("/books").json()) == 1
+
+
+def _json_resp(status, data):
+    r = httpx.Response(status_code=status, request=httpx.Request("GET", "http://x"))
+    r._content = json.dumps(data).encode("utf-8")
+    return r
+
+
+def _seed(client, books):
+    lib = client.app.state.lib
+    with lib.batch():  # tek commit
+        for b in books:
+            lib.add_book(b)
+
+
+def test_get_books_cursor_pagination_and_filters(client):
+    from models import Book, ComicBook
+    _seed(client, [
+        Book("Dune", "Frank Herbert", "9780441172719"),
+        Book("Clean Code", "Robert C. Martin", "9780132350884"),
+        ComicBook("Watchmen", "Alan Moore", "9780930289232", illustrator="Dave Gibbons"),
+        Book("Dune Messiah", "Frank Herbert", "9780593098233"),
+    ])
+
+    r = client.get("/books", params={"limit": 2})
+    assert [b["isbn"] for b in r.json()] == ["9780132350884", "9780441172719"]
+    assert r.headers["X-Next-Cursor"] == "9780441172719"
+    assert 'rel="next"' in r.headers["Link"]
+
+    r = client.get("/books", params={"limit": 2, "after": r.headers["X-Next-Cursor"]})
+    assert [b["isbn"] for b in r.json()] == ["9780593098233", "9780930289232"]
+    assert "X-Next-Cursor" not in r.headers
+
+    r = client.get("/books", params={"author": "frank herbert", "limit": 1, "after": "978-0441172719"})
+    assert [b["title"] for b in r.json()] == ["Dune Messiah"]
+    r = client.get("/books", params={"kind": "ComicBook"})
+    assert [b["title"] for b in r.json()] == ["Watchmen"]
+
+
+def test_get_books_ndjson_stream(client):
+    from models import Book
+    _seed(client, [Book(f"Kitap {i}", "Yazar", f"isbn-{i:04d}") for i in range(2500)])
+
+    r = client.get("/books", params={"format": "ndjson"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(l) for l in r.text.splitlines()]
+    assert len(rows) == 2500
+    assert rows[0] == {"title": "Kitap 0", "author": "Yazar", "isbn": "isbn-0000", "kind": "Book"}
+
+    r = client.get("/books", params={"title": "kitap 7"}, headers={"Accept": "application/x-ndjson"})
+    assert [json.loads(l)["isbn"] for l in r.text.splitlines()] == ["isbn-0007"]
+
+
+def test_get_books_etag_and_conditional_requests(client):
+    from models import Book
+    _seed(client, [Book("Dune", "Frank Herbert", "9780441172719")])
+
+    r1 = client.get("/books")
+    etag = r1.headers["ETag"]
+    assert client.get("/books").headers["ETag"] == etag
+    assert client.app.state.response_cache.hits == 1
+
+    r = client.get("/books", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b""
+    # Farklı sorgu farklı temsil
+    assert client.get("/books", params={"limit": 1}).headers["ETag"] != etag
+
+    # Değişiklik sürümü artırır: eski ETag artık tutmaz, önbellek yenilenir
+    assert client.delete("/books/9780441172719").status_code == 204
+    r = client.get("/books", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.json() == []
+    assert r.headers["ETag"] != etag
+
+
+def test_concurrent_posts_of_same_isbn_make_one_upstream_call(tmp_path: Path):
+    import asyncio
+
+    calls = []
+
+    async def slow_upstream(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)  # istekler birbirinin uçuşuna denk gelsin
+        if request.url.path.startswith("/isbn/"):
+            return httpx.Response(200, json={"title": "Dune", "authors": [{"key": "/authors/OL1A"}]})
+        return httpx.Response(200, json={"name": "Frank Herbert"})
+
+    app = create_app(str(tmp_path / "library.json"),
+                     ol_client=OpenLibraryClient(transport=httpx.MockTransport(slow_upstream)))
+
+    async def burst(n):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            isbns = ["9780441172719", "0441172717"] * (n // 2)
+            return await asyncio.gather(*(http.post("/books", json={"isbn": i}) for i in isbns))
+
+    responses = asyncio.run(burst(8))
+    assert sorted(r.status_code for r in responses) == [201] + [409] * 7
+    assert calls == ["/isbn/9780441172719.json", "/authors/OL1A.json"]
+
+
+def test_author_books_endpoint_and_known_authors_not_refetched(tmp_path: Path):
+    calls = []
+    editions = {
+        "9780441172719": {"title": "Dune", "authors": [{"key": "/authors/OL1A"}]},
+        "9780060853983": {"title": "Good Omens", "authors": [{"key": "/authors/OL2A"}, {"key": "/authors/OL1A"}]},
+    }
+    names = {"/authors/OL1A": "Frank Herbert", "/authors/OL2A": "Terry Pratchett"}
+
+    def upstream(request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        calls.append(path)
+        if path.startswith("/isbn/"):
+            return httpx.Response(200, json=editions[path[len("/isbn/"):-len(".json")]])
+        return httpx.Response(200, json={"name": names[path[:-len(".json")]]})
+
+    client = TestClient(create_app(str(tmp_path / "library.json"),
+                                   ol_client=OpenLibraryClient(transport=httpx.MockTransport(upstream))))
+    assert client.post("/books", json={"isbn": "9780441172719"}).status_code == 201
+    assert client.post("/books", json={"isbn": "9780060853983"}).status_code == 201
+    assert calls.count("/authors/OL1A.json") == 1  # ikinci kitapta tablodan okundu
+
+    r = client.get("/authors/OL1A/books")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["key"] == "/authors/OL1A" and body["name"] == "Frank Herbert"
+    assert [b["title"] for b in body["books"]] == ["Dune", "Good Omens"]
+    assert [b["title"] for b in client.get("/books", params={"author": "frank herbert"}).json()] == \
+        ["Good Omens", "Dune"]  # ortak yazarlı kitap da bulunur (ISBN sırası)
+    assert client.get("/authors/OL9A/books").status_code == 404
+
+
+def test_import_creates_no_files(tmp_path: Path):
+    # Varsayılan uygulama ilk istekte kurulur; içe aktarmak çalışma dizinine dosya yazmaz
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys; sys.path.insert(0, sys.argv[1]); import api; print(callable(api.app))"
+    out = subprocess.run([sys.executable, "-c", code, root], cwd=tmp_path, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "True"
+    assert list(tmp_path.iterdir()) == []
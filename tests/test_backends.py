@@ -0,0 +1,218 @@
+# tests/test_backends.py
+# Amaç: JournalBackend'in günlük + snapshot kalıcılığını ve çökme kurtarmasını test etmek.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import json
+from pathlib import Path
+
+from backends import JournalBackend, JsonFileBackend, read_json_records
+from models import Book, ComicBook, Library
+
+
+def _journal_lib(db: Path, **kw) -> Library:
+    return Library(db, backend=JournalBackend(db, **kw))
+
+
+def test_journal_appends_without_rewriting_snapshot(tmp_path: Path):
+    db = tmp_path / "library.json"
+    lib = _journal_lib(db)
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    lib.add_book(ComicBook("Watchmen", "Alan Moore", "9780930289232", illustrator="Dave Gibbons"))
+    lib.remove_book("9780441172719")
+    lib.close()
+
+    # Snapshot dokunulmadı, değişiklikler günlükte
+    assert json.loads(db.read_text(encoding="utf-8")) == []
+    lines = (tmp_path / "library.json.wal").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(l)["op"] for l in lines] == ["add", "add", "remove"]
+
+    lib2 = _journal_lib(db)
+    assert lib2.find_book("9780441172719") is None
+    assert isinstance(lib2.find_book("9780930289232"), ComicBook)
+
+
+def test_journal_recovers_from_torn_tail(tmp_path: Path):
+    db = tmp_path / "library.json"
+    lib = _journal_lib(db)
+    lib.add_book(Book("The Hobbit", "J.R.R. Tolkien", "9780345339683"))
+    lib.close()
+
+    wal = tmp_path / "library.json.wal"
+    good_size = wal.stat().st_size
+    with open(wal, "ab") as f:
+        f.write(b'{"op": "add", "book": {"title": "Yar')  # çökme anında yarım satır
+
+    lib2 = _journal_lib(db)
+    assert [b.isbn for b in lib2.list_books()] == ["9780345339683"]
+    assert wal.stat().st_size == good_size  # bozuk kuyruk kesildi
+
+
+def test_journal_compaction_folds_into_snapshot(tmp_path: Path):
+    db = tmp_path / "library.json"
+    lib = _journal_lib(db, compact_threshold=5, background=False)
+    for i in range(7):
+        lib.add_book(Book(f"Kitap {i}", "Yazar", f"isbn-{i}"))
+    lib.close()
+
+    # 5. işlemde sıkıştırma: snapshot 5 kayıt, günlükte 2 işlem kaldı
+    assert len(json.loads(db.read_text(encoding="utf-8"))) == 5
+    assert not (tmp_path / "library.json.wal.old").exists()
+    assert len((tmp_path / "library.json.wal").read_text(encoding="utf-8").splitlines()) == 2
+
+    lib2 = _journal_lib(db)
+    assert len(lib2.list_books()) == 7
+
+
+def test_save_books_exports_plain_json(tmp_path: Path):
+    db = tmp_path / "library.json"
+    lib = _journal_lib(db)
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    lib.save_books()
+
+    data = json.loads(db.read_text(encoding="utf-8"))
+    assert data == [{"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719", "type": "Book"}]
+    assert not (tmp_path / "library.json.wal").exists()
+
+
+# --- Akış halinde ve tembel yükleme ---
+
+def test_iter_json_records_handles_chunk_boundaries(tmp_path: Path):
+    from backends import iter_json_records
+
+    path = tmp_path / "library.json"
+    records = [{"title": f"Kitap {{{i}}} \"]\"", "author": "Yazar", "isbn": f"isbn-{i}", "type": "Book"}
+               for i in range(50)]
+    path.write_text(json.dumps(records, ensure_ascii=False, indent=2), encoding="utf-8")
+    assert list(iter_json_records(path, chunk_size=7)) == records
+
+    path.write_text("", encoding="utf-8")
+    assert list(iter_json_records(path)) == []
+    path.write_text('[{"isbn": "1"}, {"isbn"', encoding="utf-8")
+    try:
+        list(iter_json_records(path, chunk_size=4))
+    except json.JSONDecodeError:
+        pass
+    else:
+        raise AssertionError("yarım dosya hata vermeliydi")
+
+
+def test_lazy_load_replays_journal_over_snapshot(tmp_path: Path):
+    db = tmp_path / "library.json"
+    lib = _journal_lib(db)
+    lib.add_book(Book("Dune", "Frank Herbert", "0441172717"))
+    lib.add_book(ComicBook("Watchmen", "Alan {Moore}", "isbn-w", illustrator="Dave Gibbons"))
+    lib.save_books()  # ikisi snapshot'ta
+    lib.add_book(Book("Dune Messiah", "Frank Herbert", "9780593098233"))
+    lib.remove_book("isbn-w")  # günlükte
+    lib.close()
+
+    lazy = Library(db, backend=JournalBackend(db), lazy=True)
+    eager = _journal_lib(db)
+    assert [str(b) for b in lazy.list_books()] == [str(b) for b in eager.list_books()]
+    assert lazy.find_book("9780441172719").title == "Dune"
+    assert [b.title for b in lazy.list_by_author("frank herbert")] == ["Dune", "Dune Messiah"]
+
+    # Değişiklikler tembel depo üzerinde de kalıcı
+    lazy.remove_book("9780441172719")
+    lazy.add_book(Book("Emma", "Jane Austen", "isbn-e"))
+    lazy.save_books()
+    lazy.close()
+    assert [b.title for b in Library(db, lazy=True).list_books()] == ["Dune Messiah", "Emma"]
+
+
+# --- Süreçler arası yazım: kilit, birleştirme, değişiklik bildirimi ---
+
+def test_reads_check_other_writers_at_most_once_per_interval(tmp_path: Path):
+    db = tmp_path / "library.json"
+    a, b = Library(db, refresh_interval=3600), Library(db)
+    b.add_book(Book("Dune", "Frank Herbert", "isbn-1"))
+    calls = []
+    real = a.backend.changes
+    a.backend.changes = lambda: calls.append(1) or real()
+    for _ in range(100):
+        assert a.find_book("isbn-1") is None  # aralık dolmadı: dosyaya bakılmaz
+    assert calls == []
+    a.refresh()  # açık çağrı her zaman kontrol eder
+    assert a.find_book("isbn-1").title == "Dune" and calls == [1]
+
+
+def test_two_writers_merge_and_see_each_other_incrementally(tmp_path: Path):
+    db = tmp_path / "library.json"
+    a, b = Library(db, refresh_interval=0), Library(db, refresh_interval=0)
+    a.add_book(Book("Dune", "Frank Herbert", "isbn-1"))
+    b.add_book(Book("Emma", "Jane Austen", "isbn-2"))  # a'nın yazdığından habersiz başladı
+
+    stored = {r["isbn"] for r in json.loads(db.read_text(encoding="utf-8"))}
+    assert stored == {"isbn-1", "isbn-2"}  # kimse kimsenin güncellemesini ezmedi
+
+    # Diğer örnek dosyayı baştan ayrıştırmadan, günlükten günceller
+    def no_full_reload():
+        raise AssertionError("tam yeniden yükleme beklenmiyordu")
+    a.load_books = no_full_reload
+    assert a.find_book("isbn-2").title == "Emma"
+    b.remove_book("isbn-1")
+    assert [x.isbn for x in a.list_books()] == ["isbn-2"]
+
+
+def test_stale_merge_matches_isbn_forms(tmp_path: Path):
+    db = tmp_path / "library.json"
+    first, second = JsonFileBackend(db), JsonFileBackend(db)
+    dune = {"title": "Dune", "author": "Frank Herbert", "isbn": "0441172717", "type": "Book"}
+    first.commit([("add", dune)], lambda: [dune])
+    # İkinci yazar bayat: işlemleri diskteki kayıtlarla birleştirilir
+    second.commit([("add", {**dune, "title": "Dune (2. baskı)", "isbn": "978-0441172719"})], lambda: [])
+    assert [r["title"] for r in read_json_records(db)] == ["Dune (2. baskı)"]
+    second.commit([("remove", "9780441172719")], lambda: [])
+    assert read_json_records(db) == []
+
+def test_concurrent_writer_processes_lose_no_updates(tmp_path: Path):
+    import subprocess
+
+    db = tmp_path / "library.json"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = (
+        "import sys; sys.path.insert(0, sys.argv[1])\n"
+        "from models import Book, Library\n"
+        "lib = Library(sys.argv[2])\n"
+        "for start in range(0, int(sys.argv[4]), 5):\n"
+        "    with lib.batch():  # grup içinde yenileme yok: bayat bellekle commit zorlanır\n"
+        "        for i in range(start, start + 5):\n"
+        "            assert lib.add_book(Book(f'Kitap {i}', 'Yazar', f'{sys.argv[3]}-{i}'))\n"
+        "        assert lib.remove_book(f'{sys.argv[3]}-{start + 4}')\n"
+    )
+    workers, writes = 6, 40
+    procs = [subprocess.Popen([sys.executable, "-c", script, root, str(db), f"w{w}", str(writes)])
+             for w in range(workers)]
+    assert all(p.wait(timeout=120) == 0 for p in procs)
+
+    expected = {f"w{w}-{i}" for w in range(workers) for i in range(writes) if i % 5 != 4}
+    assert {b.isbn for b in Library(db).list_books()} == expected
+
+
+def test_journal_folds_leftover_old_wal_before_rotating(tmp_path: Path):
+    db = tmp_path / "library.json"
+    old_wal = tmp_path / "library.json.wal.old"
+    # Önceki süreç döndürdükten sonra, snapshot'ı yazamadan çöktü
+    old_wal.write_text(json.dumps({"op": "add", "book": {
+        "title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719", "type": "Book"}}) + "\n",
+        encoding="utf-8")
+    lib = _journal_lib(db, compact_threshold=1, background=False)
+    assert not old_wal.exists()
+    assert [r["isbn"] for r in json.loads(db.read_text(encoding="utf-8"))] == ["9780441172719"]
+
+    lib.add_book(Book("The Hobbit", "J.R.R. Tolkien", "9780345339683"))  # döndürme + sıkıştırma
+    lib.close()
+    assert {b.isbn for b in _journal_lib(db).list_books()} == {"9780441172719", "9780345339683"}
+
+
+def test_journal_replay_matches_isbn_forms(tmp_path: Path):
+    db = tmp_path / "library.json"
+    db.write_text(json.dumps([{"title": "Dune", "author": "Frank Herbert", "isbn": "0441172717", "type": "Book"}]),
+                  encoding="utf-8")
+    (tmp_path / "library.json.wal").write_text(
+        json.dumps({"op": "add", "book": {"title": "Dune (2. baskı)", "author": "Frank Herbert",
+                                          "isbn": "978-0441172719", "type": "Book"}}) + "\n"
+        + json.dumps({"op": "remove", "isbn": "9780441172719"}) + "\n"
+        + json.dumps({"op": "add", "book": {"title": "Emma", "author": "Jane Austen",
+                                            "isbn": "isbn-e", "type": "Book"}}) + "\n", encoding="utf-8")
+    assert [r["title"] for r in JournalBackend(db).load()] == ["Emma"]
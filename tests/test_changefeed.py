@@ -0,0 +1,136 @@
+# tests/test_changefeed.py
+# Amaç: değişiklik akışının sıralı olaylar ürettiğini, snapshot+delta ile bir
+# kopyanın kurulabildiğini, long-poll/SSE teslimini ve eski imleçte 410'u doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import create_app
+from changefeed import ChangeLog, StaleCursor
+from models import Book, Library
+from snapshot import SnapshotBackend
+
+
+def test_changelog_ring_and_epoch():
+    feed = ChangeLog(retain=3)
+    feed.record([("add", {"isbn": "9780441172719"}), ("remove", "978-0441172719")])
+    assert [(s, op, key) for s, op, key, _ in feed.since(0)] == [(1, "add", "9780441172719"),
+                                                               (2, "remove", "9780441172719")]
+    feed.record([("remove", "9780441172719")] * 3)  # halka taştı: 1 ve 2 düştü
+    assert [e[0] for e in feed.since(2)] == [3, 4, 5]
+    with pytest.raises(StaleCursor):
+        feed.since(1)
+    epoch = feed.epoch
+    feed.reset()
+    with pytest.raises(StaleCursor):
+        feed.since(5, epoch=epoch)
+    assert feed.since(5, epoch=feed.epoch) == []
+
+
+def test_refresh_records_foreign_writes(tmp_path: Path):
+    path = tmp_path / "library.json"
+    reader = Library(path)
+    writer = Library(path)
+    start = reader.feed.seq
+    writer.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    assert reader.refresh()
+    assert [(e[1], e[2]) for e in reader.feed.since(start)] == [("add", "9780441172719")]
+
+
+
+def test_own_snapshot_publish_keeps_feed_epoch(tmp_path: Path):
+    path = tmp_path / "library.snap"
+    lib = Library(path, backend=SnapshotBackend(path, check_interval=0), lazy=True)
+    epoch, start = lib.feed.epoch, lib.feed.seq
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    assert not lib.refresh()  # kendi yayımladığı sürüme sessizce geçer
+    assert [e[2] for e in lib.feed.since(start, epoch)] == ["9780441172719"]
+    assert lib.find_book("9780441172719").title == "Dune"
+
+    # Başka bir worker'ın yayımladığı sürüm delta olarak ifade edilemez: yeni epoch
+    other = Library(path, backend=SnapshotBackend(path, check_interval=0), lazy=True)
+    other.add_book(Book("Emma", "Jane Austen", "isbn-e"))
+    assert lib.refresh()
+    with pytest.raises(StaleCursor):
+        lib.feed.since(start, epoch)
+    assert sorted(b.title for b in lib.list_books()) == ["Dune", "Emma"]
+
+
+@pytest.fixture()
+def client(tmp_path: Path):
+    with TestClient(create_app(str(tmp_path / "library.json"))) as c:
+        yield c
+
+
+def _replica(client):
+    """Snapshot satırlarından kopya kurar: (epoch, seq, {isbn: kayıt})."""
+    lines = [json.loads(x) for x in client.get("/changes/snapshot").text.splitlines()]
+    head, records = lines[0], lines[1:]
+    assert head["count"] == len(records)
+    return head["epoch"], head["seq"], {r["isbn"]: r for r in records}
+
+
+def test_snapshot_then_delta_rebuilds_catalogue(client):
+    lib = client.app.state.lib
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    epoch, seq, books = _replica(client)
+    assert set(books) == {"9780441172719"}
+
+    lib.add_book(Book("Neuromancer", "William Gibson", "9780441569595"))
+    assert client.delete("/books/9780441172719").status_code == 204
+    body = client.get("/changes", params={"since": seq, "epoch": epoch}).json()
+    assert [(e["op"], e["key"]) for e in body["events"]] == [("add", "9780441569595"), ("remove", "9780441172719")]
+    for e in body["events"]:
+        if e["op"] == "add":
+            books[e["key"]] = e["book"]
+        else:
+            books.pop(e["key"])
+    assert books == _replica(client)[2]
+    assert body["more"] is False
+
+    # Tam yeniden yükleme yeni epoch başlatır: eski imleç 410
+    lib.load_books()
+    assert client.get("/changes", params={"since": body["seq"], "epoch": epoch}).status_code == 410
+
+
+def test_long_poll_wakes_on_write(client):
+    lib = client.app.state.lib
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    seq, epoch = lib.feed.seq, lib.feed.epoch
+    assert client.get("/changes", params={"since": seq, "wait": 0.1}).json()["events"] == []
+
+    result = {}
+
+    def poll():
+        start = time.perf_counter()
+        result["body"] = client.get("/changes", params={"since": seq, "epoch": epoch, "wait": 10}).json()
+        result["elapsed"] = time.perf_counter() - start
+
+    t = threading.Thread(target=poll)
+    t.start()
+    time.sleep(0.2)
+    assert client.delete("/books/9780441172719").status_code == 204
+    t.join(5)
+    assert [e["op"] for e in result["body"]["events"]] == ["remove"]
+    assert result["elapsed"] < 5
+
+
+def test_sse_stream_resumes_from_last_event_id(client):
+    lib = client.app.state.lib
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    lib.remove_book("9780441172719")
+    epoch = lib.feed.epoch
+    r = client.get("/changes", params={"format": "sse", "wait": 0.2},
+                   headers={"Last-Event-ID": f"{epoch}:{lib.feed.seq - 1}"})
+    assert r.headers["content-type"].startswith("text/event-stream")
+    frames = [f for f in r.text.split("\n\n") if f.startswith("id:")]
+    assert frames == [f"id: {epoch}:{lib.feed.seq}\nevent: remove\n"
+                      f'data: {{"seq": {lib.feed.seq}, "op": "remove", "key": "9780441172719"}}']
+    assert client.get("/changes", params={"format": "sse"},
+                      headers={"Last-Event-ID": f"eski:{lib.feed.seq}"}).status_code == 410
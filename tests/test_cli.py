@@ -0,0 +1,80 @@
+# tests/test_cli.py
+# Amaç: betik alt komutlarının (list/find/add/remove/search/export) çıktı ve
+# çıkış kodlarını, snapshot/SQLite'tan okumayı ve okuma komutlarının ağır
+# modülleri (httpx, asyncio) yüklemediğini doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import json
+import subprocess
+from pathlib import Path
+
+from main import main
+from models import Library, book_to_record
+from snapshot import SnapshotBackend
+from sqlite_backend import migrate_json
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _seed(db: Path):
+    assert main(["--db", str(db), "add", "978-0441172719", "--title", "Dune", "--author", "Frank Herbert"]) == 0
+    assert main(["--db", str(db), "add", "9780441569595", "--title", "Neuromancer",
+                 "--author", "William Gibson", "--illustrator", "Raúl"]) == 0
+
+
+def test_subcommands_and_exit_codes(tmp_path: Path, capsys):
+    db = tmp_path / "library.json"
+    _seed(db)
+    assert main(["--db", str(db), "add", "0441172717", "--title", "Dune"]) == 1  # zaten var
+    capsys.readouterr()
+
+    assert main(["--db", str(db), "list"]) == 0
+    assert capsys.readouterr().out.splitlines() == [
+        "Dune by Frank Herbert (ISBN: 978-0441172719)",
+        "Neuromancer (Comic) by William Gibson, illus. Raúl (ISBN: 9780441569595)"]
+    main(["--db", str(db), "list", "--kind", "ComicBook", "--json"])
+    assert json.loads(capsys.readouterr().out)["illustrator"] == "Raúl"
+    assert main(["--db", str(db), "find", "0441172717", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["title"] == "Dune"
+    assert main(["--db", str(db), "search", "gibson"]) == 0
+    assert "Neuromancer" in capsys.readouterr().out
+
+    out = tmp_path / "export.json"
+    assert main(["--db", str(db), "export", "-o", str(out)]) == 0
+    assert [r["isbn"] for r in json.loads(out.read_text(encoding="utf-8"))] == ["978-0441172719", "9780441569595"]
+
+    assert main(["--db", str(db), "remove", "9780441172719"]) == 0
+    assert main(["--db", str(db), "remove", "9780441172719"]) == 1
+    assert main(["--db", str(db), "find", "9780441172719"]) == 1
+    assert [b.title for b in Library(db).list_books()] == ["Neuromancer"]
+
+
+def test_reads_from_snapshot_and_sqlite(tmp_path: Path, capsys):
+    db = tmp_path / "library.json"
+    _seed(db)
+    snap = tmp_path / "library.snap"
+    SnapshotBackend(snap).export(book_to_record(b) for b in Library(db).list_books())
+    migrate_json(db, tmp_path / "library.db")
+    capsys.readouterr()
+
+    assert main(["--snapshot", str(snap), "list", "--limit", "1"]) == 0
+    assert capsys.readouterr().out.startswith("Dune")
+    assert main(["--db", str(tmp_path / "library.db"), "find", "9780441569595"]) == 0
+    assert "Neuromancer" in capsys.readouterr().out
+    assert main(["--db", str(tmp_path / "library.db"), "list", "--author", "frank herbert", "--json"]) == 0
+    assert json.loads(capsys.readouterr().out)["title"] == "Dune"
+    # .db'de de filtreli/sınırlı liste ekleme sırası değil kanonik ISBN sırasıdır
+    assert main(["--db", str(tmp_path / "library.db"), "add", "9780060853983", "--title", "Good Omens"]) == 0
+    capsys.readouterr()
+    assert main(["--db", str(tmp_path / "library.db"), "list", "--limit", "3"]) == 0
+    assert [line.split(" (")[0].split(" by ")[0] for line in capsys.readouterr().out.splitlines()] == \
+        ["Good Omens", "Dune", "Neuromancer"]
+
+
+def test_read_commands_skip_heavy_imports(tmp_path: Path):
+    db = tmp_path / "library.json"
+    _seed(db)
+    code = ("import sys, main; rc = main.main(['--db', sys.argv[1], 'find', '9780441172719']); "
+            "print(rc, sorted(m for m in ('httpx', 'asyncio', 'cProfile', 'sqlite3') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code, str(db)], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.splitlines()[-1] == "0 []"
@@ -0,0 +1,85 @@
+# tests/test_dump_ingest.py
+# Amaç: Open Library dökümlerinin ağsız okunup yazar indeksiyle birleştirilerek
+# Library'ye yüklendiğini, beklenmedik satırların atlandığını, ISBN süzgecinin ve
+# süreç havuzunun çalıştığını ve önbelleğin servis yanıt vermediğinde yerel yedek
+# olarak kullanıldığını doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import gzip
+import json
+from pathlib import Path
+
+import httpx
+
+from main import main
+from metadata_cache import EDITION, MetadataCache
+from models import Library
+from openlibrary_client import OpenLibraryClient
+from resilience import RetryPolicy
+
+
+def _tsv(rtype, key, data):
+    return f"{rtype}\t{key}\t1\t2024-01-01T00:00:00\t{json.dumps(data)}\n"
+
+
+def _write_dumps(tmp_path: Path):
+    authors = tmp_path / "authors.txt.gz"
+    with gzip.open(authors, "wt", encoding="utf-8") as f:
+        f.write(_tsv("/type/author", "/authors/OL1A", {"key": "/authors/OL1A", "name": "Frank Herbert"}))
+        f.write(_tsv("/type/author", "/authors/OL2A", {"key": "/authors/OL2A", "name": "Terry Pratchett"}))
+        f.write(_tsv("/type/author", "/authors/OL3A", {"key": "/authors/OL3A", "personal_name": "Neil Gaiman"}))
+        f.write("bozuk satır\n")
+    editions = tmp_path / "editions.txt.gz"
+    with gzip.open(editions, "wt", encoding="utf-8") as f:
+        f.write(_tsv("/type/edition", "/books/OL1M", {
+            "title": "Dune", "isbn_10": ["0441172717"], "authors": [{"key": "/authors/OL1A"}]}))
+        f.write(_tsv("/type/edition", "/books/OL2M", {
+            "title": "Good Omens", "isbn_13": ["978-0-06-085398-3"],
+            "authors": [{"key": "/authors/OL2A"}, {"key": "/authors/OL3A"}]}))
+        f.write(_tsv("/type/edition", "/books/OL3M", {"title": "ISBN'siz", "authors": []}))
+        f.write(_tsv("/type/work", "/works/OL1W", {"title": "Eser", "isbn_13": ["9780441569595"]}))
+        # JSON satırı biçimi; yazarı indekste yok
+        f.write(json.dumps({"type": {"key": "/type/edition"}, "key": "/books/OL4M", "title": "Neuromancer",
+                            "isbn_13": ["9780441569595"], "authors": [{"key": "/authors/OL9A"}]}) + "\n")
+        # Beklenmedik biçimler atlanır, okumayı durdurmaz
+        f.write(json.dumps({"type": "/type/work", "title": "Eser", "isbn_13": ["9780060853983"]}) + "\n")
+        f.write("[1, 2]\n")
+        f.write(_tsv("/type/edition", "/books/OL5M", ["liste"]))
+    return authors, editions
+
+
+def test_ingest_dump_offline(tmp_path: Path, capsys):
+    authors, editions = _write_dumps(tmp_path)
+    db = tmp_path / "library.json"
+    assert main(["--db", str(db), "ingest-dump", "--authors", str(authors), "--editions", str(editions),
+                 "--workers", "0", "--chunk-size", "2"]) == 0
+    assert json.loads(capsys.readouterr().out) == {"authors": 3, "matched": 3, "added": 3, "duplicate": 0}
+
+    lib = Library(db)
+    assert [(b.isbn, b.title, b.author) for b in lib.list_books()] == [
+        ("9780441172719", "Dune", "Frank Herbert"),
+        ("9780060853983", "Good Omens", "Terry Pratchett, Neil Gaiman"),
+        ("9780441569595", "Neuromancer", "Unknown"),
+    ]
+    assert lib.find_book("9780060853983").author_keys == ("/authors/OL2A", "/authors/OL3A")
+
+
+def test_ingest_dump_isbn_filter_with_process_pool(tmp_path: Path, capsys):
+    authors, editions = _write_dumps(tmp_path)
+    isbns = tmp_path / "isbns.txt"
+    isbns.write_text("# yalnızca bunlar\n978-0441172719\n0060853980\n", encoding="utf-8")
+    db = tmp_path / "library.json"
+    main(["--db", str(db), "ingest-dump", "--authors", str(authors), "--editions", str(editions),
+          "--isbns", str(isbns), "--workers", "2", "--chunk-size", "1", "--cache-editions"])
+    assert json.loads(capsys.readouterr().out)["added"] == 2
+    assert {b.isbn for b in Library(db).list_books()} == {"9780441172719", "9780060853983"}
+
+    # Çevrimiçi istemci: servis yanıt vermezken süresi dolmuş önbellek kaydı yedektir
+    cache = MetadataCache(tmp_path / "library.cache.sqlite", positive_ttl=-1)
+    cache.put_many(EDITION, [("9780441172719", {"title": "Dune", "author": "Frank Herbert",
+                                                 "isbn": "9780441172719", "author_keys": ["/authors/OL1A"]})])
+    down = httpx.MockTransport(lambda request: httpx.Response(503))
+    client = OpenLibraryClient(cache=cache, transport=down, retry=RetryPolicy(attempts=1), rate_limit=None)
+    assert client.fetch_by_isbn("0441172717")["author"] == "Frank Herbert"
+    assert cache.stats.stale_hits == 1
+    client.close()
@@ -0,0 +1,38 @@
+# tests/test_isbn.py
+# Amaç: ISBN kanonikleştirme (checksum, ISBN-10 → ISBN-13) ve Library eşdeğerliği.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pathlib import Path
+
+from isbn import canonical_isbn, isbn_key, to_isbn10
+from models import Book, Library
+
+
+def test_canonical_isbn_accepts_10_and_13_digit_forms():
+    for raw in ["9780441172719", "978-0441172719", " 978 0 441 17271 9 ", "0441172717", "0-441-17271-7"]:
+        assert canonical_isbn(raw) == "9780441172719"
+    # Sondaki X kontrol hanesi (küçük harf de olur)
+    assert canonical_isbn("080442957x") == "9780804429573"
+    assert to_isbn10("9780441172719") == "0441172717"
+
+
+def test_canonical_isbn_rejects_bad_checksums():
+    assert canonical_isbn("9780441172718") is None
+    assert canonical_isbn("1234567890") is None
+    assert canonical_isbn("abc") is None
+    # Geçersiz olanlar yine de temizlenmiş haliyle anahtar olabilir (Stage 1 uyumu)
+    assert isbn_key("12-34567890") == "1234567890"
+
+
+def test_library_lookups_use_canonical_key(tmp_path: Path):
+    lib = Library(tmp_path / "library.json")
+    assert lib.add_book(Book("Dune", "Frank Herbert", "978-0441172719")) is True
+
+    assert lib.find_book("9780441172719").title == "Dune"
+    assert lib.find_book("0441172717").title == "Dune"
+    # Aynı kitabın ISBN-10 yazımı tekrar sayılır
+    assert lib.add_book(Book("Dune", "Frank Herbert", "0441172717")) is False
+
+    assert lib.remove_book("0-441-17271-7") is True
+    assert lib.list_books() == []
+    assert Library(tmp_path / "library.json").list_books() == []
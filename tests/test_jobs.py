@@ -0,0 +1,180 @@
+# tests/test_jobs.py
+# Amaç: asenkron eklemenin 202 + iş kimliğiyle hemen döndüğünü, işin arka planda
+# tamamlandığını, servis hatasında yeniden denendiğini, "Unknown" yazarlı
+# kayıtların zenginleştirildiğini ve aynı kuyruk dosyasını paylaşan süreçlerin bir
+# işi yalnızca bir kez aldığını (kirası dolan işin yeniden alındığını), kilitli
+# kuyruğun event loop'u bloklamadığını doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+from api import create_app
+from jobs import ADD, EnrichmentWorker, JobStore
+from models import Book, ComicBook, Library
+from openlibrary_client import OpenLibraryClient
+from resilience import UpstreamError
+from writer import CommitQueue
+
+DUNE = {"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719",
+        "author_keys": ["/authors/OL2162288A"]}
+
+
+class FakeUpstream:
+    """fetch_many yanıtlarını sırayla veren sahte istemci (ağsız)."""
+
+    def __init__(self, *rounds):
+        self.rounds = list(rounds)
+        self.calls = []
+
+    async def fetch_many(self, isbns):
+        self.calls.append(list(isbns))
+        answer = self.rounds.pop(0) if len(self.rounds) > 1 else self.rounds[0]
+        return [answer(i) if callable(answer) else answer for i in isbns]
+
+
+async def _drain(worker: EnrichmentWorker, timeout: float = 5.0) -> None:
+    worker.start()
+    deadline = time.monotonic() + timeout
+    while set(worker.store.counts()) - {"done", "duplicate", "not_found", "unchanged", "failed"}:
+        assert time.monotonic() < deadline, worker.store.counts()
+        await asyncio.sleep(0.01)
+    await worker.stop()
+
+
+def test_async_add_returns_202_and_completes(tmp_path: Path):
+    released = threading.Event()  # iş, tekrar gönderim kontrol edilene kadar beklesin
+
+    async def fake_get(request):
+        while not released.is_set():
+            await asyncio.sleep(0.01)
+        url = str(request.url)
+        if url.endswith("/isbn/9780441172719.json"):
+            body = {"title": "Dune", "authors": [{"key": "/authors/OL2162288A"}]}
+        elif url.endswith("/authors/OL2162288A.json"):
+            body = {"name": "Frank Herbert"}
+        else:
+            return httpx.Response(404, json={})
+        return httpx.Response(200, content=json.dumps(body).encode())
+
+    with TestClient(create_app(str(tmp_path / "library.json"))) as client:
+        client.app.state.ol_client = OpenLibraryClient(transport=httpx.MockTransport(fake_get))
+        r = client.post("/books", json={"isbn": "0441172717"}, headers={"Prefer": "respond-async"})
+        assert r.status_code == 202, r.text
+        job = r.json()
+        assert r.headers["Location"] == f"/jobs/{job['id']}"
+        assert (job["kind"], job["isbn"], job["status"]) == ("add", "9780441172719", "queued")
+        # Bekleyen iş tekrar gönderilirse aynı iş döner
+        assert client.post("/books?async=true", json={"isbn": "9780441172719"}).json()["id"] == job["id"]
+        released.set()
+
+        deadline = time.monotonic() + 5
+        while (job := client.get(f"/jobs/{job['id']}").json())["status"] in ("queued", "running"):
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        assert job["status"] == "done"
+        assert job["book"] == {"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719", "kind": "Book"}
+        assert [b["isbn"] for b in client.get("/books").json()] == ["9780441172719"]
+        assert client.get("/jobs").json() == {"done": 1}
+        assert client.get("/jobs/yok").status_code == 404
+
+
+def test_worker_batches_and_retries_upstream_errors(tmp_path: Path):
+    async def scenario():
+        lib = Library(tmp_path / "library.json")
+        store = JobStore(tmp_path / "jobs.sqlite")
+        upstream = FakeUpstream(UpstreamError("503"), lambda i: dict(DUNE) if i == DUNE["isbn"] else None)
+        worker = EnrichmentWorker(lib, CommitQueue(lib), lambda: upstream, store, workers=1, backoff=0.01)
+        store.enqueue(ADD, "9780441172719")
+        store.enqueue(ADD, "9780441569595")
+        await _drain(worker)
+        return lib, store, upstream
+
+    lib, store, upstream = asyncio.run(scenario())
+    assert upstream.calls == [["9780441172719", "9780441569595"]] * 2  # tek grup, bir yeniden deneme
+    assert store.counts() == {"done": 1, "not_found": 1}
+    assert lib.find_book("9780441172719").author == "Frank Herbert"
+
+
+def test_enrich_updates_unknown_authors_and_keeps_kind(tmp_path: Path):
+    async def scenario():
+        lib = Library(tmp_path / "library.json")
+        lib.add_book(ComicBook("Dune", "Unknown", "9780441172719", illustrator="Raúl Allén"))
+        lib.add_book(Book("Neuromancer", "Unknown", "9780441569595"))
+        upstream = FakeUpstream(lambda i: dict(DUNE) if i == DUNE["isbn"] else {**DUNE, "author": "Unknown"})
+        worker = EnrichmentWorker(lib, CommitQueue(lib), lambda: upstream)
+        assert len(await worker.enrich_unknown()) == 2
+        await _drain(worker)
+        return lib, worker.store
+
+    lib, store = asyncio.run(scenario())
+    assert store.counts() == {"done": 1, "unchanged": 1}
+    reloaded = Library(tmp_path / "library.json").find_book("9780441172719")
+    assert (type(reloaded), reloaded.author, reloaded.author_keys) == \
+        (ComicBook, "Frank Herbert", ("/authors/OL2162288A",))
+    assert [b.isbn for b in lib.list_by_author("Unknown")] == ["9780441569595"]
+
+
+def test_stores_sharing_a_file_claim_once_and_reclaim_expired_leases(tmp_path: Path):
+    now = [1000.0]
+    a = JobStore(tmp_path / "jobs.sqlite", clock=lambda: now[0], lease=60)
+    jobs = [a.enqueue(ADD, f"isbn-{i}") for i in range(40)]
+
+    # İkinci worker açılınca diğerinin işlerine dokunmaz; eşzamanlı alımlar çakışmaz
+    b = JobStore(tmp_path / "jobs.sqlite", clock=lambda: now[0], lease=60)
+    claimed = {"a": [], "b": []}
+
+    def take(name, store):
+        while batch := store.claim(3):
+            claimed[name].extend(j["id"] for j in batch)
+
+    threads = [threading.Thread(target=take, args=item) for item in (("a", a), ("b", b))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(claimed["a"] + claimed["b"]) == sorted(j["id"] for j in jobs)
+    assert JobStore(tmp_path / "jobs.sqlite").counts() == {"running": 40}
+
+    # Kirası dolan iş (sahibi çöktü) yeniden alınır; eski sahibin geç sonucu yazılmaz
+    c = JobStore(tmp_path / "jobs.sqlite", clock=lambda: now[0], lease=60)
+    assert c.claim(1) == []
+    now[0] += 61
+    job_id = c.claim(1)[0]["id"]
+    late = a if job_id in claimed["a"] else b
+    late.finish(job_id, "done")
+    assert c.get(job_id)["status"] == "running"
+    c.finish(job_id, "not_found")
+    assert late.get(job_id)["status"] == "not_found"
+
+
+def test_locked_queue_does_not_block_the_event_loop(tmp_path: Path):
+    path = tmp_path / "jobs.sqlite"
+    JobStore(path).close()
+    other = sqlite3.connect(str(path))
+    other.execute("BEGIN IMMEDIATE")  # başka bir süreç kuyruğu kilitli tutuyor
+
+    async def scenario():
+        lib = Library(tmp_path / "library.json")
+        worker = EnrichmentWorker(lib, CommitQueue(lib), lambda: FakeUpstream(None),
+                                  store=JobStore(path))
+        worker.start()  # claim kilidi bekler
+        submit = asyncio.ensure_future(worker.submit_add("9780441172719"))
+        ticks = 0
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert ticks == 10 and not submit.done()  # loop dönmeye devam etti
+        other.rollback()
+        job = await submit
+        await _drain(worker)
+        return worker.store.get(job["id"])["status"]
+
+    assert asyncio.run(scenario()) == "not_found"
@@ -0,0 +1,114 @@
+# tests/test_metadata_cache.py
+# Amaç: MetadataCache'in LRU/disk katmanlarını, TTL'leri ve OpenLibraryClient
+# entegrasyonunu sahte HTTP transport ile (ağsız) test etmek.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pathlib import Path
+
+import httpx
+import pytest
+
+from metadata_cache import MISS, MetadataCache
+from openlibrary_client import OpenLibraryClient
+from resilience import RetryPolicy, UpstreamError
+
+
+class FakeOpenLibrary:
+    """httpx.MockTransport işleyicisi; gelen istekleri sayar."""
+    def __init__(self):
+        self.requests = []
+        self.editions = {
+            "9780441172719": {"title": "Dune", "authors": [{"key": "/authors/OL1A"}]},
+            "9780441013593": {"title": "Dune Messiah", "authors": [{"key": "/authors/OL1A"}]},
+        }
+        self.authors = {"/authors/OL1A": {"name": "Frank Herbert"}}
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if path.startswith("/isbn/"):
+            data = self.editions.get(path[len("/isbn/"):-len(".json")])
+        else:
+            data = self.authors.get(path[:-len(".json")])
+        return httpx.Response(200, json=data) if data else httpx.Response(404)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+
+def _client(cache, fake):
+    return OpenLibraryClient(cache=cache, transport=httpx.MockTransport(fake))
+
+
+def test_positive_and_author_results_are_cached():
+    fake = FakeOpenLibrary()
+    cache = MetadataCache()
+    client = _client(cache, fake)
+
+    assert client.fetch_by_isbn("9780441172719")["author"] == "Frank Herbert"
+    assert client.fetch_by_isbn("978-0441172719")["title"] == "Dune"  # aynı kanonik anahtar
+    assert fake.requests == ["/isbn/9780441172719.json", "/authors/OL1A.json"]
+
+    # Aynı yazar başka ISBN'de tekrar çekilmez
+    assert client.fetch_by_isbn("9780441013593")["author"] == "Frank Herbert"
+    assert fake.requests[-1] == "/isbn/9780441013593.json"
+    assert cache.stats.hits == 2 and cache.stats.misses == 3
+
+
+def test_negative_results_use_their_own_ttl():
+    fake = FakeOpenLibrary()
+    clock = Clock()
+    cache = MetadataCache(negative_ttl=60, clock=clock)
+    client = _client(cache, fake)
+
+    assert client.fetch_by_isbn("9780000000002") is None
+    assert client.fetch_by_isbn("9780000000002") is None
+    assert len(fake.requests) == 1
+    assert cache.stats.negative_hits == 1
+
+    clock.now += 61
+    assert client.fetch_by_isbn("9780000000002") is None
+    assert len(fake.requests) == 2
+    assert cache.stats.expired == 1
+
+
+def test_network_errors_are_not_cached():
+    def broken(request):
+        raise httpx.ConnectError("down", request=request)
+
+    cache = MetadataCache()
+    client = OpenLibraryClient(cache=cache, transport=httpx.MockTransport(broken),
+                               retry=RetryPolicy(attempts=2, base=0.0))
+    with pytest.raises(UpstreamError):
+        client.fetch_by_isbn("9780441172719")
+    assert cache.get_edition("9780441172719") is MISS
+
+
+def test_lru_evicts_oldest_entries():
+    cache = MetadataCache(max_entries=2)
+    cache.put_edition("a", {"title": "A"})
+    cache.put_edition("b", {"title": "B"})
+    cache.get_edition("a")  # a yeniden kullanıldı → b en eski
+    cache.put_edition("c", {"title": "C"})
+    assert cache.stats.evictions == 1
+    assert cache.get_edition("b") is MISS
+    assert cache.get_edition("a") == {"title": "A"}
+
+
+def test_disk_tier_survives_restart(tmp_path: Path):
+    path = tmp_path / "meta.sqlite"
+    cache = MetadataCache(path)
+    cache.put_edition("9780441172719", {"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719"})
+    cache.put_author("/authors/OL1A", "Frank Herbert")
+    cache.close()
+
+    fake = FakeOpenLibrary()
+    cache2 = MetadataCache(path)
+    assert _client(cache2, fake).fetch_by_isbn("9780441172719")["title"] == "Dune"
+    assert fake.requests == []
+    assert cache2.stats.disk_hits == 1
+    assert cache2.get_author("/authors/OL1A") == "Frank Herbert"
@@ -0,0 +1,51 @@
+# tests/test_metrics.py
+# Amaç: metin biçimi çıktısını ve API/Library/istemci ölçüm noktalarının
+# GET /metrics'te göründüğünü doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pathlib import Path
+
+import httpx
+from fastapi.testclient import TestClient
+
+import metrics
+from api import create_app
+from openlibrary_client import OpenLibraryClient
+
+
+def test_histogram_exposition_is_cumulative():
+    h = metrics.Histogram("test_latency_seconds", "Test.", ("route",), buckets=(0.1, 1.0),
+                          registry=metrics.Registry())
+    h.observe(0.05, route='/a"b')
+    h.observe(0.5, route='/a"b')
+    h.observe(5, route='/a"b')
+    text = "\n".join(h.samples())
+    assert 'test_latency_seconds_bucket{route="/a\\"b",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/a\\"b",le="1"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/a\\"b",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/a\\"b"} 3' in text
+    assert 'test_latency_seconds_sum{route="/a\\"b"} 5.55' in text
+
+
+def test_metrics_endpoint_reports_routes_storage_and_upstream(tmp_path: Path):
+    def upstream(request):
+        if request.url.path.startswith("/isbn/"):
+            return httpx.Response(200, json={"title": "Dune", "authors": [{"key": "/authors/OL1A"}]})
+        return httpx.Response(200, json={"name": "Frank Herbert"})
+
+    ol = OpenLibraryClient(transport=httpx.MockTransport(upstream))
+    client = TestClient(create_app(str(tmp_path / "library.json"), ol_client=ol))
+    assert client.post("/books", json={"isbn": "9780441172719"}).status_code == 201
+    client.delete("/books/9780441172719")
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = r.text
+    assert '# TYPE library_http_request_duration_seconds histogram' in text
+    assert 'route="/books/{isbn}",status="204"' in text
+    assert 'library_storage_commit_duration_seconds_count{backend="JsonFileBackend",op="commit"}' in text
+    assert 'library_storage_write_bytes_count{file="json"}' in text
+    assert 'library_upstream_request_duration_seconds_count{endpoint="edition",outcome="200"}' in text
+    assert 'library_upstream_request_duration_seconds_count{endpoint="author",outcome="200"}' in text
+    assert 'library_index_entries{index="isbn"} 0' in text
@@ -121,3 +121,131 @@ def test_add_book_with_isbn_not_found(tmp_path: Path):
     ok = lib.add_book("0000000000", client=DummyClient(payload=None))
     assert ok is False  # program çökmemeli, sadece eklemesin
     assert lib.find_book("0000000000") is None
+
+
+# --- İndeksler: başlık/yazar aramaları add/remove/load ile senkron kalmalı ---
+
+def test_title_and_author_indexes_stay_in_sync(tmp_path: Path):
+    db = tmp_path / "library.json"
+    lib = Library(db)
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    lib.add_book(Book("Dune Messiah", "Frank Herbert", "9780593098233"))
+    lib.add_book(Book("  DUNE ", "Başka Yazar", "1111111111"))
+
+    # Büyük/küçük harf ve boşluk duyarsız; ilk eklenen döner
+    assert lib.find_by_title("dune").isbn == "9780441172719"
+    assert [b.isbn for b in lib.list_by_author("FRANK HERBERT")] == ["9780441172719", "9780593098233"]
+
+    assert lib.remove_book("9780441172719") is True
+    assert lib.find_by_title("Dune").isbn == "1111111111"
+    assert [b.isbn for b in lib.list_by_author("frank herbert")] == ["9780593098233"]
+
+    lib2 = Library(db)
+    assert lib2.find_by_title("dune messiah").isbn == "9780593098233"
+    assert lib2.list_by_author("nobody") == []
+
+
+# --- Toplu içe aktarım ---
+
+class MapClient:
+    """ISBN -> payload sözlüğünden yanıt verir; çağrıları sayar."""
+    def __init__(self, payloads):
+        self.payloads = payloads
+        self.calls = []
+    def fetch_by_isbn(self, isbn: str):
+        self.calls.append(isbn)
+        return self.payloads.get(isbn)
+
+
+def test_add_many_dedups_up_front_and_commits_per_chunk(tmp_path: Path):
+    from backends import JsonFileBackend
+
+    class CountingBackend(JsonFileBackend):
+        commits = 0
+        def commit(self, ops, snapshot):
+            CountingBackend.commits += 1
+            super().commit(ops, snapshot)
+
+    db = tmp_path / "library.json"
+    lib = Library(db, backend=CountingBackend(db))
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    CountingBackend.commits = 0
+
+    client = MapClient({
+        "9780132350884": {"title": "Clean Code", "author": "Robert C. Martin", "isbn": "9780132350884"},
+        "9780345339683": {"title": "The Hobbit", "author": "J.R.R. Tolkien", "isbn": "9780345339683"},
+    })
+    inputs = ["0441172717", "978-0132350884", "9780132350884", "123", "9780345339683", "9780000000002"]
+    results = list(lib.add_many(inputs, client=client, workers=4, chunk_size=3))
+
+    assert [r["status"] for r in results] == ["duplicate", "added", "duplicate", "invalid", "added", "not_found"]
+    assert results[1]["book"].title == "Clean Code"
+    # Kayıtlı/tekrarlı/geçersiz olanlar için dış servise gidilmez
+    assert sorted(client.calls) == ["9780000000002", "9780132350884", "9780345339683"]
+    assert CountingBackend.commits == 2  # iki parça, parça başına bir commit
+    assert len(Library(db).list_books()) == 3
+
+
+def test_page_keeps_sorted_order_through_add_and_remove(tmp_path: Path):
+    lib = Library(tmp_path / "library.json")
+    for isbn in ["isbn-3", "isbn-1", "isbn-2"]:
+        lib.add_book(Book(f"Kitap {isbn}", "Yazar", isbn))
+    assert [b.isbn for b in lib.page(limit=2)] == ["isbn-1", "isbn-2"]
+
+    # Sıralı liste kurulduktan sonra artımlı güncellenmeli
+    lib.remove_book("isbn-2")
+    lib.add_book(Magazine("Dergi", "Yazar", "isbn-0", issue_number=1))
+    assert [b.isbn for b in lib.page()] == ["isbn-0", "isbn-1", "isbn-3"]
+    assert [b.isbn for b in lib.page(after="isbn-0", limit=1)] == ["isbn-1"]
+    assert [b.isbn for b in lib.page(kind="Magazine")] == ["isbn-0"]
+
+
+# --- Sütunlu depo: sözlük tabanlı Library ile aynı davranış ---
+
+def test_columnar_library_matches_default(tmp_path: Path):
+    def exercise(lib):
+        lib.add_book(Book("Dune", "Frank Herbert", "0441172717"))
+        lib.add_book(ComicBook("Watchmen", "Alan Moore", "isbn-w", illustrator="Dave Gibbons"))
+        lib.add_book(Magazine("Bilim", "Editör", "isbn-m", issue_number=7))
+        lib.add_book(Book("Dune Messiah", "Frank Herbert", "9780593098233"))
+        lib.remove_book("isbn-w")
+        lib.add_book(Book("Children of Dune", "Frank Herbert", "isbn-c"))  # boşalan satırı kullanır
+        return [(type(b).__name__, str(b)) for b in lib.list_books()]
+
+    plain = exercise(Library(tmp_path / "a.json"))
+    lib = Library(tmp_path / "b.json", columnar=True)
+    assert exercise(lib) == plain
+    assert lib.find_book("9780441172719").isbn == "0441172717"
+    assert [b.title for b in lib.list_by_author("frank herbert")] == ["Dune", "Dune Messiah", "Children of Dune"]
+    assert lib.search("messiah")[0][0].isbn == "9780593098233"
+    assert [b.isbn for b in lib.page(kind="Magazine")] == ["isbn-m"]
+    # Kalıcı biçim aynı: sütunlu depo normal Library ile okunabilir
+    assert [str(b) for b in Library(tmp_path / "b.json").list_books()] == [s for _, s in plain]
+
+
+# --- Yazar varlıkları: ortak yazarlı kitaplar ve anahtar indeksi ---
+
+def test_author_keys_link_coauthors_and_persist(tmp_path: Path):
+    db = tmp_path / "library.json"
+    for columnar in (False, True):
+        path = db.with_name(f"{columnar}.json")
+        lib = Library(path, columnar=columnar)
+        lib.add_book(Book("Good Omens", "Terry Pratchett, Neil Gaiman", "isbn-go",
+                          author_keys=("/authors/OL1A", "/authors/OL2A")))
+        lib.add_book(ComicBook("Sandman", "Neil Gaiman", "isbn-s", illustrator="Sam Kieth",
+                               author_keys=("/authors/OL2A",)))
+        lib.add_book(Book("Elle eklenen", "Neil Gaiman", "isbn-e"))  # anahtarsız
+
+        assert [b.isbn for b in lib.list_by_author("neil gaiman")] == ["isbn-go", "isbn-s", "isbn-e"]
+        assert [b.isbn for b in lib.list_by_author_key("/authors/OL2A")] == ["isbn-go", "isbn-s"]
+        assert lib.authors.name("/authors/OL1A") == "Terry Pratchett"
+
+        lib.remove_book("isbn-go")
+        assert [b.isbn for b in lib.list_by_author("terry pratchett")] == []
+        assert [b.isbn for b in lib.list_by_author_key("/authors/OL2A")] == ["isbn-s"]
+
+        # Kalıcı biçim: anahtarlar yalnızca varsa yazılır, yeniden yüklemede bağlar kurulur
+        reloaded = Library(path, lazy=not columnar)
+        assert reloaded.find_book("isbn-s").author_keys == ("/authors/OL2A",)
+        assert reloaded.find_book("isbn-e").author_keys == ()
+        assert [b.title for b in reloaded.list_by_author_key("/authors/OL2A")] == ["Sandman"]
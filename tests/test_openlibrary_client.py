@@ -0,0 +1,111 @@
+# tests/test_openlibrary_client.py
+# Amaç: Async istemcinin yazarları eşzamanlı çözdüğünü ve senkron sarmalayıcının
+# aynı bağlantı havuzunu kullandığını sahte transport ile doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import asyncio
+
+import httpx
+
+from openlibrary_client import AsyncOpenLibraryClient, OpenLibraryClient
+
+
+class SlowAuthors:
+    """Yazar isteklerini bekletir ve aynı anda kaç tanesinin uçuşta olduğunu ölçer."""
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path == "/isbn/9780131103627.json":
+            keys = [{"key": f"/authors/OL{i}A"} for i in range(3)]
+            return httpx.Response(200, json={"title": "The C Programming Language", "authors": keys})
+        if path.startswith("/authors/"):
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.02)
+            self.in_flight -= 1
+            return httpx.Response(200, json={"name": path.split("/")[-1][:-len(".json")]})
+        return httpx.Response(404)
+
+
+def test_async_client_resolves_authors_concurrently():
+    fake = SlowAuthors()
+
+    async def run():
+        client = AsyncOpenLibraryClient(transport=httpx.MockTransport(fake))
+        try:
+            return await client.fetch_by_isbn("978-0131103627")
+        finally:
+            await client.aclose()
+
+    result = asyncio.run(run())
+    assert result == {"title": "The C Programming Language", "author": "OL0A, OL1A, OL2A",
+                      "isbn": "9780131103627",
+                      "author_keys": ["/authors/OL0A", "/authors/OL1A", "/authors/OL2A"]}
+    assert fake.max_in_flight == 3
+
+
+def test_sync_wrapper_reuses_one_async_client():
+    fake = SlowAuthors()
+    client = OpenLibraryClient(transport=httpx.MockTransport(fake))
+    try:
+        assert client.fetch_by_isbn("9780131103627")["author"] == "OL0A, OL1A, OL2A"
+        pool = client.aio._client
+        assert client.fetch_by_isbn("0000000000") is None
+        assert client.aio._client is pool
+    finally:
+        client.close()
+    assert client.aio._client is None
+
+
+class CountingUpstream:
+    """Yavaş sahte Open Library; yol başına istek sayar."""
+    def __init__(self):
+        self.hits = {}
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.hits[path] = self.hits.get(path, 0) + 1
+        await asyncio.sleep(0.05)
+        if path.startswith("/isbn/"):
+            return httpx.Response(200, json={"title": path, "authors": [{"key": "/authors/OL1A"}]})
+        return httpx.Response(200, json={"name": "Frank Herbert"})
+
+
+def test_concurrent_sync_callers_share_one_upstream_call():
+    from concurrent.futures import ThreadPoolExecutor
+
+    fake = CountingUpstream()
+    client = OpenLibraryClient(transport=httpx.MockTransport(fake))
+    try:
+        # 10 ve 13 haneli yazımlar aynı kanonik ISBN'de birleşir
+        inputs = ["0441172717", "9780441172719", "978-0441172719"] * 4 + ["9780593098233"]
+        with ThreadPoolExecutor(max_workers=len(inputs)) as pool:
+            results = list(pool.map(client.fetch_by_isbn, inputs))
+    finally:
+        client.close()
+    assert all(r and r["author"] == "Frank Herbert" for r in results)
+    # Dune için tek istek (girilen biçimlerden hangisi önce geldiyse), ortak yazar için de tek
+    dune = [p for p in fake.hits if p in ("/isbn/0441172717.json", "/isbn/9780441172719.json")]
+    assert len(dune) == 1 and fake.hits[dune[0]] == 1
+    assert fake.hits["/isbn/9780593098233.json"] == 1
+    assert fake.hits["/authors/OL1A.json"] == 1
+    assert client.aio.flight.in_flight() == 0
+
+
+def test_library_closes_its_temporary_clients(tmp_path, monkeypatch):
+    import threading
+    import openlibrary_client
+    from models import Library
+
+    transport = httpx.MockTransport(lambda request: httpx.Response(404, json={}))
+    monkeypatch.setattr(openlibrary_client, "OpenLibraryClient",
+                        lambda: OpenLibraryClient(transport=transport, rate_limit=None))
+    lib = Library(tmp_path / "library.json")
+    before = set(threading.enumerate())
+    for i in range(5):
+        assert lib.add_book(f"978044117271{i}") is False
+    assert [r["status"] for r in lib.add_many(["9780441172719"])] == ["not_found"]
+    assert not [t for t in set(threading.enumerate()) - before if t.name == "openlibrary-loop"]
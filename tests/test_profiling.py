@@ -0,0 +1,61 @@
+# tests/test_profiling.py
+# Amaç: profil örneklemesinin yönetim uçlarıyla açılıp kapandığını, pstats
+# dökümünün indirilebildiğini ve storage kancalarının etiketlendiğini doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import pstats
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api import create_app
+from models import Book, Library
+from profiling import PROFILER
+
+
+@pytest.fixture(autouse=True)
+def profiler_off():
+    PROFILER.reset()
+    yield
+    PROFILER.configure(sample_rate=0.0, memory=False)
+    PROFILER.reset()
+
+
+def test_admin_toggle_and_pstats_download(tmp_path: Path):
+    client = TestClient(create_app(str(tmp_path / "library.json")))
+    client.get("/books")
+    assert client.get("/admin/profiling").json()["samples"] == {}  # kapalıyken örnek yok
+
+    r = client.post("/admin/profiling", json={"sample_rate": 1.0, "memory": True})
+    assert r.json()["enabled"] is True
+    for _ in range(3):
+        client.get("/books")
+    assert client.get("/admin/profiling").json()["samples"] == {"GET /books": 3}
+
+    dump = tmp_path / "api.pstats"
+    dump.write_bytes(client.get("/admin/profiling/pstats", params={"label": "GET /books"}).content)
+    assert pstats.Stats(str(dump)).total_calls > 0
+    assert "function calls" in client.get("/admin/profiling/top").text
+    assert isinstance(client.get("/admin/profiling/allocations").json(), list)
+
+    client.post("/admin/profiling", json={"sample_rate": 0})
+    client.delete("/admin/profiling")
+    assert client.get("/admin/profiling/pstats").status_code == 404
+
+
+def test_admin_token_required_when_configured(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("LIB_ADMIN_TOKEN", "gizli")
+    client = TestClient(create_app(str(tmp_path / "library.json")))
+    assert client.get("/admin/profiling").status_code == 403
+    assert client.get("/admin/profiling", headers={"X-Admin-Token": "gizli"}).status_code == 200
+
+
+def test_storage_sections_are_labelled(tmp_path: Path):
+    PROFILER.configure(sample_rate=1.0)
+    lib = Library(tmp_path / "library.json")
+    lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    lib.save_books()
+    lib.load_books()
+    samples = PROFILER.status()["samples"]
+    assert {"storage.load_books", "storage.commit", "storage.save_books"} <= samples.keys()
@@ -0,0 +1,135 @@
+# tests/test_resilience.py
+# Amaç: hız sınırı, yeniden deneme ve devre kesicinin davranışını sahte saat ve
+# gecikme/hata enjekte eden sahte transport ile (ağsız) doğrulamak.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import asyncio
+from pathlib import Path
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from api import create_app
+from openlibrary_client import AsyncOpenLibraryClient, OpenLibraryClient
+from resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, TokenBucket, UpstreamError
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+    def __call__(self):
+        return self.now
+
+
+class FlakyUpstream:
+    """
+    İlk `failures` isteği hatayla yanıtlar, sonra düzelir. MockTransport zaman
+    aşımlarını uygulamadığından gecikme, httpx'in atacağı ReadTimeout ile taklit edilir.
+    """
+    def __init__(self, failures=0, error="500"):
+        self.failures = failures
+        self.error = error
+        self.requests = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        if len(self.requests) <= self.failures:
+            if self.error == "connect":
+                raise httpx.ConnectError("down", request=request)
+            if self.error == "timeout":
+                await asyncio.sleep(0.01)
+                raise httpx.ReadTimeout("slow", request=request)
+            return httpx.Response(int(self.error), headers={"Retry-After": "0"})
+        if request.url.path.startswith("/isbn/"):
+            return httpx.Response(200, json={"title": "Dune", "authors": [{"key": "/authors/OL1A"}]})
+        return httpx.Response(200, json={"name": "Frank Herbert"})
+
+
+def _fetch(fake, **options):
+    async def run():
+        client = AsyncOpenLibraryClient(transport=httpx.MockTransport(fake), **options)
+        try:
+            return await client.fetch_by_isbn("9780441172719")
+        finally:
+            await client.aclose()
+    return asyncio.run(run())
+
+
+def test_token_bucket_refills_at_rate():
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.try_acquire() == 0 and bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0
+
+
+def test_breaker_opens_then_allows_single_probe():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    breaker.before_call()  # eşik dolmadı
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()  # deneme çağrısı geçer
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # ikincisi beklemeli
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("error", ["503", "429", "connect", "timeout"])
+def test_transient_errors_are_retried(error):
+    fake = FlakyUpstream(failures=2, error=error)
+    result = _fetch(fake, retry=RetryPolicy(attempts=3, base=0.0))
+    assert result == {"title": "Dune", "author": "Frank Herbert", "isbn": "9780441172719",
+                      "author_keys": ["/authors/OL1A"]}
+    assert fake.requests.count("/isbn/9780441172719.json") == 3
+
+
+def test_retries_give_up_with_upstream_error():
+    fake = FlakyUpstream(failures=100, error="timeout")
+    with pytest.raises(UpstreamError):
+        _fetch(fake, retry=RetryPolicy(attempts=2, base=0.0))
+    assert len(fake.requests) == 2
+
+
+def test_open_breaker_fails_fast_without_network():
+    fake = FlakyUpstream(failures=100)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    with pytest.raises(UpstreamError):
+        _fetch(fake, retry=RetryPolicy(attempts=2, base=0.0), breaker=breaker)
+    sent = len(fake.requests)
+    with pytest.raises(CircuitOpenError):
+        _fetch(fake, breaker=breaker)
+    assert len(fake.requests) == sent
+
+
+@pytest.mark.parametrize("exc", [httpx.TooManyRedirects, httpx.DecodingError, RuntimeError])
+def test_unexpected_error_in_half_open_probe_does_not_wedge_breaker(exc):
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+
+    def fake(request):
+        raise exc("bozuk")
+    expected = RuntimeError if exc is RuntimeError else UpstreamError
+    with pytest.raises(expected):
+        _fetch(fake, breaker=breaker)
+    clock.now += 10
+    breaker.before_call()  # deneme hakkı geri verildi; devre sonsuza dek açık kalmadı
+
+
+def test_api_returns_503_when_upstream_down(tmp_path: Path):
+    fake = FlakyUpstream(failures=100)
+    ol = OpenLibraryClient(transport=httpx.MockTransport(fake), retry=RetryPolicy(attempts=2, base=0.0))
+    client = TestClient(create_app(str(tmp_path / "library.json"), ol_client=ol))
+    r = client.post("/books", json={"isbn": "9780441172719"})
+    assert r.status_code == 503
+    assert "Retry-After" in r.headers
+    assert client.get("/books").json() == []
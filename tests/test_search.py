@@ -0,0 +1,64 @@
+# tests/test_search.py
+# Amaç: tam metin arama (Türkçe katlama, önek, yazım hatası, BM25) ve
+# Library/API entegrasyonunu test etmek.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from api import create_app
+from models import Book, Library
+from search import SearchIndex, fold, osa_distance
+
+
+def test_fold_is_turkish_aware():
+    assert fold("İSTANBUL") == fold("Istanbul") == fold("ıstanbul") == "istanbul"
+    assert fold("Çağlayan Şişli Göğüs Ünlü") == "caglayan sisli gogus unlu"
+
+
+def test_osa_distance_counts_transposition_once():
+    assert osa_distance("dnue", "dune", 2) == 1
+    assert osa_distance("kitap", "kitap", 2) == 0
+    assert osa_distance("abc", "xyzxyz", 2) == 3  # sınırı aşınca limit+1
+
+
+def test_index_prefix_fuzzy_and_ranking():
+    idx = SearchIndex()
+    idx.add("1", "Dune", "Frank Herbert")
+    idx.add("2", "Dune Messiah", "Frank Herbert")
+    idx.add("3", "Children of Dune", "Frank Herbert")
+    idx.add("4", "İnce Memed", "Yaşar Kemal")
+
+    assert [d for d, _ in idx.search("dune")][0] == "1"  # en kısa başlık en üstte
+    assert {d for d, _ in idx.search("mess")} == {"2"}    # önek
+    assert {d for d, _ in idx.search("messaih")} == {"2"}  # yazım hatası
+    assert {d for d, _ in idx.search("ince memed yasar")} == {"4"}
+    assert idx.search("herbert dune")[0][0] == "1"
+
+    idx.remove("2", "Dune Messiah", "Frank Herbert")
+    assert idx.search("messiah") == []
+    assert len(idx) == 3
+
+
+def test_library_search_tracks_add_and_remove(tmp_path: Path):
+    lib = Library(tmp_path / "library.json")
+    lib.add_book(Book("Good Omens", "Terry Pratchett, Neil Gaiman", "9780060853983"))
+    assert [b.isbn for b, _ in lib.search("gaiman")] == ["9780060853983"]
+
+    # İndeks kurulduktan sonra yapılan değişiklikler de yansımalı
+    lib.add_book(Book("American Gods", "Neil Gaiman", "9780380789030"))
+    assert {b.isbn for b, _ in lib.search("neil")} == {"9780060853983", "9780380789030"}
+    lib.remove_book("9780060853983")
+    assert [b.isbn for b, _ in lib.search("gaiman")] == ["9780380789030"]
+
+
+def test_search_endpoint(tmp_path: Path):
+    client = TestClient(create_app(str(tmp_path / "library.json")))
+    client.app.state.lib.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+
+    r = client.get("/search", params={"q": "herbrt"})
+    assert r.status_code == 200
+    hits = r.json()
+    assert hits[0]["isbn"] == "9780441172719" and hits[0]["score"] > 0
+    assert client.get("/search").status_code == 422
@@ -0,0 +1,59 @@
+# tests/test_snapshot.py
+# Amaç: ikili snapshot biçimini, mmap üzerinden okumayı ve süreçler arası yeni
+# sürümlerin yeniden başlatmadan görülmesini test etmek.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+from pathlib import Path
+
+from models import Book, ComicBook, Library
+from snapshot import SnapshotBackend, SnapshotReader, write_snapshot
+
+
+def test_reader_binary_search(tmp_path: Path):
+    path = tmp_path / "library.snap"
+    items = [(f"k{i:03d}", {"isbn": f"k{i:03d}", "title": f"Başlık {i}"}) for i in range(100)]
+    write_snapshot(path, reversed(items))  # sıralamayı yazıcı yapar
+    reader = SnapshotReader(path)
+    assert len(reader) == 100
+    assert list(reader.keys()) == [k for k, _ in items]
+    assert reader.get("k042") == {"isbn": "k042", "title": "Başlık 42"}
+    assert reader.get("k100") is None and reader.get("") is None
+
+
+def test_workers_share_snapshot_and_see_new_versions(tmp_path: Path):
+    path = tmp_path / "library.snap"
+    writer = Library(path, backend=SnapshotBackend(path, check_interval=0), lazy=True)
+    writer.add_book(Book("Dune", "Frank Herbert", "0441172717"))
+    writer.add_book(ComicBook("Watchmen", "Alan Moore", "isbn-w", illustrator="Dave Gibbons"))
+
+    reader = Library(path, backend=SnapshotBackend(path, check_interval=0), lazy=True,
+                     refresh_interval=0)
+    assert reader.find_book("9780441172719").isbn == "0441172717"
+    assert reader.find_book("isbn-w").illustrator == "Dave Gibbons"
+    version = reader.version
+
+    # Diğer "worker" yazar; okuyucu yeniden başlatılmadan yeni sürümü görür
+    writer.remove_book("isbn-w")
+    writer.add_book(Book("Emma", "Jane Austen", "isbn-e"))
+    assert reader.find_book("isbn-w") is None
+    assert [b.title for b in reader.list_by_author("jane austen")] == ["Emma"]
+    assert reader.version > version
+    assert sorted(b.title for b in reader.list_books()) == ["Dune", "Emma"]
+
+    # Eager açılış aynı içeriği verir
+    eager = Library(path, backend=SnapshotBackend(path))
+    assert sorted(b.isbn for b in eager.list_books()) == ["0441172717", "isbn-e"]
+
+
+def test_two_writers_merge_onto_latest_snapshot(tmp_path: Path):
+    path = tmp_path / "library.snap"
+    # Birbirinin yayımladığı sürümü henüz görmemiş iki worker
+    a = Library(path, backend=SnapshotBackend(path, check_interval=3600), lazy=True)
+    b = Library(path, backend=SnapshotBackend(path, check_interval=3600), lazy=True)
+    a.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    b.add_book(Book("Clean Code", "Robert C. Martin", "9780132350884"))
+    a.remove_book("9780441172719")
+    a.add_book(Book("Emma", "Jane Austen", "isbn-e"))
+
+    fresh = Library(path, backend=SnapshotBackend(path))
+    assert sorted(x.title for x in fresh.list_books()) == ["Clean Code", "Emma"]
@@ -0,0 +1,85 @@
+# tests/test_sqlite_backend.py
+# Amaç: SQLite backend'inin JSON backend'iyle aynı Library davranışını vermesi,
+# taşıma aracı ve indeksli sorgular.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import models
+from tests import test_models
+from models import Book, ComicBook, Library, Magazine
+from sqlite_backend import SqliteBackend, migrate_json
+
+# Library'nin genel davranış testleri: varsayılan backend SQLite ile değiştirilip aynen koşturulur
+PARITY = [
+    test_models.test_add_find_list_and_persistence,
+    test_models.test_duplicate_isbn_blocked,
+    test_models.test_remove_and_persist,
+    test_models.test_add_book_with_isbn_success,
+    test_models.test_title_and_author_indexes_stay_in_sync,
+    test_models.test_page_keeps_sorted_order_through_add_and_remove,
+    test_models.test_columnar_library_matches_default,
+    test_models.test_author_keys_link_coauthors_and_persist,
+]
+
+
+@pytest.mark.parametrize("case", PARITY, ids=lambda f: f.__name__)
+def test_library_suite_on_sqlite(case, tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(models, "JsonFileBackend", lambda p: SqliteBackend(Path(p).with_suffix(".db")))
+    case(tmp_path)
+    assert list(tmp_path.glob("*.db"))  # gerçekten SQLite'a yazıldı
+
+
+def test_db_suffix_selects_sqlite_and_schema_keeps_subtypes(tmp_path: Path):
+    db = tmp_path / "library.db"
+    lib = Library(db)
+    assert isinstance(lib.backend, SqliteBackend)
+    lib.add_book(ComicBook("Watchmen", "Alan Moore", "isbn-w", illustrator="Dave Gibbons"))
+    lib.add_book(Magazine("Bilim", "Editör", "isbn-m", issue_number=7))
+    lib.close()
+
+    con = sqlite3.connect(db)
+    assert con.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert con.execute("SELECT illustrator FROM comic_books").fetchall() == [("Dave Gibbons",)]
+    lib2 = Library(db)
+    assert lib2.find_book("isbn-m").issue_number == 7
+    assert lib2.remove_book("isbn-w")
+    assert lib2.backend.query(author="ALAN MOORE") == []
+    assert con.execute("SELECT COUNT(*) FROM comic_books").fetchone()[0] == 0  # cascade
+
+
+def test_migrate_json(tmp_path: Path):
+    src = tmp_path / "library.json"
+    records = [{"title": f"Kitap {i}", "author": f"Yazar {i % 3}", "isbn": f"isbn-{i}", "type": "Book"}
+               for i in range(25)]
+    src.write_text(json.dumps(records, ensure_ascii=False), encoding="utf-8")
+    assert migrate_json(src, tmp_path / "library.db", batch_size=10) == 25
+
+    backend = SqliteBackend(tmp_path / "library.db")
+    assert list(backend.load()) == records
+    assert [r["isbn"] for r in backend.query(author="yazar 1", limit=3)] == ["isbn-1", "isbn-4", "isbn-7"]
+    assert backend.get("ISBN-2") is None and backend.get("isbn-2")["title"] == "Kitap 2"
+
+
+def test_two_libraries_on_one_db_see_each_other(tmp_path: Path):
+    db = tmp_path / "library.db"
+    a, b = Library(db, refresh_interval=0), Library(db, refresh_interval=0)
+    assert a.add_book(Book("Dune", "Frank Herbert", "9780441172719"))
+    assert b.find_book("0441172717").title == "Dune"
+    assert not b.add_book(Book("Dune (kopya)", "Frank Herbert", "9780441172719"))  # a'nın satırını ezmez
+    assert a.remove_book("9780441172719")
+    assert b.find_book("9780441172719") is None
+    b.add_book(Book("Emma", "Jane Austen", "isbn-e"))
+    assert [x.title for x in a.list_by_author("jane austen")] == ["Emma"]
+
+    # Günlük budandıysa geride kalan örnek tam yeniden yükler
+    a.backend.max_log_rows = 1
+    for i in range(3):
+        a.add_book(Book(f"Kitap {i}", "Yazar", f"isbn-{i}"))
+    assert sorted(x.isbn for x in b.list_books()) == ["isbn-0", "isbn-1", "isbn-2", "isbn-e"]
+    b.save_books()  # tam yazım: diğerleri baştan yükler
+    assert len(a.list_books()) == 4
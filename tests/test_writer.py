@@ -0,0 +1,59 @@
+# tests/test_writer.py
+# Amaç: tek yazıcılı commit kuyruğunun eşzamanlı değişiklikleri gruplayıp
+# kalıcı hale getirdiğini test etmek.
+import sys, os
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+import asyncio
+from pathlib import Path
+
+from backends import JsonFileBackend
+from models import Book, Library
+from writer import CommitQueue
+
+
+class CountingBackend(JsonFileBackend):
+    def __init__(self, path):
+        super().__init__(path)
+        self.commits = 0
+
+    def commit(self, ops, snapshot):
+        self.commits += 1
+        super().commit(ops, snapshot)
+
+
+def test_concurrent_writes_are_grouped_into_few_commits(tmp_path: Path):
+    db = tmp_path / "library.json"
+    backend = CountingBackend(db)
+    lib = Library(db, backend=backend)
+    queue = CommitQueue(lib)
+
+    async def run():
+        books = [Book(f"Kitap {i}", "Yazar", f"isbn-{i}") for i in range(50)]
+        results = await asyncio.gather(*(queue.submit(lambda l, b=b: l.add_book(b)) for b in books))
+        dup = await queue.submit(lambda l: l.add_book(Book("Kopya", "Yazar", "isbn-0")))
+        await queue.stop()
+        return results, dup
+
+    results, dup = asyncio.run(run())
+    assert all(results) and dup is False
+    assert queue.stats.mutations == 51
+    assert backend.commits < 50  # kuyrukta biriken değişiklikler tek commit'e biner
+    assert len(Library(db).list_books()) == 50
+
+
+def test_failing_mutation_only_fails_its_caller(tmp_path: Path):
+    lib = Library(tmp_path / "library.json")
+    queue = CommitQueue(lib)
+
+    def boom(l):
+        raise ValueError("kötü istek")
+
+    async def run():
+        ok = queue.submit(lambda l: l.add_book(Book("Dune", "Frank Herbert", "9780441172719")))
+        bad = queue.submit(boom)
+        return await asyncio.gather(ok, bad, return_exceptions=True)
+
+    ok, bad = asyncio.run(run())
+    assert ok is True
+    assert isinstance(bad, ValueError)
+    assert Library(tmp_path / "library.json").find_book("9780441172719") is not None
@@ -0,0 +1,98 @@
+# writer.py
+"""
+API için tek yazıcılı commit kuyruğu.
+
+Tüm değişiklikler (POST/DELETE/toplu içe aktarım) `CommitQueue.submit` ile tek
+bir yazıcı görevine gönderilir. Yazıcı kuyrukta biriken istekleri bir grup
+olarak alır, hepsini belleğe uygular (event loop üzerinde, senkron ve kısa),
+ardından grubun tüm backend işlemlerini tek commit ile bir thread'de yazar.
+Bir commit sürerken gelen istekler bir sonraki gruba birikir; yük arttıkça
+commit başına işlem sayısı kendiliğinden büyür.
+
+Okuyucular kilit almaz: Library yalnızca yazıcı tarafından, await noktaları
+arasında değiştirilir; commit thread'i ise yalnızca okur.
+"""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from models import Library
+
+
+@dataclass
+class WriterStats:
+    groups: int = 0      # yapılan commit sayısı
+    mutations: int = 0   # uygulanan değişiklik isteği
+    max_group: int = 0
+
+
+class CommitQueue:
+    def __init__(self, lib: Library, max_group: int = 256) -> None:
+        self.lib = lib
+        self.max_group = max_group
+        self.stats = WriterStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def submit(self, mutation: Callable[[Library], Any]) -> Any:
+        """
+        `mutation(lib)` yazıcıda çalıştırılır; dönüş değeri, grubu kalıcı hale
+        geldikten sonra döner. Mutasyonun attığı hata çağırana iletilir.
+        """
+        self._ensure_running()
+        fut = self._loop.create_future()
+        self._queue.put_nowait((mutation, fut))
+        return await fut
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _ensure_running(self) -> None:
+        # Yazıcı, ilk değişiklikte çalışan loop üzerinde başlatılır
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._loop is not loop or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while True:
+            group = [await queue.get()]
+            while len(group) < self.max_group and not queue.empty():
+                group.append(queue.get_nowait())
+
+            outcomes = []
+            with self.lib.deferred() as ops:
+                for mutation, fut in group:
+                    try:
+                        outcomes.append((fut, mutation(self.lib), None))
+                    except Exception as exc:  # istek hatası sadece kendi çağıranına
+                        outcomes.append((fut, None, exc))
+
+            commit_error = None
+            try:
+                await asyncio.to_thread(self.lib.commit_ops, ops)
+            except Exception as exc:
+                commit_error = exc
+                # Bellek diskten ileride kaldı: kalıcı duruma geri dön
+                await asyncio.to_thread(self.lib.load_books)
+
+            self.stats.groups += 1
+            self.stats.mutations += len(group)
+            self.stats.max_group = max(self.stats.max_group, len(group))
+            for fut, result, exc in outcomes:
+                if fut.done():
+                    continue
+                if exc is not None or commit_error is not None:
+                    fut.set_exception(exc or commit_error)
+                else:
+                    fut.set_result(result)